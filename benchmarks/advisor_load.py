@@ -0,0 +1,161 @@
+"""Concurrent-session load benchmark for the advisor graph.
+
+Runs many advisor conversations at once in one event loop, the way the LangGraph
+server does, and reports turn throughput and latency for:
+
+- blocking: the previous advisor node, which called the model synchronously, so
+  LangGraph ran it on a worker thread for the whole model latency
+- async: the current advisor graph (async node, async tools)
+
+The model and Tavily are replaced by stand-ins that only wait (no network, no API
+keys), so the numbers isolate how many conversations one process can serve. Every
+session's first turn searches the web, the others are plain replies.
+
+Usage:
+    python benchmarks/advisor_load.py [--sessions 1 16 64 256] [--turns 3] [--model-latency 0.5]
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langgraph.graph import END, START, StateGraph
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.advisor import advisor_agent, history, tools  # noqa: E402
+from src.advisor.prompts import RESEARCH_ADVISOR_PROMPT  # noqa: E402
+from src.config import ADVISOR_CONFIG  # noqa: E402
+from src.shared.prompt_cache import render_system_message  # noqa: E402
+
+# ===== STAND-INS =====
+
+class SlowChatModel(BaseChatModel):
+    """Chat model that waits `latency` seconds, then searches on a session's first turn or replies."""
+
+    latency: float = 0.5
+
+    @property
+    def _llm_type(self) -> str:
+        return "slow-fake"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "SlowChatModel":
+        """Return the model itself: its canned responses don't depend on the tools."""
+        return self
+
+    def _respond(self, messages: list[Any]) -> ChatResult:
+        turns = sum(isinstance(message, HumanMessage) for message in messages)
+        if turns == 1 and isinstance(messages[-1], HumanMessage):
+            message = AIMessage(content="", tool_calls=[{
+                "name": "search_web",
+                "args": {"queries": ["recent developments"], "research_focus": "benchmark"},
+                "id": f"call_{time.perf_counter_ns()}"
+            }])
+        else:
+            message = AIMessage(content="That's a great angle. What matters most to you about it?")
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: list[Any], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        time.sleep(self.latency)
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: list[Any], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self.latency)
+        return self._respond(messages)
+
+
+def install_stand_ins(model_latency: float, search_latency: float) -> None:
+    """Point the advisor's model and search at the stand-ins."""
+    model = SlowChatModel(latency=model_latency)
+
+    async def fake_search(query: str, **kwargs: Any) -> dict[str, Any]:
+        await asyncio.sleep(search_latency)
+        return {"query": query, "results": [{"title": "Result", "url": "https://example.com", "content": "Content."}]}
+
+    advisor_agent.get_model_with_tools = lambda: model
+    tools.get_researcher_model = lambda: model
+    history.get_researcher_model = lambda: model
+    tools.search = fake_search
+
+
+# ===== GRAPHS =====
+
+def blocking_call_model(state: dict[str, Any]) -> dict[str, Any]:
+    """Run the advisor node as it was before: a synchronous model call."""
+    system_message = render_system_message(RESEARCH_ADVISOR_PROMPT, ADVISOR_CONFIG["provider"])
+    response = advisor_agent.get_model_with_tools().invoke([system_message] + state["messages"])
+    return {"messages": [response]}
+
+
+def build_blocking_graph() -> Any:
+    """Build the advisor graph with the blocking node, wired like advisor_agent."""
+    builder = StateGraph(advisor_agent.ResearchAdvisorState)
+    builder.add_node("call_model", blocking_call_model)
+    builder.add_node("tool_node", advisor_agent.tool_node)
+    builder.add_node("save_research_brief", advisor_agent.save_research_brief)
+    builder.add_edge(START, "call_model")
+    builder.add_conditional_edges("call_model", advisor_agent.should_use_tools, {"tool_node": "tool_node", END: END})
+    builder.add_conditional_edges(
+        "tool_node",
+        advisor_agent.should_save_research_brief,
+        {"save_research_brief": "save_research_brief", "continue": "call_model"}
+    )
+    builder.add_edge("save_research_brief", END)
+    return builder.compile()
+
+
+# ===== LOAD =====
+
+async def run_session(graph: Any, turns: int, latencies: list[float]) -> None:
+    """One conversation: `turns` user messages, each awaited to completion."""
+    state: dict[str, Any] = {"messages": []}
+    for turn in range(turns):
+        start = time.perf_counter()
+        state = await graph.ainvoke({**state, "messages": state["messages"] + [HumanMessage(content=f"Question {turn}")]})
+        latencies.append(time.perf_counter() - start)
+
+
+async def measure(graph: Any, sessions: int, turns: int) -> dict[str, float]:
+    """Run `sessions` conversations concurrently and return throughput and latency."""
+    latencies: list[float] = []
+    start = time.perf_counter()
+    await asyncio.gather(*[run_session(graph, turns, latencies) for _ in range(sessions)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "turns_per_second": len(latencies) / elapsed,
+        "p50": statistics.median(latencies),
+        "p95": latencies[min(int(len(latencies) * 0.95), len(latencies) - 1)]
+    }
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 16, 64, 256], help="Concurrent sessions to test")
+    parser.add_argument("--turns", type=int, default=3, help="User turns per session")
+    parser.add_argument("--model-latency", type=float, default=0.5, help="Seconds per model call")
+    parser.add_argument("--search-latency", type=float, default=0.3, help="Seconds per search")
+    args = parser.parse_args()
+
+    install_stand_ins(args.model_latency, args.search_latency)
+    graphs = {"blocking": build_blocking_graph(), "async": advisor_agent.advisor_agent}
+
+    print(f"Advisor load ({args.turns} turns per session, model {args.model_latency}s, search {args.search_latency}s)")  # noqa: T201
+    print(f"{'sessions':>8} {'variant':>9} {'turns/s':>9} {'p50 s':>8} {'p95 s':>8}")  # noqa: T201
+    for sessions in args.sessions:
+        for name, graph in graphs.items():
+            result = asyncio.run(measure(graph, sessions, args.turns))
+            print(f"{sessions:>8} {name:>9} {result['turns_per_second']:>9.1f} {result['p50']:>8.2f} {result['p95']:>8.2f}")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
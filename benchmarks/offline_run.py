@@ -0,0 +1,298 @@
+"""Offline end-to-end benchmark of the research graph.
+
+Replays a recorded research run through the real `deep_research_agent` graph (advisor,
+supervisor with parallel research-agents, report writer) with local stand-ins at the
+two network boundaries:
+
+- every chat model is a FixtureChatModel answering from the fixture's recorded responses
+- the Tavily client is an httpx client on a MockTransport serving the recorded payloads
+
+Model calls and searches return instantly, so what is measured is the orchestration
+itself: LangGraph and deep agents overhead, middleware, filesystem backend, search
+coordination, metering and tracing. Per run it reports:
+
+- wall time per main graph node and end to end
+- time spent in filesystem tool calls (write_file, read_file, ...) and in searches
+- checkpointing (in-memory saver) and the cost of serializing the final state
+
+Instead of a fixture, a real run recorded with src/shared/replay.py can be replayed
+(--archive), through the same replay layer the recording CLI uses.
+
+No API keys or network access are needed. To fail CI on orchestration regressions,
+save a baseline once and compare later runs against it:
+
+Usage:
+    python benchmarks/offline_run.py [--fixture benchmarks/fixtures/rust_vs_go.json] [--runs 5]
+    python benchmarks/offline_run.py --archive .cache/replays/run.jsonl.gz
+    python benchmarks/offline_run.py --save-baseline .cache/offline_baseline.json
+    python benchmarks/offline_run.py --baseline .cache/offline_baseline.json [--max-regression 0.25]
+    python benchmarks/offline_run.py --profile .cache/offline.prof
+"""
+
+import argparse
+import asyncio
+import cProfile
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+import httpx
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from pydantic import Field
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_FIXTURE = REPO_ROOT / "benchmarks" / "fixtures" / "rust_vs_go.json"
+FILE_TOOLS = ("ls", "read_file", "write_file", "edit_file", "glob", "grep")
+sys.path.insert(0, str(REPO_ROOT))
+
+from src import config  # noqa: E402
+
+# ===== STAND-INS =====
+
+class FixtureChatModel(BaseChatModel):
+    """Chat model that answers from recorded responses.
+
+    A request is matched to a fixture conversation by its first user message (the
+    first conversation whose "match" string it contains), and to a response by how
+    many assistant messages it already has. Matching on content rather than call
+    order keeps replay deterministic while parallel subagents interleave.
+    """
+
+    conversations: list[dict[str, Any]]
+    served: set[tuple[str, int]] = Field(default_factory=set)  # (match, step) of every response handed out
+
+    @property
+    def _llm_type(self) -> str:
+        return "fixture"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "FixtureChatModel":
+        """Return the model itself: fixture responses already contain their tool calls."""
+        return self
+
+    def unused_responses(self) -> int:
+        """Count the recorded responses not served since the last reset()."""
+        return sum(len(conv["responses"]) for conv in self.conversations) - len(self.served)
+
+    def reset(self) -> None:
+        """Start serving from the beginning of the fixture again."""
+        self.served.clear()
+
+    def _respond(self, messages: list[Any]) -> ChatResult:
+        first = next((str(message.content) for message in messages if isinstance(message, HumanMessage)), "")
+        step = sum(isinstance(message, AIMessage) for message in messages)
+        conversation = next((conv for conv in self.conversations if conv["match"] in first), None)
+        if conversation is None:
+            raise KeyError(f"No fixture conversation matches request starting with {first[:120]!r}")
+        if step >= len(conversation["responses"]):
+            raise KeyError(f"Fixture conversation {conversation['match']!r} has no response #{step}")
+
+        recorded = conversation["responses"][step]
+        self.served.add((conversation["match"], step))
+        usage = recorded.get("usage", {})
+        message = AIMessage(
+            content=recorded.get("content", ""),
+            tool_calls=[
+                {"name": tool_call["name"], "args": tool_call["args"], "id": f"call_{conversation['match'][-12:]}_{step}_{index}"}
+                for index, tool_call in enumerate(recorded.get("tool_calls", []))
+            ],
+            usage_metadata={
+                "input_tokens": usage.get("input_tokens", 0),
+                "output_tokens": usage.get("output_tokens", 0),
+                "total_tokens": usage.get("input_tokens", 0) + usage.get("output_tokens", 0)
+            },
+            response_metadata={"model_name": conversation.get("agent", "fixture")}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _generate(self, messages: list[Any], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return self._respond(messages)
+
+    async def _agenerate(self, messages: list[Any], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return self._respond(messages)
+
+
+def tavily_transport(searches: dict[str, Any]) -> httpx.MockTransport:
+    """Transport answering Tavily /search requests from recorded payloads."""
+    def handle(request: httpx.Request) -> httpx.Response:
+        query = json.loads(request.content)["query"]
+        if query not in searches:
+            return httpx.Response(404, json={"detail": f"No fixture for query {query!r}"})
+        return httpx.Response(200, json=searches[query])
+    return httpx.MockTransport(handle)
+
+
+class ListExporter:
+    """Span exporter that keeps spans in memory."""
+
+    def __init__(self):
+        """Start with no spans."""
+        self.spans: list[dict[str, Any]] = []
+
+    def export(self, span: dict[str, Any]) -> None:
+        """Keep a finished span."""
+        self.spans.append(span)
+
+
+def install_stand_ins(fixture: dict[str, Any] | None, archive_path: str | None, work_dir: str) -> tuple[Any, ListExporter]:
+    """Point models, Tavily, the blob store and tracing at local stand-ins.
+
+    Must run before the graph builds its agents (they are built on first use).
+
+    Returns:
+        The response source (FixtureChatModel or RunReplayer) and the span exporter
+    """
+    if archive_path:
+        from src.shared.replay import RunArchive, enable_replay
+        source = enable_replay(RunArchive.load(archive_path))
+    else:
+        source = FixtureChatModel(conversations=fixture["models"])
+        config.get_chat_model = lambda **kwargs: source
+
+        from src.shared import search
+        transport = tavily_transport(fixture["searches"])
+        search._build_client = lambda: httpx.AsyncClient(base_url=search.TAVILY_API_URL, transport=transport)
+
+    # Every run starts cold: no persistent search cache, blobs in a scratch directory
+    config.SEARCH_CACHE_CONFIG["enabled"] = False
+    config.BLOB_STORE_CONFIG["root_dir"] = os.path.join(work_dir, "blobs")
+
+    from src.shared.tracing import enable_tracing
+    exporter = ListExporter()
+    enable_tracing(exporter)
+    return source, exporter
+
+
+# ===== MEASUREMENT =====
+
+def _duration(span: dict[str, Any]) -> float:
+    return (span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1e9
+
+
+async def run_once(graph_input: dict[str, Any], source: Any, exporter: ListExporter) -> dict[str, float]:
+    """Replay the recording through the graph once and return its measurements (seconds, bytes).
+
+    Raises:
+        RuntimeError: If the run diverged from the recording (not every response was used)
+    """
+    from langgraph.checkpoint.memory import InMemorySaver
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    from src.main_graph import full_builder
+
+    graph = full_builder.compile(checkpointer=InMemorySaver())
+    exporter.spans.clear()
+    source.reset()
+    run_config = {"configurable": {"thread_id": f"offline-{time.perf_counter_ns()}"}}
+
+    start = time.perf_counter()
+    state = await graph.ainvoke(graph_input, run_config)
+    wall = time.perf_counter() - start
+    if source.unused_responses() or not state.get("final_report"):
+        raise RuntimeError(
+            f"{source.unused_responses()} recorded responses were never requested, "
+            "the graph no longer follows the recorded run"
+        )
+
+    serializer = JsonPlusSerializer()
+    start = time.perf_counter()
+    encoded = serializer.dumps_typed(state)
+    serializer.loads_typed(encoded)
+    serialize = time.perf_counter() - start
+
+    checkpoints = list(graph.checkpointer.list(run_config))
+    result = {
+        "wall": wall,
+        "serialize_state": serialize,
+        "state_bytes": float(len(encoded[1])),
+        "checkpoints": float(len(checkpoints))
+    }
+    for span in exporter.spans:
+        attributes = span["attributes"]
+        if attributes.get("span.type") == "node":
+            result[f"node {attributes['langgraph.node']}"] = result.get(f"node {attributes['langgraph.node']}", 0.0) + _duration(span)
+        elif attributes.get("span.type") == "model":
+            result["model calls"] = result.get("model calls", 0.0) + _duration(span)
+        elif attributes.get("tool.name") in FILE_TOOLS:
+            result["file ops"] = result.get("file ops", 0.0) + _duration(span)
+            result["file op count"] = result.get("file op count", 0.0) + 1
+        elif attributes.get("tool.name") == "tavily_search":
+            result["searches"] = result.get("searches", 0.0) + _duration(span)
+    return result
+
+
+def summarize(samples: list[dict[str, float]]) -> dict[str, float]:
+    """Median of every measurement across runs."""
+    return {key: statistics.median(sample.get(key, 0.0) for sample in samples) for key in samples[0]}
+
+
+def print_summary(summary: dict[str, float], baseline: dict[str, float] | None) -> None:
+    """Print measurements, with the change against a baseline when given."""
+    for key, value in summary.items():
+        if key in ("state_bytes", "checkpoints", "file op count"):
+            line = f"  {key:<22} {value:>12.0f}"
+        else:
+            line = f"  {key:<22} {value * 1000:>9.1f} ms"
+        if baseline and baseline.get(key):
+            line += f"   {(value - baseline[key]) / baseline[key]:+7.1%} vs baseline"
+        print(line)  # noqa: T201
+
+
+def main() -> None:
+    """Run the benchmark and print (and optionally check) a summary."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixture", default=str(DEFAULT_FIXTURE), help="Recorded run to replay")
+    parser.add_argument("--archive", help="Replay a run archive recorded with src/shared/replay.py instead")
+    parser.add_argument("--runs", type=int, default=5, help="Timed replays (after one warm-up)")
+    parser.add_argument("--save-baseline", help="Write the median measurements to this JSON file")
+    parser.add_argument("--baseline", help="Compare against a saved baseline and fail on regression")
+    parser.add_argument("--max-regression", type=float, default=0.25, help="Allowed end-to-end slowdown vs the baseline")
+    parser.add_argument("--profile", help="cProfile one replay and write the stats to this file")
+    args = parser.parse_args()
+
+    fixture = None
+    if args.archive:
+        from src.shared.replay import RunArchive
+        graph_input = RunArchive.load(args.archive).graph_input
+    else:
+        with open(args.fixture, encoding="utf-8") as fixture_file:
+            fixture = json.load(fixture_file)
+        graph_input = fixture["input"]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        source, exporter = install_stand_ins(fixture, args.archive, work_dir)
+        asyncio.run(run_once(graph_input, source, exporter))  # Warm-up: builds the agents, imports deep agents
+        samples = [asyncio.run(run_once(graph_input, source, exporter)) for _ in range(args.runs)]
+        if args.profile:
+            profiler = cProfile.Profile()
+            profiler.runcall(asyncio.run, run_once(graph_input, source, exporter))
+            profiler.dump_stats(args.profile)
+
+    summary = summarize(samples)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+
+    print(f"Offline replay of {Path(args.archive or args.fixture).name} (median of {args.runs} runs)")  # noqa: T201
+    print_summary(summary, baseline)
+    if args.profile:
+        print(f"Profile written to {args.profile} (view with snakeviz or python -m pstats)")  # noqa: T201
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.save_baseline) or ".", exist_ok=True)
+        with open(args.save_baseline, "w", encoding="utf-8") as baseline_file:
+            json.dump(summary, baseline_file, indent=2)
+
+    if baseline and summary["wall"] > baseline["wall"] * (1 + args.max_regression):
+        print(f"FAIL: end-to-end time regressed more than {args.max_regression:.0%}")  # noqa: T201
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Cold-import benchmark for the main graph.
+
+Measures how long a fresh interpreter takes to import `src.main_graph` (what the
+LangGraph server does before serving its first request). Each sample runs in a new
+subprocess with the provider API keys removed, so it also checks that importing
+the graph doesn't construct any models or clients.
+
+Usage:
+    python benchmarks/startup.py [--runs 10]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+API_KEY_VARS = ("ANTHROPIC_API_KEY", "OPENAI_API_KEY", "TAVILY_API_KEY")
+
+
+def time_cold_import(module: str) -> float:
+    """Import a module in a fresh interpreter (without API keys) and return the wall time in seconds."""
+    env = {key: value for key, value in os.environ.items() if key not in API_KEY_VARS}
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        check=True,
+    )
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Run the benchmark and print a summary."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10, help="Number of cold imports to time")
+    parser.add_argument("--module", default="src.main_graph", help="Module to import")
+    args = parser.parse_args()
+
+    # Warm the OS file cache and bytecode so we measure import work, not disk
+    time_cold_import(args.module)
+    samples = [time_cold_import(args.module) for _ in range(args.runs)]
+
+    print(f"Cold import of {args.module} ({args.runs} runs, no API keys)")  # noqa: T201
+    print(f"  min    {min(samples) * 1000:8.1f} ms")  # noqa: T201
+    print(f"  median {statistics.median(samples) * 1000:8.1f} ms")  # noqa: T201
+    print(f"  max    {max(samples) * 1000:8.1f} ms")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
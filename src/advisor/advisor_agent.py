@@ -8,21 +8,29 @@
 # It's a ReAct agent with a tool to trigger the main deep research supervisor.
 
 
+from functools import cache
+
 from typing_extensions import Literal
 
-from langchain_core.messages import AIMessage, SystemMessage
+from langchain_core.messages import AIMessage
 from langgraph.graph import StateGraph, START, END, MessagesState
 from langgraph.prebuilt import ToolNode
 
+from src.advisor.history import build_history, format_history_summary
 from src.advisor.tools import search_web, execute_research
 from src.advisor.prompts import RESEARCH_ADVISOR_PROMPT
-from src.config import get_advisor_model
+from src.config import ADVISOR_CONFIG, get_advisor_model
+from src.shared.prompt_cache import render_system_message
+from src.shared.rate_limits import with_backoff
 
 
 # Models and tools
+# Built on first use (not at import) so the graph loads fast and without API keys.
 
-model = get_advisor_model()
-model_with_tools = model.bind_tools([search_web, execute_research])
+@cache
+def get_model_with_tools():
+    """Get the advisor model with its tools bound."""
+    return get_advisor_model().bind_tools([search_web, execute_research])
 
 
 # ===== STATE =====
@@ -37,25 +45,43 @@ class ResearchAdvisorState(MessagesState):
     research_topic: str
     research_scope: str
 
+    # Rolling summary of the turns that aged out of the verbatim window (see history.py)
+    history_summary: str
+    summarized_messages: int
+
 
 
 # ===== NODES =====
 
-def call_model(state: ResearchAdvisorState):
+async def call_model(state: ResearchAdvisorState):
     """
     Main ReAct node that decides whether to search, execute research, or continue conversation.
+
+    Only recent turns are sent verbatim, older ones as a rolling summary (see history.py).
+    The node and its tools are async, so a turn never holds a server worker thread
+    while waiting on the model or on search.
     """
-    system_message = SystemMessage(content=RESEARCH_ADVISOR_PROMPT)
-    messages = [system_message] + state["messages"]
-    response = model_with_tools.invoke(messages)
-    return {"messages": [response]}
+    history = await build_history(state)
+    # Static prompt (cached by the provider) + summary and today's date, rendered fresh every turn
+    system_message = render_system_message(
+        RESEARCH_ADVISOR_PROMPT,
+        ADVISOR_CONFIG["provider"],
+        context=format_history_summary(history.summary)
+    )
+    # Advisor calls queue ahead of background research for the provider rate limits
+    response = await with_backoff(lambda: get_model_with_tools().ainvoke([system_message] + history.messages))
+    return {
+        "messages": [response],
+        "history_summary": history.summary,
+        "summarized_messages": history.summarized_messages
+    }
 
 
 # Tool node handles search_web and execute_research tools
 tool_node = ToolNode(tools=[search_web, execute_research])
 
 
-def save_research_brief(state: ResearchAdvisorState) -> dict:
+async def save_research_brief(state: ResearchAdvisorState) -> dict:
     """Save research topic and scope when execute_research tool is called.
     
     Extracts the structured output from the execute_research tool call
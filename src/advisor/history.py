@@ -0,0 +1,124 @@
+"""Conversation history windowing for the advisor.
+
+Keeps the advisor's input tokens and latency from growing with every message
+(search_web summaries included). The history sent to the model is:
+
+- the last ADVISOR_HISTORY_CONFIG["keep_turns"] turns verbatim (a turn starts at a
+  user message, so tool calls always stay next to their results)
+- older turns, verbatim as well while the whole history fits in
+  "max_history_tokens", otherwise folded into a rolling summary that is carried
+  in the advisor state and only ever extended with the turns that just aged out
+
+`state["messages"]` itself is never trimmed, so the user still sees the full chat.
+"""
+
+from dataclasses import dataclass
+from typing import Any
+
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from src.advisor.prompts import HISTORY_SUMMARIZER_PROMPT
+from src.config import ADVISOR_HISTORY_CONFIG, get_researcher_model
+from src.shared.rate_limits import with_backoff
+from src.shared.utils import estimate_tokens
+
+
+@dataclass
+class AdvisorHistory:
+    """What to send the model this turn."""
+
+    summary: str                # Rolling summary of the turns not sent verbatim ("" if none)
+    messages: list[AnyMessage]  # Messages sent verbatim
+    summarized_messages: int    # How many leading messages the summary covers
+
+
+def _messages_tokens(messages: list[AnyMessage]) -> int:
+    return sum(estimate_tokens(str(message.content)) for message in messages)
+
+
+def _window_start(messages: list[AnyMessage], keep_turns: int) -> int:
+    """Index of the first message of the last `keep_turns` turns (0 if there are fewer)."""
+    turn_starts = [index for index, message in enumerate(messages) if isinstance(message, HumanMessage)]
+    if len(turn_starts) <= keep_turns:
+        return 0
+    return turn_starts[-keep_turns]
+
+
+def _transcript(messages: list[AnyMessage]) -> str:
+    """Render messages for the summarizer, trimming long tool results."""
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {message.content}")
+        elif isinstance(message, ToolMessage):
+            content = str(message.content)[:ADVISOR_HISTORY_CONFIG["max_tool_result_chars"]]
+            lines.append(f"Tool result ({message.name or 'tool'}): {content}")
+        elif isinstance(message, AIMessage):
+            if message.text:
+                lines.append(f"Advisor: {message.text}")
+            for tool_call in message.tool_calls:
+                lines.append(f"Advisor called {tool_call['name']}: {tool_call['args']}")
+    return "\n\n".join(lines)
+
+
+async def summarize_history(summary: str, messages: list[AnyMessage]) -> str:
+    """Fold messages into the rolling summary.
+
+    Args:
+        summary: The summary so far ("" for the first fold)
+        messages: Messages that just aged out of the verbatim window
+
+    Returns:
+        The updated summary
+    """
+    model = get_researcher_model()
+    response = await with_backoff(lambda: model.ainvoke([
+        SystemMessage(content=HISTORY_SUMMARIZER_PROMPT.format(
+            max_words=ADVISOR_HISTORY_CONFIG["max_summary_tokens"] * 3 // 4
+        )),
+        HumanMessage(content=f"<Summary So Far>\n{summary or '(none)'}\n</Summary So Far>\n\n"
+                             f"<New Messages>\n{_transcript(messages)}\n</New Messages>")
+    ]))
+    return response.text.strip()
+
+
+async def build_history(state: dict[str, Any]) -> AdvisorHistory:
+    """Window the conversation, folding older turns into the summary when over budget.
+
+    Args:
+        state: Advisor state (messages, history_summary, summarized_messages)
+
+    Returns:
+        The summary and messages to send, and how many messages the summary now covers
+        (store it with the summary so the next turn only folds what's new)
+    """
+    messages = state["messages"]
+    summary = state.get("history_summary") or ""
+    summarized = state.get("summarized_messages") or 0
+    if summarized > len(messages):  # Conversation was reset or rewound
+        summary, summarized = "", 0
+
+    window_start = max(_window_start(messages, ADVISOR_HISTORY_CONFIG["keep_turns"]), summarized)
+    pending = messages[summarized:window_start]
+    recent = messages[window_start:]
+
+    history_tokens = estimate_tokens(summary) + _messages_tokens(pending) + _messages_tokens(recent)
+    if pending and history_tokens > ADVISOR_HISTORY_CONFIG["max_history_tokens"]:
+        summary = await summarize_history(summary, pending)
+        summarized = window_start
+        pending = []
+
+    return AdvisorHistory(summary=summary, messages=pending + recent, summarized_messages=summarized)
+
+
+def format_history_summary(summary: str | None) -> str:
+    """Render the rolling summary for the system prompt ("" when there is none)."""
+    if not summary:
+        return ""
+    return f"<Earlier Conversation Summary>\n{summary}\n</Earlier Conversation Summary>"
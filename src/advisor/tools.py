@@ -5,27 +5,48 @@ This module provides the tools used by the advisor agent:
 2. execute_research: Trigger to launch deep research
 """
 
-from typing import List
-import os
+import asyncio
+import logging
+from typing import Any, List
 
 from langchain_core.tools import tool
 from langchain_core.messages import SystemMessage, HumanMessage
-from tavily import TavilyClient
 
 from src.advisor.prompts import SEARCH_SUMMARIZER_PROMPT
-from src.config import get_researcher_model
-
-
-# ===== CONFIGURATION =====
-# This model is only used to summarize the search results for the advisor to use in the conversation.
-model = get_researcher_model()
-tavily_client = TavilyClient(api_key=os.getenv("TAVILY_API_KEY"))
+from src.config import ADVISOR_SEARCH_CONFIG, get_researcher_model
+from src.shared.payloads import compact_search_results
+from src.shared.rate_limits import with_backoff
+from src.shared.replay import ReplayMismatchError
+from src.shared.search import search
+
+
+logger = logging.getLogger(__name__)
+
+# ===== HELPERS =====
+
+async def _search_with_timeout(query: str, semaphore: asyncio.Semaphore) -> dict[str, Any] | None:
+    """Run one advisor query under the concurrency limit, returning None if it times out or fails."""
+    async with semaphore:
+        try:
+            return await asyncio.wait_for(
+                search(query, max_results=ADVISOR_SEARCH_CONFIG["max_results"]),
+                timeout=ADVISOR_SEARCH_CONFIG["query_timeout"]
+            )
+        except TimeoutError:
+            logger.warning("Advisor search timed out, dropping query %r", query)
+            return None
+        except ReplayMismatchError:
+            raise  # A replay that diverged from its recording must fail, not drop the query
+        except Exception:
+            # Any other failure (HTTP, Tavily) only drops this query; the rest are still summarized
+            logger.warning("Advisor search failed, dropping query %r", query, exc_info=True)
+            return None
 
 
 # ===== TOOLS =====
 
 @tool(parse_docstring=True)
-def search_web(queries: List[str], research_focus: str) -> str:
+async def search_web(queries: List[str], research_focus: str) -> str:
     """Tool to search the web for recent news and niche information.
 
     Use this tool when the user's research focus is a current event, recent news,
@@ -43,24 +64,34 @@ def search_web(queries: List[str], research_focus: str) -> str:
     Returns:
         A string summarizing the search results
     """
-    search_results = []
-    for query in queries:
-        # Get results for each query
-        query_results = tavily_client.search(query, max_results=2)
-        search_results.append(query_results)
+    # Dispatch all queries at once so the turn costs one round trip, not one per query.
+    # Slow or failed queries are dropped and the rest are still summarized.
+    semaphore = asyncio.Semaphore(ADVISOR_SEARCH_CONFIG["max_concurrency"])
+    query_results = await asyncio.gather(*[_search_with_timeout(query, semaphore) for query in queries])
+    search_results = [results for results in query_results if results is not None]
+    if not search_results:
+        return "Search failed or timed out for all queries. Continue the conversation with your own knowledge."
     
     # Summarize results with research focus
     system_message = SystemMessage(content=SEARCH_SUMMARIZER_PROMPT.format(
         research_focus=research_focus
     ))
-    results_to_summarize = HumanMessage(content=str(search_results))
-    results_summary = model.invoke([system_message, results_to_summarize]).content
+    # Only title, URL and trimmed content reach the summarizer (deduplicated, within budget)
+    payload = compact_search_results(
+        search_results,
+        max_tokens=ADVISOR_SEARCH_CONFIG["max_payload_tokens"],
+        max_content_chars=ADVISOR_SEARCH_CONFIG["max_content_chars"]
+    )
+    results_to_summarize = HumanMessage(content=payload.text)
+    # The researcher model is only used here to summarize the search results for the advisor.
+    model = get_researcher_model()
+    results_summary = (await with_backoff(lambda: model.ainvoke([system_message, results_to_summarize]))).content
     
     return results_summary
 
 
 @tool(parse_docstring=True)
-def execute_research(research_topic: str, research_scope: str) -> str:
+async def execute_research(research_topic: str, research_scope: str) -> str:
     """Tool to launch comprehensive deep research.
 
     Use this when the user has confirmed they want to proceed with research.
@@ -0,0 +1,155 @@
+"""Batch research for queued briefs.
+
+Every deep_research_agent invocation runs in isolation: its own subagents, its own
+search traffic, and an advisor conversation first. For a queue of briefs whose
+topic and scope are already known, run_research_batch() skips the advisor and
+researches them in one process:
+
+- at most BATCH_CONFIG["max_concurrent_runs"] briefs at once, the rest queue
+- subagents and chat model calls are bounded across all runs (see
+  src/shared/limits.py), and provider calls queue for the process-wide rate
+  limits (see src/shared/rate_limits.py), so throughput follows provider quotas
+- identical searches are shared across runs (one batch-wide search coordinator,
+  on top of the process-wide search cache)
+
+A failed brief doesn't stop the others; its error is returned with its result.
+
+    python -m src.batch briefs.jsonl --out reports/
+
+where each line of briefs.jsonl is {"research_topic": ..., "research_scope": ..., "research_profile": ...}.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from langgraph.graph import END, START, StateGraph
+
+from src.config import BATCH_CONFIG, TRACING_CONFIG
+from src.report_writer.report_writer import write_final_report
+from src.researcher import deep_research_supervisor
+from src.shared.limits import GlobalLimits, use_global_limits
+from src.shared.metering import metered
+from src.shared.search import SearchCoordinator, use_search_coordinator
+from src.shared.tracing import enable_tracing
+from src.state import FullResearchState
+
+# ===== RESEARCH-ONLY GRAPH =====
+# The main graph without the advisor: a brief goes straight to the supervisor.
+
+research_builder = StateGraph(FullResearchState)
+research_builder.add_node("supervisor", metered("supervisor", deep_research_supervisor))
+research_builder.add_node("write_report", metered("write_report", write_final_report))
+research_builder.add_edge(START, "supervisor")
+research_builder.add_edge("supervisor", "write_report")
+research_builder.add_edge("write_report", END)
+
+research_agent = research_builder.compile()
+
+# Tracing is opt-in (see src/shared/tracing.py)
+if TRACING_CONFIG["enabled"]:
+    enable_tracing()
+
+
+# ===== BATCH =====
+
+@dataclass
+class ResearchBrief:
+    """One queued research request."""
+
+    research_topic: str
+    research_scope: str
+    research_profile: str = ""  # Budget profile from RESEARCH_BUDGET_PROFILES (empty means the default)
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one brief."""
+
+    brief: ResearchBrief
+    state: dict[str, Any] | None  # Final graph state (final_report, usage, research_usage, ...)
+    error: str | None
+    seconds: float
+
+
+async def _research(brief: ResearchBrief, runs: asyncio.Semaphore) -> BatchResult:
+    """Research one brief once a run slot is free."""
+    async with runs:
+        start = time.monotonic()
+        try:
+            state = await research_agent.ainvoke({
+                "research_topic": brief.research_topic,
+                "research_scope": brief.research_scope,
+                "research_profile": brief.research_profile,
+                "user_approved": True
+            })
+            return BatchResult(brief=brief, state=state, error=None, seconds=time.monotonic() - start)
+        except Exception as error:
+            return BatchResult(brief=brief, state=None, error=repr(error), seconds=time.monotonic() - start)
+
+
+async def run_research_batch(
+    briefs: list[ResearchBrief],
+    max_concurrent_runs: int | None = None,
+    limits: GlobalLimits | None = None,
+    searches: SearchCoordinator | None = None
+) -> list[BatchResult]:
+    """Research many briefs concurrently under shared limits.
+
+    Args:
+        briefs: Briefs to research
+        max_concurrent_runs: Briefs researched at once (BATCH_CONFIG by default)
+        limits: Limits shared by all runs (GlobalLimits.from_config() by default)
+        searches: Coordinator shared by all runs, pass one to read its usage() afterwards
+
+    Returns:
+        One result per brief, in the same order
+    """
+    runs = asyncio.Semaphore(max_concurrent_runs or BATCH_CONFIG["max_concurrent_runs"])
+    with use_global_limits(limits or GlobalLimits.from_config()), use_search_coordinator(searches or SearchCoordinator()):
+        return await asyncio.gather(*[_research(brief, runs) for brief in briefs])
+
+
+# ===== CLI =====
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")[:60] or "report"
+
+
+def main() -> None:
+    """Research every brief of a JSON lines file and write one markdown report per brief."""
+    parser = argparse.ArgumentParser(description="Research a batch of briefs without the advisor.")
+    parser.add_argument("briefs", help="JSON lines file, one brief per line")
+    parser.add_argument("--out", default="reports", help="Directory for the reports")
+    parser.add_argument("--max-concurrent-runs", type=int, help="Briefs researched at once")
+    args = parser.parse_args()
+
+    with open(args.briefs, encoding="utf-8") as briefs_file:
+        briefs = [ResearchBrief(**json.loads(line)) for line in briefs_file if line.strip()]
+
+    searches = SearchCoordinator()
+    start = time.monotonic()
+    results = asyncio.run(run_research_batch(briefs, args.max_concurrent_runs, searches=searches))
+    os.makedirs(args.out, exist_ok=True)
+    for index, result in enumerate(results, 1):
+        if result.error:
+            print(f"[{index}] FAILED {result.brief.research_topic}: {result.error}")  # noqa: T201
+            continue
+        path = os.path.join(args.out, f"{index:03d}-{_slug(result.brief.research_topic)}.md")
+        with open(path, "w", encoding="utf-8") as report_file:
+            report_file.write(result.state["final_report"])
+        print(f"[{index}] {result.seconds:7.1f}s  {path}")  # noqa: T201
+    usage = searches.usage()
+    print(  # noqa: T201
+        f"{len(briefs)} briefs in {time.monotonic() - start:.1f}s, "
+        f"{usage['upstream_calls']} searches for {usage['requests']} requests"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,36 +2,62 @@
 Configuration for Deep Research Agent system.
 
 All models, limits, and behavioral parameters are defined here.
+
+Model getters only build a client on first call, so importing the graph doesn't
+construct any models (or need API keys). Models come from a shared registry
+(src/shared/models.py), so agents with the same configuration share one client.
 """
 
-from langchain.chat_models import init_chat_model
+from src.shared.models import get_chat_model
 
 
 # ===== ADVISOR CONFIGURATION =====
 # We are choosing Claude for a warm and friendly tone.
 # Temperature is high to make the advisor more divergent and exploratory with the user.
 ADVISOR_CONFIG = {
+    "provider": "anthropic",
     "model": "claude-sonnet-4-5-20250929",
     "temperature": 0.8
 }
 
 def get_advisor_model():
     """Get initialized advisor model."""
-    return init_chat_model(
+    return get_chat_model(
+        provider=ADVISOR_CONFIG["provider"],
         model=ADVISOR_CONFIG["model"],
         temperature=ADVISOR_CONFIG["temperature"]
     )
 
+# The advisor's search_web tool runs its queries concurrently while the user waits.
+ADVISOR_SEARCH_CONFIG = {
+    "max_results": 2,            # Results per query
+    "max_concurrency": 3,        # Queries in flight at once
+    "query_timeout": 10.0,       # Seconds before a slow query is dropped (others still get summarized)
+    "max_content_chars": 600,    # Content kept per result before summarizing
+    "max_payload_tokens": 2000   # Token budget for all results sent to the summarizer
+}
+
+# The advisor sends recent turns verbatim and folds older ones into a rolling summary
+# (see src/advisor/history.py), so long conversations keep a flat per-turn cost.
+ADVISOR_HISTORY_CONFIG = {
+    "keep_turns": 6,                # Most recent user turns always sent verbatim
+    "max_history_tokens": 6000,     # Older turns are summarized once the history exceeds this
+    "max_summary_tokens": 600,      # Target length of the rolling summary
+    "max_tool_result_chars": 2000   # Tool output kept per result when summarizing
+}
+
 
 # ===== RESEARCH SUPERVISOR CONFIGURATION =====
 RESEARCH_SUPERVISOR_CONFIG = {
+    "provider": "anthropic",
     "model": "claude-sonnet-4-5-20250929",
     "temperature": 0
 }
 
 def get_supervisor_model():
     """Get initialized supervisor model."""
-    return init_chat_model(
+    return get_chat_model(
+        provider=RESEARCH_SUPERVISOR_CONFIG["provider"],
         model=RESEARCH_SUPERVISOR_CONFIG["model"],
         temperature=RESEARCH_SUPERVISOR_CONFIG["temperature"]
     )
@@ -41,13 +67,15 @@ def get_supervisor_model():
 # Choosing GPT-5-mini to save costs on token-heavy tasks. 
 # Temperature is 0 to avoid hallucinations.
 RESEARCH_SUBAGENT_CONFIG = {
+    "provider": "openai",
     "model": "gpt-5-mini",
     "temperature": 0
 }
 
 def get_researcher_model():
     """Get initialized researcher model."""
-    return init_chat_model(
+    return get_chat_model(
+        provider=RESEARCH_SUBAGENT_CONFIG["provider"],
         model=RESEARCH_SUBAGENT_CONFIG["model"],
         temperature=RESEARCH_SUBAGENT_CONFIG["temperature"]
     )
@@ -57,26 +85,170 @@ def get_researcher_model():
 # Choosing Claude for a warm, natural output.
 # Temperature is 0 to avoid hallucinations.
 REPORT_WRITER_CONFIG = {
+    "provider": "anthropic",
     "model": "claude-sonnet-4-5-20250929",
     "temperature": 0,
-    "max_tokens": 6000 # Modify for longer reports
+    "max_tokens": 6000, # Modify for longer reports (per section in "sectioned" mode)
+    "stream_report": True, # Forward report tokens through the main graph's "custom" stream as they're written
+    # "agent": one deep agent writes the whole report in a single call
+    # "sectioned": outline, then sections drafted concurrently and stitched (see src/report_writer/sectioned.py)
+    "mode": "agent",
+    "max_concurrent_sections": 5 # Sections drafted at once in "sectioned" mode
 }
 
 def get_report_writer_model():
     """Get initialized report writer model."""
-    return init_chat_model(
+    return get_chat_model(
+        provider=REPORT_WRITER_CONFIG["provider"],
         model=REPORT_WRITER_CONFIG["model"],
         temperature=REPORT_WRITER_CONFIG["temperature"],
         max_tokens=REPORT_WRITER_CONFIG["max_tokens"]
     )
 
+# The report writer receives the index, all findings and merged sources up front
+# (see src/report_writer/bundle.py) instead of crawling the filesystem with tools.
+REPORT_BUNDLE_CONFIG = {
+    "max_tokens": 60000   # Budget for pre-loaded research; findings beyond it are left for read_file
+}
+
+
+# ===== MODEL CLIENT POOLS =====
+# Connection pool shared by every model of a provider (see src/shared/models.py).
+# Concurrent research runs reuse these warm connections instead of opening new ones.
+# Applies to OpenAI and Anthropic models.
+MODEL_CLIENT_POOL_CONFIG = {
+    "max_connections": 100,           # Upper bound on concurrent requests per provider
+    "max_keepalive_connections": 20,  # Warm connections kept open between calls
+    "keepalive_expiry": 60.0          # Seconds an idle connection is kept alive
+}
+
+
+# ===== MODEL PRICING =====
+# USD per million tokens, used to estimate cost per node and agent (see src/shared/metering.py).
+# Models missing here are metered for tokens and latency only.
+MODEL_PRICING = {
+    "claude-sonnet-4-5-20250929": {
+        "input": 3.00,
+        "output": 15.00,
+        "cache_read": 0.30,    # Prompt cache hits
+        "cache_write": 3.75    # Prompt cache writes (Anthropic charges a premium)
+    },
+    "gpt-5-mini": {
+        "input": 0.25,
+        "output": 2.00,
+        "cache_read": 0.025,
+        "cache_write": 0.25    # OpenAI caches automatically at the normal input price
+    }
+}
+
+
+# ===== TRACING =====
+# Spans for every graph node, model call, subagent task, tool call and search, in the
+# OpenTelemetry span format (see src/shared/tracing.py). View a trace offline with:
+#   python -m src.shared.tracing .cache/traces/spans.jsonl
+TRACING_CONFIG = {
+    "enabled": False,                     # Opt-in: the graph entry points enable it when set
+    "exporter": "file",                   # "file" (JSON lines at path) or "stdout"
+    "path": ".cache/traces/spans.jsonl",
+    "max_bytes": 50_000_000,              # Rotate the file once it reaches this size
+    "backup_count": 2,                    # Rotated files kept (spans.jsonl.1, .2)
+    "flush_interval": 1.0                 # Seconds between background writes of buffered spans
+}
+
 
 # ===== RESEARCH BEHAVIORAL LIMITS =====
 # These parameters heavily affect cost of research and latency!!!
-RESEARCH_LIMITS = {
-    "max_subagents": 5,              # Max concurrent subagents supervisor can spawn
-    "max_supervisor_iterations": 6,  # Max task() calls supervisor can make
-    "max_researcher_searches": 3     # Max searches each researcher should perform
+# Budgets are enforced at runtime across the supervisor and every research-agent
+# (see src/researcher/budget.py). Pick a profile per run with state["research_profile"].
+RESEARCH_BUDGET_PROFILES = {
+    "quick": {
+        "max_subagents": 2,                # Max concurrent subagents supervisor can spawn
+        "max_supervisor_iterations": 3,    # Max task() calls supervisor can make
+        "max_researcher_searches": 2,      # Max searches each researcher can perform
+        "max_search_calls": 6,             # Max searches across the whole run
+        "max_tokens": 150_000,             # Max model tokens (input + output) across the whole run
+        "max_wall_clock_seconds": 180      # Max research time before delegation and searches are refused
+    },
+    "standard": {
+        "max_subagents": 5,
+        "max_supervisor_iterations": 6,
+        "max_researcher_searches": 3,
+        "max_search_calls": 18,
+        "max_tokens": 500_000,
+        "max_wall_clock_seconds": 600
+    },
+    "deep": {
+        "max_subagents": 8,
+        "max_supervisor_iterations": 12,
+        "max_researcher_searches": 5,
+        "max_search_calls": 60,
+        "max_tokens": 1_500_000,
+        "max_wall_clock_seconds": 1800
+    }
+}
+DEFAULT_RESEARCH_PROFILE = "standard"
+
+# Once a wall-clock or token budget runs out, agents get this much extra (as a fraction
+# of the budget) to write up what they have before the run is stopped outright.
+RESEARCH_BUDGET_WRAP_UP = 0.2
+
+# Novelty tracking across a run (see src/researcher/novelty.py). Searches that mostly
+# return sources the run already has are flagged as saturated, so researchers stop early
+# and the supervisor stops delegating once the whole run has converged.
+NOVELTY_CONFIG = {
+    "enabled": True,
+    "shingle_size": 5,                      # Words per shingle when comparing result content
+    "duplicate_similarity": 0.7,            # Share of a result's shingles already seen to count it as a repeat
+    "saturation_threshold": 0.34,           # A search is saturated when fewer than this share of its results are new
+    "saturation_window": 3,                 # Recent searches averaged to decide the run is saturated
+    "stop_delegation_when_saturated": True  # Refuse new task() calls once the run is saturated
+}
+
+# Batch research (see src/batch.py): many briefs researched at once in one process.
+# Per-run budgets still apply; these limits are shared by every run of the batch
+# (see src/shared/limits.py), so throughput follows provider quotas, not batch size.
+BATCH_CONFIG = {
+    "max_concurrent_runs": 4,           # Briefs researched at once (the rest queue)
+    "max_concurrent_subagents": 12,     # research-agents running at once across all runs
+    "max_concurrent_model_calls": 16    # Chat model calls in flight at once across all runs
+}
+
+# Provider rate limits (see src/shared/rate_limits.py), shared by every call in the process.
+# Calls wait for room in their provider's and model's token buckets instead of hitting 429s,
+# queued by priority (the advisor before background research). Set them to your account's
+# tier; None means no limit. Tokens are input + output.
+PROVIDER_RATE_LIMITS = {
+    "anthropic": {
+        "requests_per_minute": 1000,
+        "tokens_per_minute": 450_000
+    },
+    "openai": {
+        "requests_per_minute": 500,
+        "tokens_per_minute": 500_000
+    },
+    "tavily": {
+        "requests_per_minute": 100,
+        "tokens_per_minute": None
+    }
+}
+MODEL_RATE_LIMITS = {
+    "claude-sonnet-4-5-20250929": {
+        "requests_per_minute": 1000,
+        "tokens_per_minute": 450_000
+    },
+    "gpt-5-mini": {
+        "requests_per_minute": 500,
+        "tokens_per_minute": 500_000
+    }
+}
+
+# Retries of rate limited or overloaded provider calls, and of failed Tavily calls
+# (the model SDKs retry timeouts, server and connection errors themselves)
+RATE_LIMIT_BACKOFF = {
+    "max_retries": 4,       # Retries before the error is raised
+    "initial_delay": 1.0,   # Seconds before the first retry, doubled for each next one
+    "max_delay": 60.0,      # Cap on the delay
+    "jitter": 0.5           # Random spread of each delay (+-50%), so paused callers don't retry in lockstep
 }
 
 
@@ -88,6 +260,48 @@ TAVILY_CONFIG = {
     "include_raw_content": False   # Don't include full webpage HTML
 }
 
+# Shared async HTTP pool used by every Tavily call (see src/shared/search.py).
+# All subagents reuse these keep-alive connections instead of opening their own.
+TAVILY_CLIENT_CONFIG = {
+    "max_connections": 20,           # Upper bound on concurrent Tavily requests
+    "max_keepalive_connections": 10, # Warm connections kept open between calls
+    "keepalive_expiry": 30.0,        # Seconds an idle connection is kept alive
+    "timeout": 30.0                  # Per-request timeout in seconds
+}
+
+# Search result cache (see src/shared/cache.py).
+# Repeated queries across runs are served locally instead of paying a Tavily round trip.
+SEARCH_CACHE_CONFIG = {
+    "enabled": True,
+    "memory_max_entries": 512,                   # In-memory LRU size
+    "sqlite_path": ".cache/search_cache.sqlite", # On-disk tier, set to None for memory only
+    "ttl_seconds": {
+        "general": 7 * 24 * 3600,                # Evergreen content, one week
+        "finance": 3600,                         # Markets move, one hour
+        "news": 1800                             # Breaking news, 30 minutes
+    }
+}
+
+
+# ===== FILESYSTEM BLOB OFFLOAD =====
+# Raw search dumps (and any large file) are stored in a local content-addressed
+# blob store instead of graph state, which only keeps a short reference.
+# Keeps checkpoints small as research depth grows (see src/shared/backends.py).
+BLOB_STORE_CONFIG = {
+    "enabled": True,
+    "root_dir": ".cache/blobs",                # Where blobs are written
+    "offload_patterns": ["search_*_raw.md"],   # Filenames always offloaded
+    "min_offload_bytes": 16_000                # Any file at least this large is offloaded too
+}
+
+
+# ===== CHECKPOINT CONFIGURATION =====
+# FullResearchState.files is checkpointed as per-path deltas (see src/state.py).
+# A full snapshot is written every N updates so restoring state never replays long histories.
+CHECKPOINT_CONFIG = {
+    "files_snapshot_frequency": 20
+}
+
 
 # ===== FILE PATH CONSTANTS =====
 # These are used to coordinate research between the supervisor and the researcher subagents.
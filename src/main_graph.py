@@ -11,7 +11,10 @@ from typing_extensions import Literal
 from langgraph.graph import StateGraph, START, END
 
 # State
+from src.config import TRACING_CONFIG
 from src.state import FullResearchState
+from src.shared.metering import metered
+from src.shared.tracing import enable_tracing
 
 # Agents
 from src.advisor.advisor_agent import advisor_agent 
@@ -33,10 +36,10 @@ def route_after_advisor(state: FullResearchState) -> Literal["supervisor", "__en
 # StateGraph instance
 full_builder = StateGraph(FullResearchState)
 
-# Add nodes
-full_builder.add_node("advisor", advisor_agent)
-full_builder.add_node("supervisor", deep_research_supervisor)
-full_builder.add_node("write_report", write_final_report)
+# Add nodes (each one records its token/cost usage into state["usage"])
+full_builder.add_node("advisor", metered("advisor", advisor_agent))
+full_builder.add_node("supervisor", metered("supervisor", deep_research_supervisor))
+full_builder.add_node("write_report", metered("write_report", write_final_report))
 
 # Add edges
 full_builder.add_edge(START, "advisor")
@@ -47,3 +50,7 @@ full_builder.add_edge("write_report", END)
 # Compile
 deep_research_agent = full_builder.compile()
 
+# Tracing is opt-in (see src/shared/tracing.py)
+if TRACING_CONFIG["enabled"]:
+    enable_tracing()
+
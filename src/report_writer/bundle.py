@@ -0,0 +1,99 @@
+"""Deterministic research bundle for the report writer.
+
+Without this, the report writer spends several sequential LLM round trips calling
+ls and read_file on the index, every findings.md and every sources.json before it
+writes a word. This pre-stage reads those files straight from `state["files"]` and
+assembles them into one context block (within a token budget), so the writer can
+start drafting in its first turn.
+
+Findings are included with their citations already renumbered to one global
+table (see citations.py), followed by that table as the source list.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.config import RESEARCH_BASE_DIR, RESEARCH_INDEX_PATH
+from src.report_writer.citations import CitationTable, build_citation_table
+from src.shared.blob_store import resolve_file_content
+from src.shared.utils import estimate_tokens
+
+FINDINGS_FILENAME = "findings.md"
+
+
+@dataclass
+class ResearchBundle:
+    """Pre-assembled research material for the report writer."""
+
+    text: str
+    findings_paths: list[str] = field(default_factory=list)  # Findings included in full
+    omitted_paths: list[str] = field(default_factory=list)   # Findings that didn't fit the budget
+    citations: CitationTable = field(default_factory=CitationTable)
+    findings: dict[str, str] = field(default_factory=dict)   # Every findings file, renumbered to global citations
+
+
+def _read(files: dict[str, Any], path: str) -> str:
+    """Read a file from state, resolving blob references. Missing files read as empty."""
+    if path not in files:
+        return ""
+    return resolve_file_content(files[path])
+
+
+def find_findings_paths(files: dict[str, Any]) -> list[str]:
+    """List findings files in index order, followed by any the index doesn't mention."""
+    all_findings = sorted(
+        path for path in files
+        if path.startswith(f"{RESEARCH_BASE_DIR}/") and path.endswith(f"/{FINDINGS_FILENAME}")
+    )
+    index = _read(files, RESEARCH_INDEX_PATH)
+    indexed = [path for path in dict.fromkeys(re.findall(r"/research/\S+?/findings\.md", index)) if path in files]
+    return indexed + [path for path in all_findings if path not in indexed]
+
+
+def build_research_bundle(files: dict[str, Any], max_tokens: int) -> ResearchBundle:
+    """Assemble the index, findings files and merged sources into one context block.
+
+    Findings are added in index order while they fit the token budget; any that
+    don't are listed by path so the writer can still read them with read_file
+    (pass bundle.findings to the writer's filesystem so those reads are renumbered too).
+
+    Args:
+        files: The research filesystem (state["files"])
+        max_tokens: Token budget for the whole bundle
+
+    Returns:
+        ResearchBundle with the text to hand to the report writer
+    """
+    findings_paths = find_findings_paths(files)
+    citations, findings = build_citation_table(files, findings_paths)
+
+    index_section = f"<File path=\"{RESEARCH_INDEX_PATH}\">\n{_read(files, RESEARCH_INDEX_PATH)}\n</File>"
+    sources_section = "<Sources>\n" + "\n".join(
+        f"[{number}] {source['title']}: {source['url']}" for number, source in enumerate(citations.sources, 1)
+    ) + "\n</Sources>"
+
+    sections = [index_section]
+    used_tokens = estimate_tokens(index_section) + estimate_tokens(sources_section)
+    bundle = ResearchBundle(text="", citations=citations, findings=findings)
+
+    for path in findings_paths:
+        section = f"<File path=\"{path}\">\n{findings[path]}\n</File>"
+        section_tokens = estimate_tokens(section)
+        if used_tokens + section_tokens > max_tokens:
+            bundle.omitted_paths.append(path)
+            continue
+        sections.append(section)
+        bundle.findings_paths.append(path)
+        used_tokens += section_tokens
+
+    sections.append(sources_section)
+    if bundle.omitted_paths:
+        sections.append(
+            "<Not Included>\nThese findings files didn't fit in this message. Read them with read_file:\n"
+            + "\n".join(f"- {path}" for path in bundle.omitted_paths)
+            + "\n</Not Included>"
+        )
+
+    bundle.text = "\n\n".join(sections)
+    return bundle
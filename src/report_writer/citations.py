@@ -0,0 +1,210 @@
+"""Deterministic citation merging for the final report.
+
+Every researcher numbers its own sources from [1] in findings.md and sources.json.
+This module renumbers and merges them across subtopics in plain Python, rather than
+leaving it to the report writer LLM:
+
+1. Parse every subtopic's sources, deduplicate them by canonical URL and build one
+   global citation table
+2. Rewrite the inline [n] markers in each findings file to the global numbers, so
+   the LLM only ever sees pre-numbered material
+3. After the report is written, renumber the citations it actually used to 1..N
+   and generate the Sources section without spending any model tokens
+"""
+
+import json
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import Any
+
+from src.shared.blob_store import resolve_file_content
+from src.shared.utils import canonicalize_url, trim_url
+
+logger = logging.getLogger(__name__)
+
+SOURCES_FILENAME = "sources.json"
+MAX_CITATION_NUMBER = 999
+
+# [1], [2, 3] or [2,3] (at most 3 digits, so bracketed years like [2024] are left alone)
+_CITATION_PATTERN = re.compile(r"\[(\d{1,3}(?:\s*,\s*\d{1,3})*)\]")
+# "[N] Title: URL" lines, as researchers write them in the findings' Sources section
+_SOURCE_LINE_PATTERN = re.compile(r"^\s*[-*]?\s*\[(\d+)\]\s*(.*?):?\s*(https?://\S+)\s*$", re.MULTILINE)
+# A "## Sources" (or "## References") heading; the section is regenerated if it ends the text
+_SOURCES_HEADING_PATTERN = re.compile(r"^(#{1,3})\s*(?:Sources|References)\s*$", re.MULTILINE | re.IGNORECASE)
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s", re.MULTILINE)
+
+
+# ===== CITATION TABLE =====
+
+@dataclass
+class CitationTable:
+    """Global, deduplicated source list. Source N is sources[N - 1]."""
+
+    sources: list[dict[str, str]] = field(default_factory=list)
+    _numbers: dict[str, int] = field(default_factory=dict)
+
+    def add(self, title: str, url: str) -> int:
+        """Add a source (if new) and return its global number."""
+        key = canonicalize_url(url)
+        if key not in self._numbers:
+            self.sources.append({"title": title or url, "url": url})
+            self._numbers[key] = len(self.sources)
+        return self._numbers[key]
+
+    def get(self, number: int) -> dict[str, str] | None:
+        """Get a source by its global number."""
+        return self.sources[number - 1] if 0 < number <= len(self.sources) else None
+
+
+def load_sources(files: dict[str, Any], findings_path: str) -> list[dict[str, Any]]:
+    """Load the sources.json next to a findings file (empty if missing or malformed)."""
+    sources_path = findings_path.rsplit("/", 1)[0] + f"/{SOURCES_FILENAME}"
+    if sources_path not in files:
+        return []
+    try:
+        sources = json.loads(resolve_file_content(files[sources_path]) or "[]")
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(sources, list):
+        return []
+    return [source for source in sources if isinstance(source, dict) and source.get("url")]
+
+
+def parse_local_sources(findings: str, sources: list[dict[str, Any]]) -> dict[int, dict[str, str]]:
+    """Map a findings file's local citation numbers to their sources.
+
+    Reads the "[N] Title: URL" lines of the findings' Sources section; falls back to
+    the order of sources.json for numbers not listed there.
+    """
+    local = {
+        index: {"title": source.get("title", source["url"]), "url": source["url"]}
+        for index, source in enumerate(sources, 1)
+    }
+    for number, title, url in _SOURCE_LINE_PATTERN.findall(findings):
+        local[int(number)] = {"title": title.strip() or url, "url": trim_url(url)}
+    return local
+
+
+def _rewrite_citations(text: str, number_for: dict[int, int], where: str) -> str:
+    """Rewrite [n] markers through a number mapping.
+
+    Numbers that don't map (e.g. a source the model made up) are kept but flagged
+    as [n?], so they can't pass for another source's number, and logged.
+    """
+    unmapped: set[int] = set()
+
+    def replace(match: re.Match) -> str:
+        markers = []
+        for number in (int(n) for n in match.group(1).split(",")):
+            if number in number_for:
+                markers.append(f"[{number_for[number]}]")
+            else:
+                unmapped.add(number)
+                markers.append(f"[{number}?]")
+        return "".join(dict.fromkeys(markers))
+
+    rewritten = _CITATION_PATTERN.sub(replace, text)
+    if unmapped:
+        logger.warning("Citations in %s match no known source, flagged as [n?]: %s", where, sorted(unmapped))
+    return rewritten
+
+
+def strip_sources_section(text: str) -> str:
+    """Remove a trailing Sources/References section (it's regenerated from the table).
+
+    Only the last such section is removed, and only if no heading of the same or a
+    higher level follows it, so report content after a mid-text "Sources" survives.
+    """
+    headings = list(_SOURCES_HEADING_PATTERN.finditer(text))
+    if not headings:
+        return text.rstrip()
+    last = headings[-1]
+    level = len(last.group(1))
+    if any(len(heading.group(1)) <= level for heading in _HEADING_PATTERN.finditer(text, last.end())):
+        return text.rstrip()
+    return text[:last.start()].rstrip()
+
+
+def build_citation_table(
+    files: dict[str, Any],
+    findings_paths: list[str]
+) -> tuple[CitationTable, dict[str, str]]:
+    """Merge every subtopic's sources and renumber all findings to global citations.
+
+    Sources are numbered in order of first citation across findings (in the order
+    given), then any uncited sources from sources.json are appended.
+
+    Args:
+        files: The research filesystem (state["files"])
+        findings_paths: Findings files, in report order
+
+    Returns:
+        The global citation table, and each findings file's content rewritten
+        to global numbers (with its local Sources section removed)
+    """
+    table = CitationTable()
+    local_maps: dict[str, dict[int, dict[str, str]]] = {}
+    rewritten: dict[str, str] = {}
+
+    for path in findings_paths:
+        findings = resolve_file_content(files[path])
+        local_sources = parse_local_sources(findings, load_sources(files, path))
+        local_maps[path] = local_sources
+        body = strip_sources_section(findings)
+
+        # Number sources in order of first citation in the body
+        number_for: dict[int, int] = {}
+        for match in _CITATION_PATTERN.finditer(body):
+            for local_number in (int(n) for n in match.group(1).split(",")):
+                source = local_sources.get(local_number)
+                if source is not None and local_number not in number_for:
+                    number_for[local_number] = table.add(source["title"], source["url"])
+        rewritten[path] = _rewrite_citations(body, number_for, path)
+
+    for local_sources in local_maps.values():
+        for _, source in sorted(local_sources.items()):
+            table.add(source["title"], source["url"])
+
+    if len(table.sources) > MAX_CITATION_NUMBER:
+        logger.warning(
+            "%d sources, citations above [%d] can't be told from bracketed years and won't be renumbered",
+            len(table.sources), MAX_CITATION_NUMBER
+        )
+    return table, rewritten
+
+
+# ===== FINAL REPORT =====
+
+def format_bibliography(sources: list[dict[str, str]]) -> str:
+    """Format a Sources section as "[N] Title: URL" lines."""
+    return "## Sources\n" + "\n".join(
+        f"[{number}] {source['title']}: {source['url']}" for number, source in enumerate(sources, 1)
+    )
+
+
+def finalize_report(report: str, table: CitationTable) -> str:
+    """Renumber the report's citations to 1..N and append the generated Sources section.
+
+    Citations are renumbered in order of first appearance, so the bibliography has
+    no gaps and lists exactly the sources the report cites, and citations that
+    match no source are flagged as [n?]. A Sources section ending the model's
+    report is replaced.
+    """
+    body = strip_sources_section(report)
+
+    number_for: dict[int, int] = {}
+    cited: list[dict[str, str]] = []
+    for match in _CITATION_PATTERN.finditer(body):
+        for global_number in (int(n) for n in match.group(1).split(",")):
+            source = table.get(global_number)
+            if source is not None and global_number not in number_for:
+                cited.append(source)
+                number_for[global_number] = len(cited)
+
+    if not cited:  # Nothing we can resolve, leave the model's version as is
+        if _CITATION_PATTERN.search(body):
+            logger.warning("No citation in the report matches a known source, leaving it as written")
+        return report
+    body = _rewrite_citations(body, number_for, "the report")
+    return f"{body}\n\n{format_bibliography(cited)}"
@@ -5,24 +5,50 @@ Reads research findings from virtual filesystem and synthesizes
 comprehensive markdown report.
 """
 
-from deepagents import create_deep_agent
-from langchain_core.messages import HumanMessage
+import asyncio
+import logging
+from functools import cache
+
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langgraph.config import get_stream_writer
 
 from src.state import FullResearchState
-from src.config import get_report_writer_model
+from src.config import REPORT_BUNDLE_CONFIG, REPORT_WRITER_CONFIG, get_report_writer_model
+from src.shared.limits import GlobalLimitsMiddleware
+from src.shared.prompt_cache import PromptSuffixMiddleware
+from src.shared.rate_limits import BACKGROUND, RateLimitMiddleware, use_priority
+from src.report_writer.bundle import build_research_bundle
+from src.report_writer.citations import finalize_report
+from src.report_writer.sectioned import write_sectioned_report
 from src.report_writer.prompts import (
     REPORT_WRITER_SYSTEM_PROMPT,
     REPORT_WRITER_INITIAL_MESSAGE_TEMPLATE
 )
 
 
+logger = logging.getLogger(__name__)
+
+
 # ===== CREATE REPORT WRITER DEEP AGENT =====
-report_writer_agent = create_deep_agent(
-    model=get_report_writer_model(),
-    tools=[],
-    system_prompt=REPORT_WRITER_SYSTEM_PROMPT,
-    subagents=[]
-)
+# Built on first use, not at import (see get_supervisor_deep_agent).
+@cache
+def get_report_writer_agent():
+    """Get the compiled report writer deep agent."""
+    from deepagents import create_deep_agent
+
+    from src.shared.backends import get_research_backend
+
+    return create_deep_agent(
+        model=get_report_writer_model(),
+        name="report-writer",  # Attributes usage to this agent (lc_agent_name)
+        tools=[],
+        # Static prompt served from the provider's prompt cache; the date is appended per call
+        system_prompt=REPORT_WRITER_SYSTEM_PROMPT,
+        subagents=[],
+        middleware=[RateLimitMiddleware(), GlobalLimitsMiddleware(), PromptSuffixMiddleware()],
+        # Same backend as the supervisor so offloaded files resolve when read
+        backend=get_research_backend()
+    )
 
 ## Why a deep agent for a report writer?
 # We want to use the file system tools to read the findings and synthesize the report.
@@ -31,14 +57,68 @@ report_writer_agent = create_deep_agent(
 # The report writer is then in charge of synthesizing the findings into a comprehensive report.
 
 
+# ===== STREAMING =====
+# Users care more about seeing the report start than about total wall time.
+# Instead of waiting for ainvoke, we stream the writer and forward each text token of its
+# own model turns to the main graph's "custom" stream as {"final_report_delta": "..."}.
+# Text of a turn that ends up calling tools never reaches the report, so it's followed by
+# {"final_report_reset": True}: concatenating the deltas since the last reset gives the
+# writer's final message as it's being written. Citations are then renumbered and the
+# Sources section generated (finalize_report), so the stream closes with
+# {"final_report_replace": "..."}, the stored final_report, to show in place of the draft.
+# Consume with:
+#   deep_research_agent.astream(inputs, stream_mode=["custom", "updates"])
+
+async def stream_report_writer(inputs: dict) -> dict:
+    """Run the report writer agent, forwarding report tokens to the main graph stream.
+    
+    Args:
+        inputs: Input state for the report writer deep agent
+        
+    Returns:
+        Final state of the report writer agent (same as ainvoke)
+    """
+    writer = get_stream_writer()
+    final_state: dict = {}
+    turn_id = None
+    streamed = ""        # Text forwarded for the current turn
+    calls_tools = False  # The current turn called tools, so its text isn't the report
+    
+    async for mode, chunk in get_report_writer_agent().astream(inputs, stream_mode=["messages", "values"]):
+        if mode == "values":
+            final_state = chunk
+            continue
+        
+        message, metadata = chunk
+        # Only the writer's own turns (not a subagent's), streamed token by token
+        if not isinstance(message, AIMessageChunk) or metadata.get("lc_agent_name", "report-writer") != "report-writer":
+            continue
+        if message.id != turn_id:
+            turn_id, streamed, calls_tools = message.id, "", False
+        if message.tool_call_chunks and not calls_tools:
+            calls_tools = True
+            if streamed:
+                writer({"final_report_reset": True})
+        if message.text and not calls_tools:
+            writer({"final_report_delta": message.text})
+            streamed += message.text
+    
+    # Models that don't stream only deliver the finished message
+    final_text = final_state["messages"][-1].text if final_state.get("messages") else ""
+    if final_text and not streamed:
+        writer({"final_report_delta": final_text})
+    
+    return final_state
+
+
 # ===== WRAPPER FUNCTION FOR MAIN GRAPH =====
 
 async def write_final_report(state: FullResearchState) -> dict:
     """
     Generate final research report using a Deep Agent.
     
-    Reads research findings from state["files"] and synthesizes
-    into comprehensive markdown report.
+    Reads research findings from state["files"] (pre-assembled into one bundle)
+    and synthesizes them into a comprehensive markdown report.
     
     Args:
         state: State from supervisor containing research_topic, research_scope,
@@ -48,31 +128,67 @@ async def write_final_report(state: FullResearchState) -> dict:
         Updated state with final_report field populated and report in message
     """
     
+    # Long reports: draft sections concurrently instead of one serial decode
+    # Report writing is background work: its provider calls queue behind the advisor's
+    if REPORT_WRITER_CONFIG["mode"] == "sectioned":
+        if REPORT_WRITER_CONFIG["stream_report"]:
+            # Sections are drafted concurrently, so there is no single token stream to forward
+            logger.warning('"sectioned" mode doesn\'t stream report tokens, only the finished report')
+        with use_priority(BACKGROUND):
+            final_report_content = await write_sectioned_report(state)
+        if REPORT_WRITER_CONFIG["stream_report"]:
+            get_stream_writer()({"final_report_replace": final_report_content})
+        return {
+            "final_report": final_report_content,
+            "messages": [AIMessage(content=final_report_content)]
+        }
+    
     # Extract supervisor's summary from dedicated field
     # This summary is hidden from the user - it's just context for the report writer
     supervisor_summary = state.get("supervisor_summary", "Research completed.")
     
+    # Pre-assemble index, findings and sources so the writer can draft in its first turn
+    # instead of spending several round trips on ls/read_file.
+    # Built off the event loop, offloaded files are read from the blob store.
+    bundle = await asyncio.to_thread(
+        build_research_bundle, state.get("files", {}), max_tokens=REPORT_BUNDLE_CONFIG["max_tokens"]
+    )
+    
     # Prepare initial message with all context to the report writer.
     initial_message = HumanMessage(
         content=REPORT_WRITER_INITIAL_MESSAGE_TEMPLATE.format(
             research_topic=state["research_topic"],
             research_scope=state["research_scope"],
-            supervisor_summary=supervisor_summary
+            supervisor_summary=supervisor_summary,
+            research_bundle=bundle.text
         )
     )
     
-    # Invoke deep agent with files from supervisor (file system is shared across all deep agents)
-    result = await report_writer_agent.ainvoke({
+    # Invoke deep agent with files from supervisor (file system is shared across all deep agents).
+    # Findings are swapped for their renumbered versions so any read_file sees global citations too.
+    files = state.get("files", {})
+    inputs = {
         "messages": [initial_message],
-        "files": state.get("files", {}),  # All research files
+        "files": {
+            **files,  # All research files
+            **{path: {**files[path], "content": content} for path, content in bundle.findings.items()}
+        },
         "todos": []
-    })
+    }
+    with use_priority(BACKGROUND):
+        if REPORT_WRITER_CONFIG["stream_report"]:
+            result = await stream_report_writer(inputs)
+        else:
+            result = await get_report_writer_agent().ainvoke(inputs)
     
-    # Extract final report from last message
-    final_report_content = result["messages"][-1].content
+    # Extract final report from last message, then compact its citations to 1..N
+    # and generate the Sources section from the citation table (no model tokens spent).
+    final_report_content = finalize_report(result["messages"][-1].text, bundle.citations)
+    if REPORT_WRITER_CONFIG["stream_report"]:
+        get_stream_writer()({"final_report_replace": final_report_content})
     
     # Return report in both final_report field and message to the user.
     return {
         "final_report": final_report_content,
-        "messages": [result["messages"][-1]] 
+        "messages": [AIMessage(content=final_report_content)]
     }
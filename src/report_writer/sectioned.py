@@ -0,0 +1,193 @@
+"""Section-parallel report writing.
+
+The deep agent writes the whole report in one model call, so long reports are one
+slow serial decode and get cut off at REPORT_WRITER_CONFIG["max_tokens"]. In
+"sectioned" mode the report is built in three stages instead:
+
+1. Plan: a structured-output call turns /research/index.md into an outline
+   (one section per subtopic findings file)
+2. Draft: every section is written concurrently from its own findings.md, each
+   with the full max_tokens budget
+3. Stitch: a short call adds the introduction and conclusion, and the Sources
+   list is generated from the global citation table (see citations.py)
+
+Sections are drafted from findings already renumbered to global citations, so
+their numbers line up without any model involvement.
+
+Wall time then scales with the longest section rather than the whole report.
+"""
+
+import asyncio
+import logging
+from typing import Any
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel, Field, ValidationError
+
+from src.config import (
+    REPORT_WRITER_CONFIG,
+    RESEARCH_INDEX_PATH,
+    get_report_writer_model,
+)
+from src.report_writer.bundle import find_findings_paths
+from src.report_writer.citations import build_citation_table, finalize_report
+from src.report_writer.prompts import (
+    REPORT_OUTLINE_PROMPT,
+    REPORT_STITCH_MESSAGE_TEMPLATE,
+    REPORT_STITCH_PROMPT,
+    SECTION_WRITER_MESSAGE_TEMPLATE,
+    SECTION_WRITER_PROMPT,
+)
+from src.shared.blob_store import resolve_file_content
+from src.shared.limits import model_call_slot
+from src.shared.prompt_cache import render_system_message
+from src.shared.rate_limits import with_backoff
+
+logger = logging.getLogger(__name__)
+
+# ===== OUTLINE =====
+
+class OutlineSection(BaseModel):
+    """One planned report section, drafted from a single findings file."""
+
+    heading: str = Field(description="Section heading, without markdown symbols")
+    findings_path: str = Field(description="Findings file the section is based on")
+    focus: str = Field(description="What the section should emphasize given the scope")
+
+
+class ReportOutline(BaseModel):
+    """Planned structure of the report body."""
+
+    title: str = Field(description="Report title")
+    sections: list[OutlineSection]
+
+
+def _default_outline(research_topic: str, findings_paths: list[str]) -> ReportOutline:
+    """One section per findings file, in index order (used if planning fails)."""
+    return ReportOutline(
+        title=research_topic,
+        sections=[
+            OutlineSection(
+                heading=path.rsplit("/", 2)[-2].replace("_", " ").replace("-", " ").title(),
+                findings_path=path,
+                focus="Cover the key findings of this subtopic."
+            )
+            for path in findings_paths
+        ]
+    )
+
+
+async def plan_outline(state: dict[str, Any], files: dict[str, Any]) -> ReportOutline:
+    """Plan the report outline from the research index.
+
+    Sections pointing at findings files that don't exist (or at one already planned)
+    are dropped, and findings the plan left out are appended so no research is lost.
+    If the model's plan can't be parsed, the default outline is used.
+    """
+    findings_paths = find_findings_paths(files)
+    index = ""
+    if RESEARCH_INDEX_PATH in files:  # Off the event loop, it may be in the blob store
+        index = await asyncio.to_thread(resolve_file_content, files[RESEARCH_INDEX_PATH])
+
+    try:
+        planner = get_report_writer_model().with_structured_output(ReportOutline)
+        async with model_call_slot():
+            outline = await with_backoff(lambda: planner.ainvoke([
+                render_system_message(REPORT_OUTLINE_PROMPT, REPORT_WRITER_CONFIG["provider"]),
+                HumanMessage(content=(
+                    f"**Research Topic**: {state['research_topic']}\n\n"
+                    f"**Research Scope**: {state['research_scope']}\n\n"
+                    f"**Findings files**: {', '.join(findings_paths)}\n\n"
+                    f"**Research Index**:\n{index}"
+                ))
+            ]))
+    except (OutputParserException, ValidationError):
+        logger.warning("Report outline couldn't be parsed, using one section per findings file", exc_info=True)
+        return _default_outline(state["research_topic"], findings_paths)
+    if outline is None:  # The model answered without calling the outline tool
+        logger.warning("Report outline is missing, using one section per findings file")
+        return _default_outline(state["research_topic"], findings_paths)
+
+    sections = []
+    planned: set[str] = set()
+    for section in outline.sections:
+        if section.findings_path in files and section.findings_path not in planned:
+            sections.append(section)
+            planned.add(section.findings_path)
+    missing = _default_outline(outline.title, [path for path in findings_paths if path not in planned])
+    return ReportOutline(title=outline.title, sections=sections + missing.sections)
+
+
+# ===== SECTION DRAFTING =====
+
+async def draft_section(
+    state: dict[str, Any],
+    section: OutlineSection,
+    findings: str,
+    semaphore: asyncio.Semaphore
+) -> str:
+    """Draft one section from its findings file.
+
+    Every section shares the same static system prompt, so all but the first
+    can be served from the prompt cache.
+    """
+    async with semaphore, model_call_slot():
+        response = await with_backoff(lambda: get_report_writer_model().ainvoke([
+            render_system_message(SECTION_WRITER_PROMPT, REPORT_WRITER_CONFIG["provider"]),
+            HumanMessage(content=SECTION_WRITER_MESSAGE_TEMPLATE.format(
+                research_topic=state["research_topic"],
+                research_scope=state["research_scope"],
+                heading=section.heading,
+                focus=section.focus,
+                findings=findings
+            ))
+        ]))
+    return response.text.strip()
+
+
+# ===== REPORT =====
+
+async def write_sectioned_report(state: dict[str, Any]) -> str:
+    """Write the final report section by section.
+
+    Args:
+        state: Main graph state with research_topic, research_scope and files
+
+    Returns:
+        Complete markdown report with a unified Sources section
+    """
+    files = state.get("files", {})
+    outline = await plan_outline(state, files)
+
+    # Findings renumbered to one global citation table before any section sees them
+    # (off the event loop, offloaded findings are read from the blob store)
+    citations, findings = await asyncio.to_thread(
+        build_citation_table, files, [section.findings_path for section in outline.sections]
+    )
+
+    # Draft every section at once; wall time is the slowest section, not the sum
+    semaphore = asyncio.Semaphore(REPORT_WRITER_CONFIG["max_concurrent_sections"])
+    drafts = await asyncio.gather(*[
+        draft_section(state, section, findings[section.findings_path], semaphore)
+        for section in outline.sections
+    ])
+
+    body_text = "\n\n".join(drafts)
+
+    # Stitch: only the introduction and conclusion are generated here
+    async with model_call_slot():
+        stitched = await with_backoff(lambda: get_report_writer_model().ainvoke([
+            render_system_message(REPORT_STITCH_PROMPT, REPORT_WRITER_CONFIG["provider"]),
+            HumanMessage(content=REPORT_STITCH_MESSAGE_TEMPLATE.format(
+                research_topic=state["research_topic"],
+                research_scope=state["research_scope"],
+                sections=body_text
+            ))
+        ]))
+    introduction, _, conclusion = stitched.text.partition("## Conclusion")
+
+    parts = [f"# {outline.title}", introduction.strip(), body_text]
+    if conclusion.strip():
+        parts.append(f"## Conclusion\n{conclusion.strip()}")
+    return finalize_report("\n\n".join(part for part in parts if part), citations)
@@ -0,0 +1,214 @@
+"""Runtime research budgets.
+
+Enforces RESEARCH_BUDGET_PROFILES while the supervisor and its research-agents run,
+rather than only stating the limits in the prompts:
+
+- task() calls beyond max_supervisor_iterations are refused, and at most
+  max_subagents of them run at once (extra calls wait for a slot)
+- tavily_search calls are refused past max_researcher_searches per researcher
+  and max_search_calls per run
+- Once the wall-clock or token budget runs out, delegation and searches are refused
+  so the agents write up what they have; after RESEARCH_BUDGET_WRAP_UP more, the
+  run is stopped outright
+
+The budget is shared through a context variable, so one middleware instance can be
+attached to the (cached) supervisor and subagent without tying them to a profile.
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Iterator
+
+from langchain.agents.middleware import AgentMiddleware, hook_config
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.config import (
+    DEFAULT_RESEARCH_PROFILE,
+    RESEARCH_BUDGET_PROFILES,
+    RESEARCH_BUDGET_WRAP_UP,
+)
+
+# ===== BUDGET =====
+
+@dataclass
+class ResearchBudget:
+    """Limits and running totals for one research run."""
+
+    profile: str
+    max_subagents: int
+    max_supervisor_iterations: int
+    max_researcher_searches: int
+    max_search_calls: int
+    max_tokens: int
+    max_wall_clock_seconds: float
+    started_at: float = field(default_factory=time.monotonic)
+    tokens_used: int = 0
+    search_calls: int = 0
+    task_calls: int = 0
+    refused_calls: int = 0
+    _subagent_slots: asyncio.Semaphore | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_profile(cls, profile: str | None = None) -> "ResearchBudget":
+        """Create a fresh budget from one of RESEARCH_BUDGET_PROFILES.
+
+        Raises:
+            ValueError: If the profile doesn't exist
+        """
+        profile = profile or DEFAULT_RESEARCH_PROFILE
+        if profile not in RESEARCH_BUDGET_PROFILES:
+            raise ValueError(
+                f"Unknown research profile {profile!r}, expected one of {sorted(RESEARCH_BUDGET_PROFILES)}"
+            )
+        return cls(profile=profile, **RESEARCH_BUDGET_PROFILES[profile])
+
+    @property
+    def elapsed_seconds(self) -> float:
+        """Seconds since the run started."""
+        return time.monotonic() - self.started_at
+
+    @property
+    def subagent_slots(self) -> asyncio.Semaphore:
+        """Semaphore bounding concurrent subagents (created on first use, inside the run's loop)."""
+        if self._subagent_slots is None:
+            self._subagent_slots = asyncio.Semaphore(self.max_subagents)
+        return self._subagent_slots
+
+    def exhausted_reason(self, overrun: float = 0.0) -> str | None:
+        """Say which run-wide budget is spent, or None if there's budget left.
+
+        Args:
+            overrun: Extra fraction of the wall-clock and token budgets to allow
+        """
+        if self.elapsed_seconds >= self.max_wall_clock_seconds * (1 + overrun):
+            return f"wall-clock budget of {self.max_wall_clock_seconds:.0f}s reached"
+        if self.tokens_used >= self.max_tokens * (1 + overrun):
+            return f"token budget of {self.max_tokens} tokens reached"
+        return None
+
+    def usage(self) -> dict[str, Any]:
+        """Summarize what the run spent, for state and logs."""
+        return {
+            "profile": self.profile,
+            "elapsed_seconds": round(self.elapsed_seconds, 1),
+            "tokens_used": self.tokens_used,
+            "search_calls": self.search_calls,
+            "task_calls": self.task_calls,
+            "refused_calls": self.refused_calls,
+            "exhausted": self.exhausted_reason()
+        }
+
+    def describe(self) -> str:
+        """Describe the limits for the supervisor's initial message."""
+        return (
+            f"- Profile: {self.profile}\n"
+            f"- At most {self.max_subagents} research-agents running at once\n"
+            f"- At most {self.max_supervisor_iterations} task() calls in total\n"
+            f"- At most {self.max_researcher_searches} searches per research-agent "
+            f"(tell each research-agent this limit in its task)\n"
+            f"- At most {self.max_search_calls} searches across all research-agents\n"
+            f"- About {self.max_wall_clock_seconds / 60:.0f} minutes and {self.max_tokens} model tokens in total\n"
+            "Calls beyond these limits are refused. When that happens, stop delegating, "
+            "update /research/index.md and give your final summary."
+        )
+
+
+_current_budget: ContextVar[ResearchBudget | None] = ContextVar("research_budget", default=None)
+
+
+def get_current_budget() -> ResearchBudget | None:
+    """Get the budget of the research run in progress (None outside a run)."""
+    return _current_budget.get()
+
+
+@contextmanager
+def use_budget(budget: ResearchBudget) -> Iterator[ResearchBudget]:
+    """Make a budget current for everything run inside this block (including subagents)."""
+    token = _current_budget.set(budget)
+    try:
+        yield budget
+    finally:
+        _current_budget.reset(token)
+
+
+# ===== ENFORCEMENT =====
+
+def _refuse(request: Any, reason: str) -> ToolMessage:
+    """Answer a tool call with a refusal instead of running it."""
+    return ToolMessage(
+        content=f"Refused: {reason}. Finish with the research you already have.",
+        tool_call_id=request.tool_call["id"],
+        name=request.tool_call["name"],
+        status="error"
+    )
+
+
+def _search_position(messages: list[Any], tool_call_id: str) -> int:
+    """Position of a tavily_search call among this agent's searches (parallel calls included)."""
+    call_ids = [
+        tool_call["id"]
+        for message in messages if isinstance(message, AIMessage)
+        for tool_call in message.tool_calls if tool_call["name"] == "tavily_search"
+    ]
+    return call_ids.index(tool_call_id) if tool_call_id in call_ids else len(call_ids)
+
+
+class ResearchBudgetMiddleware(AgentMiddleware):
+    """Enforce the current ResearchBudget on an agent's model and tool calls.
+
+    Does nothing when no budget is current, so agents stay usable on their own.
+    """
+
+    @hook_config(can_jump_to=["end"])
+    async def abefore_model(self, state: Any, runtime: Any) -> dict[str, Any] | None:
+        """Stop the agent once the budget plus the wrap-up allowance is spent."""
+        budget = get_current_budget()
+        reason = budget.exhausted_reason(overrun=RESEARCH_BUDGET_WRAP_UP) if budget is not None else None
+        if reason is None:
+            return None
+        # The last message may be a tool result, so end on a message saying why the run stopped
+        return {
+            "messages": [AIMessage(content=(
+                f"Research stopped: {reason}. What was found so far is in the research files "
+                "(see /research/index.md)."
+            ))],
+            "jump_to": "end"
+        }
+
+    async def aafter_model(self, state: Any, runtime: Any) -> dict[str, Any] | None:
+        """Charge the model call's tokens to the budget."""
+        budget = get_current_budget()
+        message = state["messages"][-1] if state["messages"] else None
+        if budget is not None and isinstance(message, AIMessage) and message.usage_metadata:
+            budget.tokens_used += message.usage_metadata.get("total_tokens", 0)
+        return None
+
+    async def awrap_tool_call(self, request: Any, handler: Any) -> Any:
+        """Refuse task() and tavily_search calls past the limits, and bound concurrent subagents."""
+        budget = get_current_budget()
+        name = request.tool_call["name"]
+        if budget is None or name not in ("task", "tavily_search"):
+            return await handler(request)
+
+        reason = budget.exhausted_reason()
+        if reason is None and name == "task" and budget.task_calls >= budget.max_supervisor_iterations:
+            reason = f"all {budget.max_supervisor_iterations} task() calls of this run are used"
+        if reason is None and name == "tavily_search":
+            if budget.search_calls >= budget.max_search_calls:
+                reason = f"all {budget.max_search_calls} searches of this run are used"
+            elif _search_position(request.state["messages"], request.tool_call["id"]) >= budget.max_researcher_searches:
+                reason = f"you've used your {budget.max_researcher_searches} searches"
+        if reason is not None:
+            budget.refused_calls += 1
+            return _refuse(request, reason)
+
+        if name == "tavily_search":
+            budget.search_calls += 1
+            return await handler(request)
+
+        budget.task_calls += 1
+        async with budget.subagent_slots:
+            return await handler(request)
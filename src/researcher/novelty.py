@@ -0,0 +1,194 @@
+"""Novelty tracking across a research run.
+
+On broad topics search results converge quickly: after a few searches most results
+are pages the run has already collected, or the same text syndicated under another
+URL. Researchers still kept searching up to their allowance. Here every search result
+is compared against everything the run has seen so far:
+
+- by canonical URL
+- by shingled content similarity (share of the result's word 5-grams already seen)
+
+tavily_search reports how many results are new and flags saturated searches so the
+researcher stops early. Each task() result tells the supervisor how novel that
+subtopic's searches were, and once recent searches across the run are mostly
+repeats, new delegations are refused.
+"""
+
+import re
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import ToolMessage
+from langgraph.types import Command
+
+from src.config import NOVELTY_CONFIG
+from src.shared.utils import canonicalize_url
+
+# ===== TRACKER =====
+
+@dataclass
+class SearchNovelty:
+    """How many results of a search (or a subtopic's searches) were new to the run."""
+
+    new: int = 0
+    total: int = 0
+    saturated: bool = False
+
+    @property
+    def ratio(self) -> float:
+        """Fraction of the results that were new (1.0 for no results)."""
+        return self.new / self.total if self.total else 1.0
+
+
+def _shingles(text: str, size: int) -> set[int]:
+    """Hashes of the text's overlapping word n-grams (the whole text if it's shorter)."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        return {hash(tuple(words))} if words else set()
+    return {hash(tuple(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+
+class NoveltyTracker:
+    """URLs and content shingles seen so far in one research run."""
+
+    def __init__(
+        self,
+        shingle_size: int,
+        duplicate_similarity: float,
+        saturation_threshold: float,
+        saturation_window: int
+    ):
+        """Track a run with the NOVELTY_CONFIG thresholds."""
+        self.shingle_size = shingle_size
+        self.duplicate_similarity = duplicate_similarity
+        self.saturation_threshold = saturation_threshold
+        self.urls: set[str] = set()
+        self.shingles: set[int] = set()
+        self.recent: deque[float] = deque(maxlen=saturation_window)
+        self.totals = SearchNovelty()
+
+    @classmethod
+    def from_config(cls) -> "NoveltyTracker":
+        """Create a tracker configured by NOVELTY_CONFIG."""
+        return cls(
+            shingle_size=NOVELTY_CONFIG["shingle_size"],
+            duplicate_similarity=NOVELTY_CONFIG["duplicate_similarity"],
+            saturation_threshold=NOVELTY_CONFIG["saturation_threshold"],
+            saturation_window=NOVELTY_CONFIG["saturation_window"]
+        )
+
+    def _observe_result(self, result: dict[str, Any]) -> bool:
+        """Record one search result, returning whether it was new to the run."""
+        url = canonicalize_url(result.get("url", ""))
+        shingles = _shingles(result.get("content", ""), self.shingle_size)
+        similarity = len(shingles & self.shingles) / len(shingles) if shingles else 1.0
+        is_new = url not in self.urls and similarity < self.duplicate_similarity
+
+        self.urls.add(url)
+        self.shingles |= shingles
+        return is_new
+
+    def observe(self, results: list[dict[str, Any]]) -> tuple[list[bool], SearchNovelty]:
+        """Record a search's results.
+
+        Returns:
+            Whether each result is new (in order), and the search's novelty
+        """
+        flags = [self._observe_result(result) for result in results]
+        novelty = SearchNovelty(new=sum(flags), total=len(flags))
+        novelty.saturated = novelty.ratio < self.saturation_threshold
+
+        self.recent.append(novelty.ratio)
+        self.totals.new += novelty.new
+        self.totals.total += novelty.total
+        subtopic = _current_subtopic.get()
+        if subtopic is not None:
+            subtopic.new += novelty.new
+            subtopic.total += novelty.total
+        return flags, novelty
+
+    @property
+    def run_saturated(self) -> bool:
+        """Whether the run's most recent searches have mostly returned repeats."""
+        if len(self.recent) < (self.recent.maxlen or 0):
+            return False
+        return sum(self.recent) / len(self.recent) < self.saturation_threshold
+
+    def usage(self) -> dict[str, Any]:
+        """Summarize the run's novelty, for state and logs."""
+        return {
+            "results": self.totals.total,
+            "new_results": self.totals.new,
+            "saturated": self.run_saturated
+        }
+
+
+_current_tracker: ContextVar[NoveltyTracker | None] = ContextVar("novelty_tracker", default=None)
+_current_subtopic: ContextVar[SearchNovelty | None] = ContextVar("subtopic_novelty", default=None)
+
+
+def get_novelty_tracker() -> NoveltyTracker | None:
+    """Get the tracker of the research run in progress (None outside a run or when disabled)."""
+    return _current_tracker.get()
+
+
+@contextmanager
+def use_novelty_tracker(tracker: NoveltyTracker | None) -> Iterator[NoveltyTracker | None]:
+    """Make a tracker current for everything run inside this block (including subagents)."""
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+# ===== SUPERVISOR =====
+
+def _append_note(result: Any, note: str) -> Any:
+    """Append a note to a tool result (a ToolMessage, or the one inside a task() Command)."""
+    message = result
+    if isinstance(result, Command) and isinstance(result.update, dict):
+        message = (result.update.get("messages") or [None])[-1]
+    if isinstance(message, ToolMessage) and isinstance(message.content, str):
+        message.content = f"{message.content}\n\n{note}"
+    return result
+
+
+class SaturationMiddleware(AgentMiddleware):
+    """Report each subtopic's novelty to the supervisor and stop delegation once the run is saturated.
+
+    Does nothing when no tracker is current.
+    """
+
+    async def awrap_tool_call(self, request: Any, handler: Any) -> Any:
+        """Refuse task() calls once saturated, and append the subtopic's novelty to its result."""
+        tracker = get_novelty_tracker()
+        if tracker is None or request.tool_call["name"] != "task":
+            return await handler(request)
+
+        if NOVELTY_CONFIG["stop_delegation_when_saturated"] and tracker.run_saturated:
+            return ToolMessage(
+                content=(
+                    "Refused: research has saturated, recent searches mostly return sources this run "
+                    "already has. The remaining subtopics are covered; update the index and finish."
+                ),
+                tool_call_id=request.tool_call["id"],
+                name=request.tool_call["name"],
+                status="error"
+            )
+
+        subtopic = SearchNovelty()
+        token = _current_subtopic.set(subtopic)
+        try:
+            result = await handler(request)
+        finally:
+            _current_subtopic.reset(token)
+
+        return _append_note(result, (
+            f"[Novelty] {subtopic.new} of {subtopic.total} search results for this subtopic were new to the research. "
+            + ("This subtopic overlaps heavily with research already done." if subtopic.total and subtopic.ratio < tracker.saturation_threshold else "")
+        ).strip())
@@ -5,36 +5,52 @@ This subagent is spawned by the supervisor to conduct focused research
 on specific subtopics. It has access to web search and sharedfile system tools.
 """
 
+from functools import cache
+
+from src.researcher.budget import ResearchBudgetMiddleware
 from src.researcher.tools import tavily_search
 from src.researcher.prompts import RESEARCHER_SYSTEM_PROMPT
 from src.config import get_researcher_model
+from src.shared.limits import GlobalLimitsMiddleware
+from src.shared.prompt_cache import PromptSuffixMiddleware
+from src.shared.rate_limits import RateLimitMiddleware
 
 
 # Research subagent configuration
-# Used by supervisor's SubAgentMiddleware to create research-agent instances
-research_subagent = {
-    "name": "research-agent",
+# Used by supervisor's SubAgentMiddleware to create research-agent instances.
+# Built on first use so the researcher model isn't constructed at import time.
+@cache
+def get_research_subagent() -> dict:
+    """Get the research-agent subagent spec for the supervisor."""
+    return {
+        "name": "research-agent",
+    
+        "description": (
+            "Delegate focused research to this agent when you need comprehensive investigation "
+            "of a specific subtopic with targeted research questions. "
+            "\n\n"
+            "Usage: Provide clear subtopic, directory path, and 2-4 specific questions. "
+            "\n\n"
+            "The agent will:\n"
+            "- Conduct web searches to gather information\n"
+            "- Save raw search results to files for traceability\n"
+            "- Write comprehensive findings.md with citations\n"
+            "- Create sources.json with all source metadata\n"
+            "- Return summary with file paths (not full content)\n"
+            "\n"
+            "**Important**: Only delegate ONE subtopic per agent. For multiple subtopics, spawn multiple agents."
+        ),
     
-    "description": (
-        "Delegate focused research to this agent when you need comprehensive investigation "
-        "of a specific subtopic with targeted research questions. "
-        "\n\n"
-        "Usage: Provide clear subtopic, directory path, and 2-4 specific questions. "
-        "\n\n"
-        "The agent will:\n"
-        "- Conduct web searches to gather information\n"
-        "- Save raw search results to files for traceability\n"
-        "- Write comprehensive findings.md with citations\n"
-        "- Create sources.json with all source metadata\n"
-        "- Return summary with file paths (not full content)\n"
-        "\n"
-        "**Important**: Only delegate ONE subtopic per agent. For multiple subtopics, spawn multiple agents."
-    ),
+        # Static and byte-stable, so the provider caches it across every researcher call
+        "system_prompt": RESEARCHER_SYSTEM_PROMPT,
     
-    "system_prompt": RESEARCHER_SYSTEM_PROMPT,
+        "tools": [tavily_search],
     
-    "tools": [tavily_search],
+        "model": get_researcher_model(),
     
-    "model": get_researcher_model()
-}
+        # Search limits and the run-wide budget (see src/researcher/budget.py), retries of
+        # rate limited calls (see src/shared/rate_limits.py), limits shared with concurrent
+        # runs (see src/shared/limits.py), and today's date
+        "middleware": [ResearchBudgetMiddleware(), RateLimitMiddleware(), GlobalLimitsMiddleware(), PromptSuffixMiddleware()]
+    }
 
@@ -2,24 +2,55 @@
 Deep Agent supervisor for research coordination.
 """
 
-from deepagents import create_deep_agent
+from functools import cache
+
 from langchain_core.messages import HumanMessage
 
-from src.state import FullResearchState
-from src.config import get_supervisor_model
-from src.researcher.researcher_subagent import research_subagent
+from src.state import FullResearchState, diff_files
+from src.config import NOVELTY_CONFIG, get_supervisor_model
+from src.researcher.budget import ResearchBudget, ResearchBudgetMiddleware, use_budget
+from src.researcher.novelty import NoveltyTracker, SaturationMiddleware, use_novelty_tracker
+from src.shared.limits import GlobalLimitsMiddleware
+from src.shared.prompt_cache import PromptSuffixMiddleware
+from src.shared.rate_limits import BACKGROUND, RateLimitMiddleware, use_priority
+from src.shared.search import SearchCoordinator, get_search_coordinator, use_search_coordinator
+from src.researcher.researcher_subagent import get_research_subagent
 from src.researcher.prompts import SUPERVISOR_SYSTEM_PROMPT, SUPERVISOR_INITIAL_MESSAGE_TEMPLATE
 
 
 # ===== CREATE SUPERVISOR DEEP AGENT =====
 # This is the supervisor deep agent that coordinates the research, delegates research tasks, and stores findings/sources in filesystem.
-supervisor_deep_agent = create_deep_agent(
-    model=get_supervisor_model(),
-    tools=[],  # Supervisor only delegates, no need for extra tools
-    system_prompt=SUPERVISOR_SYSTEM_PROMPT,
-    subagents=[research_subagent],
-    # backend defaults to StateBackend (virtual filesystem in state["files"])
-)
+# It's built on the first research run, not at import, so the graph loads fast and without API keys.
+@cache
+def get_supervisor_deep_agent():
+    """Get the compiled supervisor deep agent."""
+    # deepagents pulls in every provider SDK, so it's imported only when the agent is built
+    from deepagents import create_deep_agent
+
+    from src.shared.backends import get_research_backend
+
+    return create_deep_agent(
+        model=get_supervisor_model(),
+        name="supervisor",  # Attributes usage to this agent (lc_agent_name)
+        tools=[],  # Supervisor only delegates, no need for extra tools
+        # Static prompt served from the provider's prompt cache; the date is appended per call
+        system_prompt=SUPERVISOR_SYSTEM_PROMPT,
+        subagents=[get_research_subagent()],
+        # Stops delegation once research saturates (src/researcher/novelty.py),
+        # enforces the run's research budget (src/researcher/budget.py), retries rate limited
+        # calls (src/shared/rate_limits.py), then any limits shared with concurrent runs
+        # (src/shared/limits.py), and adds today's date
+        middleware=[
+            SaturationMiddleware(),
+            ResearchBudgetMiddleware(),
+            RateLimitMiddleware(),
+            GlobalLimitsMiddleware(),
+            PromptSuffixMiddleware()
+        ],
+        # Virtual filesystem in state["files"], with raw search dumps offloaded to the blob store.
+        # Subagents inherit the same backend.
+        backend=get_research_backend(),
+    )
 
 
 # ===== WRAPPER FUNCTION FOR MAIN GRAPH =====
@@ -38,25 +69,40 @@ async def deep_research_supervisor(state: FullResearchState) -> dict:
         Updated state with files populated and supervisor's final message
     """
     
-    # We trigger the supervisor with a custom human message that includes the topic and scope from the advisor.
+    # Fresh budget, novelty tracker and search coordinator for this run; the supervisor
+    # and every subagent share them. In a batch, searches are also shared with the other runs.
+    budget = ResearchBudget.from_profile(state.get("research_profile"))
+    tracker = NoveltyTracker.from_config() if NOVELTY_CONFIG["enabled"] else None
+    coordinator = SearchCoordinator(parent=get_search_coordinator())
+    
+    # We trigger the supervisor with a custom human message that includes the topic, scope and budget.
     initial_message = HumanMessage(
         content=SUPERVISOR_INITIAL_MESSAGE_TEMPLATE.format(
             research_topic=state["research_topic"],
-            research_scope=state["research_scope"]
+            research_scope=state["research_scope"],
+            research_budget=budget.describe()
         )
     )
     
     # We invoke the supervisor with the initial message and the empty files and todos.
-    result = await supervisor_deep_agent.ainvoke({
-        "messages": [initial_message],
-        "files": state.get("files", {}),
-        "todos": state.get("todos", [])
-    })
+    # Its provider calls queue behind the advisor's (src/shared/rate_limits.py).
+    files = state.get("files", {})
+    with use_budget(budget), use_novelty_tracker(tracker), use_search_coordinator(coordinator), use_priority(BACKGROUND):
+        result = await get_supervisor_deep_agent().ainvoke({
+            "messages": [initial_message],
+            "files": files,
+            "todos": state.get("todos", [])
+        })
     
     # We return the updated state with the files populated and supervisor summary (not in messages).
     return {
-        "files": result["files"],  # All research files created by subagents + index
+        "files": diff_files(files, result["files"]),  # Only files created/changed by subagents + index
         "supervisor_summary": result["messages"][-1].content,  # Store content only (hidden from user)
+        "research_usage": {
+            **budget.usage(),
+            "novelty": tracker.usage() if tracker else None,
+            "search": coordinator.usage()
+        },
         # Pass through unchanged fields, which will be used by the report writer.
         "research_topic": state["research_topic"],
         "research_scope": state["research_scope"]
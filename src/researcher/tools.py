@@ -1,17 +1,14 @@
 """Research tools for Deep Agent researchers."""
 
 from langchain_core.tools import tool
-from tavily import TavilyClient
 
 from src.config import TAVILY_CONFIG
-
-
-# Initialize Tavily client
-tavily_client = TavilyClient()
+from src.researcher.novelty import get_novelty_tracker
+from src.shared.search import search
 
 
 @tool
-def tavily_search(query: str) -> str:
+async def tavily_search(query: str) -> str:
     """Search the web for information.
     
     Performs a single focused search query using Tavily API.
@@ -26,19 +23,29 @@ def tavily_search(query: str) -> str:
     Returns:
         Formatted string with search results including titles, URLs, and content summaries
     """
-    # Execute search using config
-    results = tavily_client.search(
+    # Execute search using config (async, over the shared connection pool)
+    results = await search(
         query,
         max_results=TAVILY_CONFIG["max_results"],
         topic=TAVILY_CONFIG["topic"],
         include_raw_content=TAVILY_CONFIG["include_raw_content"]
     )
     
-    # Format results
+    # Compare against everything this research run has already found
+    tracker = get_novelty_tracker()
+    is_new = [True] * len(results['results'])
     formatted = f"Search results for: {query}\n\n"
+    if tracker is not None:
+        is_new, novelty = tracker.observe(results['results'])
+        formatted += f"Novelty: {novelty.new} of {novelty.total} results are new to this research.\n"
+        if novelty.saturated:
+            formatted += "Saturated: these results mostly repeat sources already collected. Stop searching and write your findings.\n"
+        formatted += "\n"
     
+    # Format results
     for i, result in enumerate(results['results'], 1):
-        formatted += f"--- SOURCE {i}: {result['title']} ---\n"
+        seen = "" if is_new[i - 1] else " (already collected)"
+        formatted += f"--- SOURCE {i}: {result['title']}{seen} ---\n"
         formatted += f"URL: {result['url']}\n"
         formatted += f"CONTENT:\n{result['content']}\n"
         formatted += "-" * 80 + "\n\n"
@@ -0,0 +1,185 @@
+"""Filesystem backend for the deep agents that keeps bulky files out of graph state.
+
+By default deep agents store every file in `state["files"]`, so each checkpoint
+re-serializes all raw search dumps and grows with every subagent. BlobOffloadBackend
+behaves like the default StateBackend, except that raw search files (and anything
+above a size threshold) are written to a local BlobStore and state only holds a
+one-line reference. Reads resolve references lazily, only when a file is opened,
+and read_file pages through the memory-mapped blob instead of loading it whole.
+"""
+
+import fnmatch
+import posixpath
+from typing import Any
+
+from deepagents.backends import StateBackend
+from deepagents.backends.protocol import (
+    EditResult,
+    FileDownloadResponse,
+    GlobResult,
+    GrepResult,
+    LsResult,
+    ReadResult,
+    WriteResult,
+)
+from deepagents.backends.utils import (
+    _copy_file_data_with_content,
+    file_data_to_string,
+    grep_matches_from_files,
+    normalize_read_bounds,
+    perform_string_replacement,
+)
+
+from src.config import BLOB_STORE_CONFIG
+from src.shared.blob_store import (
+    BlobStore,
+    get_blob_store,
+    make_blob_ref,
+    parse_blob_ref,
+)
+
+# ===== BACKEND =====
+
+class BlobOffloadBackend(StateBackend):
+    """StateBackend that moves raw and oversized files into a content-addressed blob store."""
+
+    def __init__(
+        self,
+        store: BlobStore,
+        offload_patterns: list[str],
+        min_offload_bytes: int
+    ) -> None:
+        """Offload files matching offload_patterns or of at least min_offload_bytes to store."""
+        super().__init__()
+        self.store = store
+        self.offload_patterns = offload_patterns
+        self.min_offload_bytes = min_offload_bytes
+
+    def _should_offload(self, file_path: str, content: str) -> bool:
+        filename = posixpath.basename(file_path)
+        if any(fnmatch.fnmatch(filename, pattern) for pattern in self.offload_patterns):
+            return True
+        return len(content.encode("utf-8")) >= self.min_offload_bytes
+
+    def _resolve(self, file_data: Any) -> Any:
+        """Return file_data with its content loaded from the store if it's a reference."""
+        ref = parse_blob_ref(file_data_to_string(file_data))
+        if ref is None:
+            return file_data
+        return _copy_file_data_with_content(file_data, self.store.get(ref[0]))
+
+    def _fix_sizes(self, infos: list[Any] | None, files: dict[str, Any]) -> None:
+        """Report the real size of offloaded files instead of the reference size."""
+        for info in infos or []:
+            file_data = files.get(info["path"])
+            if file_data is None:
+                continue
+            ref = parse_blob_ref(file_data_to_string(file_data))
+            if ref is not None:
+                info["size"] = ref[1]
+
+    def write(self, file_path: str, content: str) -> WriteResult:
+        """Write a file, offloading its content to the blob store when it's raw or large."""
+        if not self._should_offload(file_path, content):
+            return super().write(file_path, content)
+        digest = self.store.put(content)
+        return super().write(file_path, make_blob_ref(digest, len(content.encode("utf-8"))))
+
+    def read(self, file_path: str, offset: int = 0, limit: int = 2000) -> ReadResult:
+        """Read a file, loading only the requested lines of offloaded content."""
+        file_data = self._read_files().get(file_path)
+        ref = None if file_data is None else parse_blob_ref(file_data_to_string(file_data))
+        if ref is None:
+            return super().read(file_path, offset, limit)
+
+        offset, limit = normalize_read_bounds(offset, limit)
+        if ref[1] == 0:
+            return ReadResult(file_data=_copy_file_data_with_content(file_data, ""))
+        if limit == 0:
+            return ReadResult(file_data=_copy_file_data_with_content(file_data, ""), no_lines_requested=True)
+        window, total_lines = self.store.read_lines(ref[0], offset, limit)
+        if offset >= total_lines:
+            return ReadResult(error=f"Line offset {offset} exceeds file length ({total_lines} lines)")
+
+        end_line = min(offset + limit, total_lines)
+        return ReadResult(
+            file_data=_copy_file_data_with_content(file_data, window.replace("\r\n", "\n")),
+            total_lines=total_lines,
+            start_line=offset + 1,
+            end_line=end_line,
+            next_offset=end_line if end_line < total_lines else None,
+        )
+
+    def edit(
+        self,
+        file_path: str,
+        old_string: str,
+        new_string: str,
+        replace_all: bool = False,
+    ) -> EditResult:
+        """Edit a file, writing the result back through write().
+
+        Offloaded files are loaded first, and a file that grows past min_offload_bytes
+        is offloaded like on a write.
+        """
+        file_data = self._read_files().get(file_path)
+        if file_data is None:
+            return EditResult(error=f"Error: File '{file_path}' not found")
+
+        content = file_data_to_string(self._resolve(file_data))
+        result = perform_string_replacement(content, old_string, new_string, replace_all)
+        if isinstance(result, str):
+            return EditResult(error=result)
+        new_content, occurrences = result
+        self.write(file_path, new_content)
+        return EditResult(path=file_path, occurrences=int(occurrences))
+
+    def grep(
+        self,
+        pattern: str,
+        path: str | None = None,
+        glob: str | None = None,
+        *,
+        max_count: int | None = None,
+    ) -> GrepResult:
+        """Search file contents, including offloaded files."""
+        files = {file_path: self._resolve(file_data) for file_path, file_data in self._read_files().items()}
+        return grep_matches_from_files(files, pattern, path if path is not None else "/", glob, max_count=max_count)
+
+    def ls(self, path: str) -> LsResult:
+        """List a directory, reporting the real size of offloaded files."""
+        result = super().ls(path)
+        self._fix_sizes(result.entries, self._read_files())
+        return result
+
+    def glob(self, pattern: str, path: str | None = None) -> GlobResult:
+        """Glob files, reporting the real size of offloaded files."""
+        result = super().glob(pattern, path)
+        self._fix_sizes(result.matches, self._read_files())
+        return result
+
+    def download_files(self, paths: list[str]) -> list[FileDownloadResponse]:
+        """Download files, loading offloaded content from the blob store."""
+        files = self._read_files()
+        responses = super().download_files(paths)
+        for response in responses:
+            file_data = files.get(response.path)
+            if response.error is None and file_data is not None:
+                response.content = file_data_to_string(self._resolve(file_data)).encode("utf-8")
+        return responses
+
+
+def get_research_backend() -> BlobOffloadBackend | None:
+    """Get the filesystem backend shared by the supervisor, researchers and report writer.
+
+    Returns:
+        BlobOffloadBackend, or None to use the deep agents' default StateBackend
+        when offloading is disabled in BLOB_STORE_CONFIG
+    """
+    if not BLOB_STORE_CONFIG["enabled"]:
+        return None
+    return BlobOffloadBackend(
+        store=get_blob_store(),
+        offload_patterns=BLOB_STORE_CONFIG["offload_patterns"],
+        min_offload_bytes=BLOB_STORE_CONFIG["min_offload_bytes"],
+    )
@@ -0,0 +1,140 @@
+"""Local content-addressed blob store.
+
+Large file contents (raw search dumps) are written here once, named by their
+SHA-256 digest, and graph state only keeps a short reference to them. Identical
+content is stored once no matter how many files point at it.
+
+Blobs live in a directory tree (`<root>/<first 2 hex chars>/<digest>`) and are
+only read back when a file that references them is opened. Paged reads memory-map
+the blob and decode just the requested lines.
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import tempfile
+from functools import cache
+from typing import Any
+
+from src.config import BLOB_STORE_CONFIG
+
+
+class BlobStore:
+    """Directory-backed, content-addressed store for text blobs."""
+
+    def __init__(self, root_dir: str):
+        """Open (and create if needed) the store rooted at root_dir."""
+        self.root_dir = root_dir
+        os.makedirs(root_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root_dir, digest[:2], digest)
+
+    def put(self, content: str) -> str:
+        """Store content and return its SHA-256 digest.
+
+        Writes are atomic (temp file + rename) and skipped if the blob already exists.
+        """
+        data = content.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            return digest
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, "wb") as tmp_file:
+            tmp_file.write(data)
+        os.replace(tmp_path, path)
+        return digest
+
+    def get(self, digest: str) -> str:
+        """Read a blob back as text.
+
+        Raises:
+            FileNotFoundError: If no blob with this digest exists
+        """
+        with open(self._path(digest), encoding="utf-8") as blob_file:
+            return blob_file.read()
+
+    def read_lines(self, digest: str, offset: int, limit: int) -> tuple[str, int]:
+        """Read limit lines of a blob, starting at line offset, without loading the rest.
+
+        Lines end at newlines. The blob is memory-mapped, so only the requested
+        window is decoded (counting the lines still scans the blob, a chunk at a time).
+
+        Returns:
+            The window's text, and the blob's total number of lines
+
+        Raises:
+            FileNotFoundError: If no blob with this digest exists
+        """
+        with open(self._path(digest), "rb") as blob_file:
+            if os.fstat(blob_file.fileno()).st_size == 0:
+                return "", 0
+            with mmap.mmap(blob_file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                total_lines = _count_lines(mapped)
+                start = _line_start(mapped, 0, offset)
+                end = _line_start(mapped, start, limit)
+                return mapped[start:end].decode("utf-8"), total_lines
+
+    def exists(self, digest: str) -> bool:
+        """Check whether a blob is stored."""
+        return os.path.exists(self._path(digest))
+
+
+def _line_start(mapped: mmap.mmap, position: int, lines: int) -> int:
+    """Get the position of the line that starts the given number of lines after position."""
+    for _ in range(lines):
+        newline = mapped.find(b"\n", position)
+        if newline == -1:
+            return len(mapped)
+        position = newline + 1
+    return position
+
+
+def _count_lines(mapped: mmap.mmap, chunk_size: int = 1 << 20) -> int:
+    """Count the lines of a mapped blob, a chunk at a time."""
+    newlines = sum(mapped[start:start + chunk_size].count(b"\n") for start in range(0, len(mapped), chunk_size))
+    return newlines + (mapped[-1:] != b"\n")
+
+
+# ===== REFERENCES =====
+# What state holds instead of the content, e.g. "blob:sha256:<64 hex chars>:<size in bytes>"
+_REF_PATTERN = re.compile(r"^blob:sha256:([0-9a-f]{64}):(\d+)$")
+
+
+def make_blob_ref(digest: str, size: int) -> str:
+    """Build the reference string stored in state for an offloaded file."""
+    return f"blob:sha256:{digest}:{size}"
+
+
+def parse_blob_ref(content: str) -> tuple[str, int] | None:
+    """Parse a blob reference, returning (digest, size) or None if content isn't a reference."""
+    match = _REF_PATTERN.match(content)
+    if match is None:
+        return None
+    return match.group(1), int(match.group(2))
+
+
+@cache
+def get_blob_store() -> BlobStore:
+    """Get the process-wide blob store configured in BLOB_STORE_CONFIG."""
+    return BlobStore(BLOB_STORE_CONFIG["root_dir"])
+
+
+def resolve_file_content(file_data: Any) -> str:
+    """Get the real content of a state file entry, loading it from the blob store if offloaded.
+
+    Use this anywhere outside the deep agents that reads `state["files"]` directly.
+    Accepts deep agents file data dicts (content as a string or legacy list of lines)
+    as well as plain strings.
+    """
+    content = file_data.get("content", "") if isinstance(file_data, dict) else file_data
+    if isinstance(content, list):
+        content = "\n".join(content)
+    ref = parse_blob_ref(content)
+    if ref is None:
+        return content
+    return get_blob_store().get(ref[0])
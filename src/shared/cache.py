@@ -0,0 +1,254 @@
+"""Content-addressed cache for search results.
+
+Search results are keyed on the normalized query plus the search parameters, so
+subtopics researched again across runs skip the Tavily round trip. They are stored
+in two tiers:
+
+1. An in-memory LRU (fast, per process)
+2. An on-disk SQLite table (survives restarts, shared by workers on the same host)
+
+Entries expire after a per-topic TTL (news goes stale much faster than general topics).
+Async callers use aget()/aset(), which run the disk tier in a worker thread so
+SQLite reads and commits never block the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Protocol
+
+from src.config import SEARCH_CACHE_CONFIG
+
+# ===== KEYS =====
+
+def normalize_query(query: str) -> str:
+    """Normalize a query so trivially different spellings share a cache entry.
+
+    Lowercases, collapses whitespace and strips surrounding punctuation.
+    """
+    query = re.sub(r"\s+", " ", query.lower())
+    return query.strip(" \t\n.,;:!?\"'")
+
+
+def make_cache_key(query: str, params: dict[str, Any]) -> str:
+    """Build a content-addressed key from the normalized query and search parameters."""
+    payload = json.dumps(
+        {"query": normalize_query(query), "params": params},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def get_ttl(params: dict[str, Any]) -> float:
+    """Get the TTL (seconds) for a search based on its Tavily topic."""
+    ttls = SEARCH_CACHE_CONFIG["ttl_seconds"]
+    return ttls.get(params.get("topic", "general"), ttls["general"])
+
+
+# ===== TIERS =====
+
+class CacheTier(Protocol):
+    """Storage tier used by SearchCache. Values are JSON-serializable dicts."""
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Get a stored value, or None if it's missing or expired."""
+
+    def set(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        """Store a value for ttl seconds."""
+
+
+class MemoryTier:
+    """In-memory LRU tier with per-entry expiry."""
+
+    def __init__(self, max_entries: int):
+        """Keep at most max_entries, evicting the least recently used."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Get a value, dropping it if it has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        """Store a value, evicting the oldest entries past max_entries."""
+        with self._lock:
+            self._entries[key] = (time.time() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteTier:
+    """On-disk tier backed by a single SQLite table."""
+
+    def __init__(self, path: str):
+        """Open (and create if needed) the cache database at path."""
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS search_cache ("
+            "key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value TEXT NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        """Get a value, deleting its row if it has expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, value FROM search_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row[0] < time.time():
+                self._conn.execute("DELETE FROM search_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[1])
+
+    def set(self, key: str, value: dict[str, Any], ttl: float) -> None:
+        """Store a value, replacing any previous one."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO search_cache (key, expires_at, value) VALUES (?, ?, ?)",
+                (key, time.time() + ttl, json.dumps(value)),
+            )
+            self._conn.commit()
+
+
+# ===== CACHE =====
+
+@dataclass
+class CacheStats:
+    """Hit/miss counters for a SearchCache."""
+
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from any tier."""
+        total = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / total if total else 0.0
+
+
+class SearchCache:
+    """Two-tier search result cache.
+
+    Lookups go memory -> disk; disk hits are promoted into memory.
+    Either tier can be swapped for anything implementing CacheTier.
+    """
+
+    def __init__(self, memory: CacheTier | None = None, disk: CacheTier | None = None):
+        """Cache in the given tiers (a missing tier is skipped)."""
+        self.memory = memory
+        self.disk = disk
+        self.stats = CacheStats()
+
+    def get(self, query: str, params: dict[str, Any]) -> dict[str, Any] | None:
+        """Get cached results for a search, or None on a miss."""
+        key = make_cache_key(query, params)
+
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                self.stats.memory_hits += 1
+                return value
+
+        if self.disk is not None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.stats.disk_hits += 1
+                if self.memory is not None:
+                    self.memory.set(key, value, get_ttl(params))
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    def set(self, query: str, params: dict[str, Any], value: dict[str, Any]) -> None:
+        """Store results for a search in every tier."""
+        key = make_cache_key(query, params)
+        ttl = get_ttl(params)
+        for tier in (self.memory, self.disk):
+            if tier is not None:
+                tier.set(key, value, ttl)
+
+    async def aget(self, query: str, params: dict[str, Any]) -> dict[str, Any] | None:
+        """Get cached results like get(), reading the disk tier in a worker thread."""
+        key = make_cache_key(query, params)
+
+        if self.memory is not None:
+            value = self.memory.get(key)
+            if value is not None:
+                self.stats.memory_hits += 1
+                return value
+
+        if self.disk is not None:
+            value = await asyncio.to_thread(self.disk.get, key)
+            if value is not None:
+                self.stats.disk_hits += 1
+                if self.memory is not None:
+                    self.memory.set(key, value, get_ttl(params))
+                return value
+
+        self.stats.misses += 1
+        return None
+
+    async def aset(self, query: str, params: dict[str, Any], value: dict[str, Any]) -> None:
+        """Store results like set(), writing the disk tier in a worker thread."""
+        key = make_cache_key(query, params)
+        ttl = get_ttl(params)
+        if self.memory is not None:
+            self.memory.set(key, value, ttl)
+        if self.disk is not None:
+            await asyncio.to_thread(self.disk.set, key, value, ttl)
+
+
+# ===== PROCESS-WIDE INSTANCE =====
+
+_UNSET: Any = object()
+_search_cache: Any = _UNSET  # Built on first use unless set_search_cache() was called
+
+
+def get_search_cache() -> SearchCache | None:
+    """Get the process-wide search cache built from SEARCH_CACHE_CONFIG (None if disabled)."""
+    global _search_cache
+    if _search_cache is _UNSET:
+        if not SEARCH_CACHE_CONFIG["enabled"]:
+            return None
+        sqlite_path = SEARCH_CACHE_CONFIG["sqlite_path"]
+        _search_cache = SearchCache(
+            memory=MemoryTier(SEARCH_CACHE_CONFIG["memory_max_entries"]),
+            disk=SQLiteTier(sqlite_path) if sqlite_path else None,
+        )
+    return _search_cache
+
+
+def set_search_cache(cache: SearchCache | None) -> None:
+    """Replace the process-wide search cache (e.g. with custom tiers in a batch runner).
+
+    Pass None to disable caching for the rest of the process.
+    """
+    global _search_cache
+    _search_cache = cache
@@ -0,0 +1,109 @@
+"""Process-level limits shared by concurrent research runs.
+
+Every research run enforces its own budget (src/researcher/budget.py), but runs
+started together (see src/batch.py) don't know about each other: ten runs at five
+subagents each means fifty researchers hitting the providers at once. GlobalLimits
+bounds, across every run that shares it:
+
+- concurrent subagents (held for the whole task() call)
+- concurrent chat model calls
+
+Provider request and token rates are limited process-wide, batch or not
+(src/shared/rate_limits.py).
+
+Like the research budget, the limits are shared through a context variable, so the
+same middleware instance works on the cached agents and does nothing when no
+limits are current.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Iterator
+
+from langchain.agents.middleware import AgentMiddleware
+
+from src.config import BATCH_CONFIG
+
+# ===== LIMITS =====
+
+@dataclass
+class GlobalLimits:
+    """Limits shared by every run started under them (None means unlimited)."""
+
+    max_concurrent_subagents: int | None = None
+    max_concurrent_model_calls: int | None = None
+    _subagents: asyncio.Semaphore | None = field(default=None, repr=False)
+    _model_calls: asyncio.Semaphore | None = field(default=None, repr=False)
+
+    @classmethod
+    def from_config(cls) -> "GlobalLimits":
+        """Create limits from BATCH_CONFIG."""
+        return cls(
+            max_concurrent_subagents=BATCH_CONFIG["max_concurrent_subagents"],
+            max_concurrent_model_calls=BATCH_CONFIG["max_concurrent_model_calls"]
+        )
+
+    def __post_init__(self) -> None:
+        """Create a semaphore for every configured limit."""
+        # Semaphores bind to the loop on first use, so build the limits inside the batch's loop
+        if self.max_concurrent_subagents:
+            self._subagents = asyncio.Semaphore(self.max_concurrent_subagents)
+        if self.max_concurrent_model_calls:
+            self._model_calls = asyncio.Semaphore(self.max_concurrent_model_calls)
+
+
+_current_limits: ContextVar[GlobalLimits | None] = ContextVar("global_limits", default=None)
+
+
+def get_global_limits() -> GlobalLimits | None:
+    """Get the limits shared by the runs in progress (None when there are none)."""
+    return _current_limits.get()
+
+
+@contextmanager
+def use_global_limits(limits: GlobalLimits) -> Iterator[GlobalLimits]:
+    """Apply limits to every run started inside this block (including their subagents)."""
+    token = _current_limits.set(limits)
+    try:
+        yield limits
+    finally:
+        _current_limits.reset(token)
+
+
+@asynccontextmanager
+async def _hold(semaphore: asyncio.Semaphore | None) -> AsyncIterator[None]:
+    if semaphore is None:
+        yield
+        return
+    async with semaphore:
+        yield
+
+
+def model_call_slot() -> Any:
+    """Async context manager holding a model call slot (no-op without limits).
+
+    For direct model calls; deep agents get it from GlobalLimitsMiddleware.
+    """
+    limits = get_global_limits()
+    return _hold(limits._model_calls if limits else None)
+
+
+# ===== ENFORCEMENT =====
+
+class GlobalLimitsMiddleware(AgentMiddleware):
+    """Hold a global slot for every model call and every task() subagent."""
+
+    async def awrap_model_call(self, request: Any, handler: Any) -> Any:
+        """Run the model call in a global model call slot."""
+        async with model_call_slot():
+            return await handler(request)
+
+    async def awrap_tool_call(self, request: Any, handler: Any) -> Any:
+        """Run task() calls in a global subagent slot."""
+        limits = get_global_limits()
+        if limits is None or request.tool_call["name"] != "task":
+            return await handler(request)
+        async with _hold(limits._subagents):
+            return await handler(request)
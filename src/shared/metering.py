@@ -0,0 +1,279 @@
+"""Token, cost and latency metering per graph node and agent.
+
+Shows what each stage of a research run used, without LangSmith. A callback handler
+(UsageMeter) is installed on every model and tool call made while a main graph node
+runs (through langchain's configure hook, so it reaches the deep agents and their
+subagents too) and attributes:
+
+- input / output / cache read / cache write tokens, model calls and latency
+- estimated cost from MODEL_PRICING
+- tool calls by name, and Tavily requests that actually went over the network
+
+to "<main graph node>/<agent>", where agent is the deep agent or subagent name
+(lc_agent_name), the tool a model was called from, or the inner graph node.
+Each node adds its usage to `state["usage"]`; format_usage_summary() renders it.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterator
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables import Runnable, RunnableConfig, ensure_config
+from langchain_core.tracers.context import register_configure_hook
+
+from src.config import MODEL_PRICING
+
+# ===== USAGE RECORDS =====
+
+def _empty_record() -> dict[str, Any]:
+    return {
+        "model_calls": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "cache_read_tokens": 0,
+        "cache_write_tokens": 0,
+        "latency_seconds": 0.0,
+        "cost_usd": 0.0,
+        "tavily_requests": 0,
+        "tool_calls": {}
+    }
+
+
+def estimate_cost(model: str | None, input_tokens: int, output_tokens: int, cache_read: int, cache_write: int) -> float:
+    """Estimate the USD cost of one model call (0 for models missing from MODEL_PRICING).
+
+    input_tokens includes cached tokens, as reported in usage_metadata.
+    """
+    pricing = MODEL_PRICING.get(model or "")
+    if pricing is None:
+        return 0.0
+    uncached = max(input_tokens - cache_read - cache_write, 0)
+    return (
+        uncached * pricing["input"]
+        + cache_read * pricing["cache_read"]
+        + cache_write * pricing["cache_write"]
+        + output_tokens * pricing["output"]
+    ) / 1_000_000
+
+
+def cache_hit_rate(record: dict[str, Any]) -> float:
+    """Share of input tokens served from the provider's prompt cache."""
+    return record["cache_read_tokens"] / record["input_tokens"] if record["input_tokens"] else 0.0
+
+
+def merge_usage(left: dict[str, Any] | None, right: dict[str, Any] | None) -> dict[str, Any]:
+    """Add two usage dicts together (numbers are summed, nested dicts merged).
+
+    Used as the reducer for `state["usage"]`, so every node's usage accumulates.
+    """
+    result = dict(left) if left else {}
+    for key, value in (right or {}).items():
+        if isinstance(value, dict):
+            result[key] = merge_usage(result.get(key), value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            result[key] = round(result.get(key, 0) + value, 6)
+        else:
+            result[key] = value
+    return result
+
+
+# ===== CALLBACK HANDLER =====
+
+class UsageMeter(BaseCallbackHandler):
+    """Callback handler that meters every model and tool call of one main graph node."""
+
+    # Run in the caller's thread/loop instead of an executor, so timings stay accurate
+    run_inline = True
+
+    def __init__(self, stage: str):
+        """Meter the calls of one main graph node (stage)."""
+        self.stage = stage
+        self.agents: dict[str, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._model_calls: dict[UUID, tuple[str, str | None, float]] = {}
+        self._tool_runs: dict[UUID, str] = {}
+
+    def _record(self, agent: str) -> dict[str, Any]:
+        return self.agents.setdefault(f"{self.stage}/{agent}", _empty_record())
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[Any]],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any
+    ) -> None:
+        """Note which agent made the model call and when it started."""
+        metadata = metadata or {}
+        agent = (
+            self._tool_runs.get(parent_run_id)
+            or metadata.get("lc_agent_name")
+            or metadata.get("langgraph_node")
+            or "model"
+        )
+        with self._lock:
+            self._model_calls[run_id] = (agent, metadata.get("ls_model_name"), time.perf_counter())
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Add the call's tokens, latency and cost to its agent's record."""
+        with self._lock:
+            started = self._model_calls.pop(run_id, None)
+        if started is None:
+            return
+        agent, model, start_time = started
+
+        usage: dict[str, Any] = {}
+        generations = response.generations[0] if response.generations else []
+        message = getattr(generations[0], "message", None) if generations else None
+        if message is not None and getattr(message, "usage_metadata", None):
+            usage = message.usage_metadata
+        model = model or (response.llm_output or {}).get("model_name")
+
+        details = usage.get("input_token_details") or {}
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        cache_read = details.get("cache_read") or 0
+        cache_write = details.get("cache_creation") or 0
+
+        with self._lock:
+            record = self._record(agent)
+            record["model_calls"] += 1
+            record["input_tokens"] += input_tokens
+            record["output_tokens"] += output_tokens
+            record["cache_read_tokens"] += cache_read
+            record["cache_write_tokens"] += cache_write
+            record["latency_seconds"] += time.perf_counter() - start_time
+            record["cost_usd"] += estimate_cost(model, input_tokens, output_tokens, cache_read, cache_write)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Forget a failed model call."""
+        with self._lock:
+            self._model_calls.pop(run_id, None)
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any],
+        input_str: str,
+        *,
+        run_id: UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any
+    ) -> None:
+        """Count the tool call for its agent."""
+        metadata = metadata or {}
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        agent = metadata.get("lc_agent_name") or metadata.get("langgraph_node") or "tools"
+        with self._lock:
+            self._tool_runs[run_id] = name
+            tool_calls = self._record(agent)["tool_calls"]
+            tool_calls[name] = tool_calls.get(name, 0) + 1
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Forget a finished tool call."""
+        with self._lock:
+            self._tool_runs.pop(run_id, None)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Forget a failed tool call."""
+        with self._lock:
+            self._tool_runs.pop(run_id, None)
+
+    def record_tavily_request(self) -> None:
+        """Count a Tavily request that went over the network (not served from a cache).
+
+        The request is attributed like a tool call, to the agent whose tool is running.
+        """
+        metadata = ensure_config().get("metadata") or {}
+        agent = metadata.get("lc_agent_name") or metadata.get("langgraph_node") or "tools"
+        with self._lock:
+            self._record(agent)["tavily_requests"] += 1
+
+    def usage(self) -> dict[str, Any]:
+        """Usage of this node, in the shape stored in `state["usage"]`."""
+        with self._lock:
+            return {
+                "agents": {key: {**record, "tool_calls": dict(record["tool_calls"])} for key, record in self.agents.items()}
+            }
+
+
+# The meter of the node currently running. Registered as a configure hook, so it's
+# added to the callbacks of every runnable invoked while it's set.
+_current_meter: ContextVar[UsageMeter | None] = ContextVar("usage_meter", default=None)
+register_configure_hook(_current_meter, inheritable=True)
+
+
+def get_current_meter() -> UsageMeter | None:
+    """Get the meter of the main graph node currently running (None outside one)."""
+    return _current_meter.get()
+
+
+@contextmanager
+def use_meter(meter: UsageMeter) -> Iterator[UsageMeter]:
+    """Meter every model and tool call made inside this block."""
+    token = _current_meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _current_meter.reset(token)
+
+
+# ===== GRAPH INTEGRATION =====
+
+def metered(stage: str, node: Callable[..., Any] | Runnable) -> Callable[..., Any]:
+    """Wrap a main graph node so its usage is added to `state["usage"]`.
+
+    Args:
+        stage: Name the node is registered under in the main graph
+        node: Async node function taking the state, or a compiled subgraph
+
+    Returns:
+        Async node function with the same updates plus "usage"
+    """
+    async def run(state: dict[str, Any], config: RunnableConfig) -> dict[str, Any]:
+        with use_meter(UsageMeter(stage)) as meter:
+            if isinstance(node, Runnable):
+                update = await node.ainvoke(state, config)
+            else:
+                update = await node(state)
+        return {**(update or {}), "usage": meter.usage()}
+
+    run.__name__ = getattr(node, "__name__", stage)
+    return run
+
+
+def format_usage_summary(usage: dict[str, Any]) -> str:
+    """Render a run's usage as a plain-text table, one row per node/agent plus a total.
+
+    "cached" and "hit" are the input tokens served from the provider's prompt cache,
+    "tavily" the Tavily requests that went over the network.
+
+    Args:
+        usage: `state["usage"]` of a finished run
+    """
+    agents = usage.get("agents", {})
+    total = _empty_record()
+    for record in agents.values():
+        total = merge_usage(total, record)
+
+    header = (
+        f"{'node/agent':<32} {'calls':>6} {'input':>10} {'output':>9} {'cached':>10} {'hit':>5} "
+        f"{'seconds':>9} {'usd':>9} {'tavily':>6}"
+    )
+    lines = [header, "-" * len(header)]
+    for key, record in sorted(agents.items()) + [("total", total)]:
+        lines.append(
+            f"{key:<32} {record['model_calls']:>6} {record['input_tokens']:>10} {record['output_tokens']:>9} "
+            f"{record['cache_read_tokens']:>10} {cache_hit_rate(record):>5.0%} {record['latency_seconds']:>9.1f} {record['cost_usd']:>9.4f} "
+            f"{record.get('tavily_requests', 0):>6}"
+        )
+    tool_calls = total["tool_calls"]
+    if tool_calls:
+        lines.append("tool calls: " + ", ".join(f"{name}={count}" for name, count in sorted(tool_calls.items())))
+    return "\n".join(lines)
@@ -0,0 +1,142 @@
+"""Process-wide registry of chat model clients.
+
+Models are handed out from one registry keyed by (provider, model, temperature,
+max_tokens), so agents that share a configuration share an instance, and every
+instance of a provider shares one pooled HTTP client with warm TLS connections.
+
+Chat models are stateless between calls, so a shared instance is safe to use from
+many threads and coroutines at once. The registry itself is guarded by a lock.
+
+Every model queues for its provider's and its own rate limits before each call
+(see src/shared/rate_limits.py). Rate limited calls are retried there, so the SDKs
+only retry timeouts, server and connection errors themselves.
+"""
+
+import inspect
+import logging
+import threading
+from functools import cached_property
+from typing import Any
+
+from langchain.chat_models import init_chat_model
+from langchain_core.language_models import BaseChatModel
+
+logger = logging.getLogger(__name__)
+
+_models: dict[tuple[str, str, float, int | None], BaseChatModel] = {}
+_http_clients: dict[str, dict[str, Any]] = {}
+_lock = threading.Lock()
+
+
+def _get_http_clients(provider: str) -> dict[str, Any]:
+    """Get the shared HTTP clients for every model of a provider.
+
+    OpenAI and Anthropic models get explicit sync/async httpx clients, sized from
+    MODEL_CLIENT_POOL_CONFIG, with a response hook that keeps the SDK from retrying
+    rate limited calls itself (see skip_sdk_retry()).
+
+    Must be called with the registry lock held.
+    """
+    if provider not in _http_clients:
+        clients: dict[str, Any] = {}
+        if provider in ("openai", "anthropic"):
+            import httpx
+
+            from src.config import MODEL_CLIENT_POOL_CONFIG
+            from src.shared.rate_limits import askip_sdk_retry, skip_sdk_retry
+
+            if provider == "openai":
+                from openai import DefaultAsyncHttpxClient, DefaultHttpxClient
+            else:
+                from anthropic import DefaultAsyncHttpxClient, DefaultHttpxClient
+
+            limits = httpx.Limits(
+                max_connections=MODEL_CLIENT_POOL_CONFIG["max_connections"],
+                max_keepalive_connections=MODEL_CLIENT_POOL_CONFIG["max_keepalive_connections"],
+                keepalive_expiry=MODEL_CLIENT_POOL_CONFIG["keepalive_expiry"],
+            )
+            clients = {
+                "http_client": DefaultHttpxClient(limits=limits, event_hooks={"response": [skip_sdk_retry]}),
+                "http_async_client": DefaultAsyncHttpxClient(limits=limits, event_hooks={"response": [askip_sdk_retry]}),
+            }
+        _http_clients[provider] = clients
+    return _http_clients[provider]
+
+
+def _use_anthropic_http_clients(chat_model: BaseChatModel, clients: dict[str, Any]) -> None:
+    """Build a ChatAnthropic's SDK clients on our shared HTTP clients.
+
+    langchain-anthropic doesn't accept httpx clients: it builds its SDK clients
+    lazily (as cached properties) on httpx clients it shares between all of its
+    instances. We build the SDK clients up front instead, from the model's public
+    settings, so nothing it shares is touched. If a langchain-anthropic release no
+    longer builds them that way, the model keeps its own clients and the SDK retries
+    rate limited calls itself too.
+    """
+    import anthropic
+
+    if not all(
+        isinstance(inspect.getattr_static(type(chat_model), name, None), cached_property)
+        for name in ("_client", "_async_client")
+    ):
+        logger.warning("Can't give %s our HTTP clients, its SDK will retry rate limited calls too", type(chat_model).__name__)
+        return
+
+    params: dict[str, Any] = {
+        "api_key": chat_model.anthropic_api_key.get_secret_value(),
+        "base_url": chat_model.anthropic_api_url,
+        "max_retries": chat_model.max_retries,
+        "default_headers": chat_model.default_headers,
+    }
+    # Same rule as langchain-anthropic: <= 0 means the SDK default, None means no timeout
+    if chat_model.default_request_timeout is None or chat_model.default_request_timeout > 0:
+        params["timeout"] = chat_model.default_request_timeout
+    chat_model.__dict__["_client"] = anthropic.Client(**params, http_client=clients["http_client"])
+    chat_model.__dict__["_async_client"] = anthropic.AsyncClient(**params, http_client=clients["http_async_client"])
+
+
+def get_chat_model(
+    provider: str,
+    model: str,
+    temperature: float,
+    max_tokens: int | None = None
+) -> BaseChatModel:
+    """Get the shared chat model for a configuration, building it on first use.
+
+    Args:
+        provider: Model provider as understood by init_chat_model ("anthropic", "openai", ...)
+        model: Model name
+        temperature: Sampling temperature
+        max_tokens: Output token cap (None for the provider default)
+
+    Returns:
+        Shared chat model instance (a ReplayChatModel while a recorded run is replayed)
+    """
+    # Imported here: src.config imports this module
+    from src.shared.rate_limits import ModelRateLimiter
+    from src.shared.replay import ReplayChatModel, get_replayer
+
+    replayer = get_replayer()
+    if replayer is not None:
+        return ReplayChatModel(replayer=replayer, model_name=model)
+
+    key = (provider, model, temperature, max_tokens)
+    chat_model = _models.get(key)
+    if chat_model is not None:
+        return chat_model
+
+    with _lock:
+        # Another thread may have built it while we waited for the lock
+        if key not in _models:
+            clients = _get_http_clients(provider)
+            kwargs: dict[str, Any] = {
+                "temperature": temperature,
+                "rate_limiter": ModelRateLimiter(provider, model),
+                **(clients if provider == "openai" else {})
+            }
+            if max_tokens is not None:
+                kwargs["max_tokens"] = max_tokens
+            _models[key] = init_chat_model(model=model, model_provider=provider, **kwargs)
+            if provider == "anthropic":
+                _use_anthropic_http_clients(_models[key], clients)
+        return _models[key]
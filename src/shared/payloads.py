@@ -0,0 +1,99 @@
+"""Compact serialization of search results for LLM consumption.
+
+Raw Tavily responses carry scores, request IDs, images and repeated metadata that
+the model never uses. This module keeps only title, URL and trimmed content,
+drops URLs already seen in another query and stops once a token budget is reached.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+from src.shared.utils import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CompactPayload:
+    """Serialized search results plus how much they shrank compared to str(raw)."""
+
+    text: str
+    result_count: int
+    original_bytes: int
+    compact_bytes: int
+    original_tokens: int
+    compact_tokens: int
+
+    @property
+    def bytes_saved(self) -> int:
+        """Bytes removed compared to the raw repr."""
+        return self.original_bytes - self.compact_bytes
+
+    @property
+    def tokens_saved(self) -> int:
+        """Estimated tokens removed compared to the raw repr."""
+        return self.original_tokens - self.compact_tokens
+
+
+def _trim(content: str, max_chars: int) -> str:
+    """Trim content to max_chars, cutting at the last word boundary."""
+    content = " ".join(content.split())
+    if len(content) <= max_chars:
+        return content
+    return content[:max_chars].rsplit(" ", 1)[0] + "..."
+
+
+def compact_search_results(
+    responses: list[dict[str, Any]],
+    max_tokens: int,
+    max_content_chars: int
+) -> CompactPayload:
+    """Serialize Tavily responses into a compact, deduplicated text block.
+
+    Args:
+        responses: Raw Tavily responses (one per query)
+        max_tokens: Token budget for the whole payload
+        max_content_chars: Max characters of content kept per result
+
+    Returns:
+        CompactPayload with the text and the bytes/tokens saved
+    """
+    seen_urls: set[str] = set()
+    entries: list[str] = []
+    used_tokens = 0
+
+    for response in responses:
+        for result in response.get("results", []):
+            url = result.get("url", "")
+            if not url or url in seen_urls:
+                continue
+
+            entry = (
+                f"[{len(entries) + 1}] {result.get('title', '')}\n"
+                f"URL: {url}\n"
+                f"{_trim(result.get('content', ''), max_content_chars)}\n"
+            )
+            entry_tokens = estimate_tokens(entry)
+            if used_tokens + entry_tokens > max_tokens:
+                continue  # Doesn't fit the remaining budget, a shorter result still might
+
+            seen_urls.add(url)
+            entries.append(entry)
+            used_tokens += entry_tokens
+
+    text = "\n".join(entries)
+    original = str(responses)
+    payload = CompactPayload(
+        text=text,
+        result_count=len(entries),
+        original_bytes=len(original.encode("utf-8")),
+        compact_bytes=len(text.encode("utf-8")),
+        original_tokens=estimate_tokens(original),
+        compact_tokens=estimate_tokens(text),
+    )
+    logger.info(
+        "Compacted %d search results: saved %d bytes (~%d tokens)",
+        payload.result_count, payload.bytes_saved, payload.tokens_saved
+    )
+    return payload
@@ -0,0 +1,74 @@
+"""Provider prompt caching for the large static system prompts.
+
+The supervisor, researcher and report writer system prompts are thousands of tokens
+and identical on every call. Both providers can serve an unchanged prefix from cache
+at a fraction of the input price and prefill latency:
+
+- Anthropic caches up to an explicit cache_control breakpoint. The deep agents get
+  theirs from the AnthropicPromptCachingMiddleware create_deep_agent() always adds,
+  so their system prompt is passed as a plain string. Direct model calls send the
+  static prompt as its own content block marked cacheable
+- OpenAI caches byte-identical prefixes automatically, so the prompt just has to
+  stay byte-stable
+
+The date is therefore kept out of the static prompts and appended after them on
+every call: by PromptSuffixMiddleware for the deep agents, and by
+render_system_message() for direct model calls (the advisor and the sectioned report
+writer). Only the short suffix is rendered per call, so a long-lived server always
+uses the current date without a restart. Cache hits are metered as
+cache_read_tokens (see src/shared/metering.py).
+"""
+
+from typing import Any
+
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.messages import SystemMessage
+
+from src.shared.utils import get_today_str
+
+ANTHROPIC_CACHE_CONTROL = {"type": "ephemeral"}
+
+
+def dynamic_prompt_suffix() -> str:
+    """Render the part of the system prompt that changes between runs, fresh on every call."""
+    return f"Today's date: {get_today_str()}"
+
+
+def render_system_message(prompt: str, provider: str, context: str = "") -> SystemMessage:
+    """Build the system message for a direct model call: static prompt + dynamic suffix.
+
+    Args:
+        prompt: The static prompt (must not contain anything that changes between calls)
+        provider: Model provider the message is sent to
+        context: Optional per-call text placed after the static prompt, before the date
+
+    Returns:
+        SystemMessage whose prefix is byte-identical across calls (and marked
+        cacheable for Anthropic), followed by the current dynamic suffix
+    """
+    suffix = f"\n\n{context}" if context else ""
+    suffix += f"\n\n{dynamic_prompt_suffix()}"
+    if provider != "anthropic":
+        return SystemMessage(content=prompt + suffix)
+    return SystemMessage(content=[
+        {"type": "text", "text": prompt, "cache_control": ANTHROPIC_CACHE_CONTROL},
+        {"type": "text", "text": suffix}
+    ])
+
+
+class PromptSuffixMiddleware(AgentMiddleware):
+    """Append the dynamic suffix after the (cached) system prompt on every model call."""
+
+    @staticmethod
+    def _with_suffix(request: Any) -> Any:
+        blocks = list(request.system_message.content_blocks) if request.system_message else []
+        blocks.append({"type": "text", "text": ("\n\n" if blocks else "") + dynamic_prompt_suffix()})
+        return request.override(system_message=SystemMessage(content_blocks=blocks))
+
+    def wrap_model_call(self, request: Any, handler: Any) -> Any:
+        """Append the dynamic suffix to the system message of the model call."""
+        return handler(self._with_suffix(request))
+
+    async def awrap_model_call(self, request: Any, handler: Any) -> Any:
+        """Async version of wrap_model_call()."""
+        return await handler(self._with_suffix(request))
@@ -0,0 +1,401 @@
+"""Provider rate limits shared by every call in the process.
+
+Every Anthropic, OpenAI and Tavily call in the process goes through one scheduler,
+so overlapping runs share the provider quotas instead of each running into 429s:
+
+- a token bucket per provider and per model, for requests and tokens per minute
+  (PROVIDER_RATE_LIMITS and MODEL_RATE_LIMITS); a call waits until every bucket it
+  draws from has room
+- waiting calls are served by priority, so the interactive advisor goes before
+  background research and report writing (use_priority())
+- a rate limited or overloaded response pauses its buckets for everyone (for the
+  provider's retry-after, or an exponential backoff), and the failed call is retried
+  after a jittered delay, through the queue again (with_backoff())
+
+Chat models get the scheduler as their langchain rate_limiter (src/shared/models.py).
+Their SDKs still retry timeouts, server and connection errors, but hand rate limited
+responses straight back (skip_sdk_retry()), so those retries are scheduled too.
+Token usage is only known once a call returns, so it's charged afterwards by a
+callback handler: a model's token bucket can go into debt, and new calls wait until
+it has refilled.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from itertools import count
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, TypeVar
+from uuid import UUID
+
+import httpx
+from langchain.agents.middleware import AgentMiddleware
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.rate_limiters import BaseRateLimiter
+from langchain_core.tracers.context import register_configure_hook
+
+from src.config import MODEL_RATE_LIMITS, PROVIDER_RATE_LIMITS, RATE_LIMIT_BACKOFF
+
+T = TypeVar("T")
+
+# Call priorities, lower is served first
+INTERACTIVE = 0  # Someone is waiting on the call (the advisor)
+BACKGROUND = 1   # Research and report writing
+
+RATE_LIMITED_STATUS_CODES = (429, 529)  # Too many requests, and Anthropic's "overloaded"
+POLL_INTERVAL = 0.05                    # Seconds between checks while queued behind another call
+
+
+# ===== ERRORS =====
+
+def _status_code(error: BaseException) -> int | None:
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_rate_limited(error: BaseException) -> bool:
+    """Whether a provider rejected the call for its rate limits or load."""
+    return _status_code(error) in RATE_LIMITED_STATUS_CODES
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Whether a call may succeed if retried (the errors the provider SDKs retry themselves)."""
+    if isinstance(error, httpx.TransportError) or isinstance(error.__cause__, httpx.TransportError):
+        return True
+    status = _status_code(error)
+    return status is not None and (status in (408, 409) or status in RATE_LIMITED_STATUS_CODES or status >= 500)
+
+
+def skip_sdk_retry(response: httpx.Response) -> None:
+    """Response hook for httpx clients that stops the provider SDKs from retrying rate limited responses themselves."""
+    if response.status_code in RATE_LIMITED_STATUS_CODES:
+        response.headers["x-should-retry"] = "false"
+
+
+async def askip_sdk_retry(response: httpx.Response) -> None:
+    """Async version of skip_sdk_retry(), for async httpx clients."""
+    skip_sdk_retry(response)
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Seconds the provider asked us to wait before retrying (None when it didn't say)."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass  # An HTTP date; fall back to our own backoff
+    return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Jittered exponential delay before retry number `attempt` (1-based)."""
+    delay = min(RATE_LIMIT_BACKOFF["max_delay"], RATE_LIMIT_BACKOFF["initial_delay"] * 2 ** (attempt - 1))
+    jitter = RATE_LIMIT_BACKOFF["jitter"]
+    return delay * random.uniform(1 - jitter, 1 + jitter)
+
+
+# ===== TOKEN BUCKETS =====
+
+class TokenBucket:
+    """Holds up to per_minute units and refills at per_minute / 60 per second (None or 0 means unlimited).
+
+    take() may leave the bucket negative, for amounts only known after the fact.
+    """
+
+    def __init__(self, per_minute: float | None):
+        """Start full."""
+        self.capacity = float(per_minute or 0)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.capacity / 60)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until the bucket holds amount (0 when unlimited)."""
+        if not self.capacity:
+            return 0.0
+        self._refill(now)
+        return max(0.0, (min(amount, self.capacity) - self.level) * 60 / self.capacity)
+
+    def take(self, amount: float, now: float) -> None:
+        """Remove amount from the bucket, going into debt if it doesn't hold that much."""
+        if self.capacity:
+            self._refill(now)
+            self.level -= amount
+
+
+class RateLimitScope:
+    """Request and token buckets of one provider or one model."""
+
+    def __init__(self, name: str, limits: dict[str, Any]):
+        """Create the buckets from a PROVIDER_RATE_LIMITS or MODEL_RATE_LIMITS entry."""
+        self.name = name
+        self.requests = TokenBucket(limits.get("requests_per_minute"))
+        self.tokens = TokenBucket(limits.get("tokens_per_minute"))
+        self.paused_until = 0.0
+        self.rate_limited_responses = 0  # Consecutive ones, for the backoff
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until a request may be sent: a request left, tokens out of debt, not paused."""
+        return max(self.requests.wait_time(1, now), self.tokens.wait_time(0, now), self.paused_until - now)
+
+
+# ===== SCHEDULER =====
+
+class RateLimitScheduler:
+    """Hands out provider requests in priority order, within every bucket they draw from.
+
+    Works from any thread or event loop: waiting callers poll rather than sharing
+    loop-bound primitives, since the same models serve scripts, servers and benchmarks.
+    """
+
+    def __init__(self, provider_limits: dict[str, dict[str, Any]], model_limits: dict[str, dict[str, Any]]):
+        """Limit calls by PROVIDER_RATE_LIMITS- and MODEL_RATE_LIMITS-shaped dicts."""
+        self.provider_limits = provider_limits
+        self.model_limits = model_limits
+        self._scopes: dict[tuple[str, str], RateLimitScope] = {}
+        self._waiting: list[tuple[int, int, tuple[RateLimitScope, ...]]] = []  # (priority, arrival, scopes)
+        self._arrivals = count()
+        self._lock = threading.Lock()
+
+    def scopes(self, provider: str, model: str | None = None) -> tuple[RateLimitScope, ...]:
+        """Get the scopes a call draws from: its provider and, when given, its model."""
+        keys = [("provider", provider)] + ([("model", model)] if model else [])
+        with self._lock:
+            for kind, name in keys:
+                if (kind, name) not in self._scopes:
+                    limits = (self.provider_limits if kind == "provider" else self.model_limits).get(name) or {}
+                    self._scopes[(kind, name)] = RateLimitScope(name, limits)
+            return tuple(self._scopes[key] for key in keys)
+
+    def _try_acquire(self, ticket: tuple[int, int, tuple[RateLimitScope, ...]]) -> float:
+        """Take a request for a queued call, or return how long to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(scope.wait_time(now) for scope in ticket[2])
+            ahead = any(other[:2] < ticket[:2] and set(other[2]) & set(ticket[2]) for other in self._waiting)
+            if ahead:
+                return max(wait, POLL_INTERVAL)
+            if wait > 0:
+                return wait
+            for scope in ticket[2]:
+                scope.requests.take(1, now)
+            return 0.0
+
+    @contextmanager
+    def _queued(self, scopes: tuple[RateLimitScope, ...]) -> Iterator[tuple[int, int, tuple[RateLimitScope, ...]]]:
+        ticket = (get_priority(), next(self._arrivals), scopes)
+        with self._lock:
+            self._waiting.append(ticket)
+        try:
+            yield ticket
+        finally:
+            with self._lock:
+                self._waiting.remove(ticket)
+
+    async def acquire(self, scopes: tuple[RateLimitScope, ...], blocking: bool = True) -> bool:
+        """Wait for a request in every scope, behind queued calls of higher priority.
+
+        Returns:
+            Whether a request was taken (always True when blocking)
+        """
+        with self._queued(scopes) as ticket:
+            while True:
+                wait = self._try_acquire(ticket)
+                if not wait:
+                    return True
+                if not blocking:
+                    return False
+                await asyncio.sleep(min(wait, 1.0))
+
+    def acquire_sync(self, scopes: tuple[RateLimitScope, ...], blocking: bool = True) -> bool:
+        """Blocking version of acquire(), for synchronous model calls."""
+        with self._queued(scopes) as ticket:
+            while True:
+                wait = self._try_acquire(ticket)
+                if not wait:
+                    return True
+                if not blocking:
+                    return False
+                time.sleep(min(wait, 1.0))
+
+    def charge(self, scopes: tuple[RateLimitScope, ...], tokens: int) -> None:
+        """Charge the tokens a finished call used, and forget earlier rate limited responses."""
+        with self._lock:
+            now = time.monotonic()
+            for scope in scopes:
+                scope.tokens.take(tokens, now)
+                scope.rate_limited_responses = 0
+
+    def rate_limited(self, scopes: tuple[RateLimitScope, ...], error: BaseException) -> float:
+        """Pause the scopes of a rate limited call for every caller.
+
+        Returns:
+            The pause in seconds (the provider's retry-after, or a jittered exponential backoff)
+        """
+        with self._lock:
+            attempt = max(scope.rate_limited_responses for scope in scopes) + 1
+            pause = retry_after(error) or backoff_delay(attempt)
+            until = time.monotonic() + pause
+            for scope in scopes:
+                scope.rate_limited_responses = attempt
+                scope.paused_until = max(scope.paused_until, until)
+        return pause
+
+
+_scheduler: RateLimitScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_rate_limit_scheduler() -> RateLimitScheduler:
+    """Get the process-wide scheduler, created from the config on first use."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RateLimitScheduler(PROVIDER_RATE_LIMITS, MODEL_RATE_LIMITS)
+    return _scheduler
+
+
+# ===== PRIORITY =====
+
+_current_priority: ContextVar[int] = ContextVar("call_priority", default=INTERACTIVE)
+
+
+def get_priority() -> int:
+    """Get the priority of calls made here (INTERACTIVE unless set)."""
+    return _current_priority.get()
+
+
+@contextmanager
+def use_priority(priority: int) -> Iterator[int]:
+    """Queue every provider call made inside this block (including subagents) at this priority."""
+    token = _current_priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _current_priority.reset(token)
+
+
+# ===== CALLS =====
+
+async def with_backoff(
+    call: Callable[[], Awaitable[T]],
+    retry_if: Callable[[BaseException], bool] = is_rate_limited
+) -> T:
+    """Run a provider call, retrying failures after a jittered exponential delay.
+
+    Each retry queues for the rate limits again, behind calls of higher priority.
+    By default only rate limited calls are retried: the model SDKs retry timeouts,
+    server and connection errors themselves. Calls made without an SDK (Tavily)
+    pass retry_if=is_retryable to have those retried here.
+    """
+    for attempt in range(1, RATE_LIMIT_BACKOFF["max_retries"] + 1):
+        try:
+            return await call()
+        except Exception as error:
+            if not retry_if(error):
+                raise
+            await asyncio.sleep(retry_after(error) or backoff_delay(attempt))
+    return await call()
+
+
+@asynccontextmanager
+async def provider_request(provider: str) -> AsyncIterator[None]:
+    """Hold a request of a provider called directly over HTTP (e.g. Tavily).
+
+    Raise inside the block for failed responses, so rate limiting pauses the provider.
+    """
+    scheduler = get_rate_limit_scheduler()
+    scopes = scheduler.scopes(provider)
+    await scheduler.acquire(scopes)
+    try:
+        yield
+    except Exception as error:
+        if is_rate_limited(error):
+            scheduler.rate_limited(scopes, error)
+        raise
+    scheduler.charge(scopes, 0)
+
+
+class ModelRateLimiter(BaseRateLimiter):
+    """langchain rate_limiter of one chat model: a request from its provider and model buckets."""
+
+    def __init__(self, provider: str, model: str):
+        """Draw from the buckets of provider and model."""
+        self.provider = provider
+        self.model = model
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        """Wait for a request, or just check for one if not blocking."""
+        scheduler = get_rate_limit_scheduler()
+        return scheduler.acquire_sync(scheduler.scopes(self.provider, self.model), blocking)
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        """Async version of acquire()."""
+        scheduler = get_rate_limit_scheduler()
+        return await scheduler.acquire(scheduler.scopes(self.provider, self.model), blocking)
+
+
+class RateLimitUsageHandler(BaseCallbackHandler):
+    """Charges every chat model call's tokens to its buckets, and pauses them when it's rate limited."""
+
+    run_inline = True
+
+    def __init__(self):
+        """Start with no calls in flight."""
+        self._scopes: dict[UUID, tuple[RateLimitScope, ...]] = {}
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[Any]],
+        *,
+        run_id: UUID,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any
+    ) -> None:
+        """Note the scopes of the model call."""
+        metadata = metadata or {}
+        if metadata.get("ls_provider"):
+            self._scopes[run_id] = get_rate_limit_scheduler().scopes(metadata["ls_provider"], metadata.get("ls_model_name"))
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Charge the call's tokens to its scopes."""
+        scopes = self._scopes.pop(run_id, None)
+        if scopes is None:
+            return
+        generations = response.generations[0] if response.generations else []
+        message = getattr(generations[0], "message", None) if generations else None
+        usage = getattr(message, "usage_metadata", None) or {}
+        get_rate_limit_scheduler().charge(scopes, usage.get("total_tokens", 0))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Pause the call's scopes if it was rate limited."""
+        scopes = self._scopes.pop(run_id, None)
+        if scopes is not None and is_rate_limited(error):
+            get_rate_limit_scheduler().rate_limited(scopes, error)
+
+
+# Always set, so it's added to the callbacks of every run in the process
+_usage_handler: ContextVar[RateLimitUsageHandler | None] = ContextVar(
+    "rate_limit_usage", default=RateLimitUsageHandler()
+)
+register_configure_hook(_usage_handler, inheritable=True)
+
+
+class RateLimitMiddleware(AgentMiddleware):
+    """Retry a deep agent's rate limited or failed model calls with jittered backoff."""
+
+    async def awrap_model_call(self, request: Any, handler: Any) -> Any:
+        """Run the model call through with_backoff()."""
+        return await with_backoff(lambda: handler(request))
@@ -0,0 +1,305 @@
+"""Record and deterministically replay research runs.
+
+A run is recorded at its two network boundaries (every chat model call and every
+Tavily search) into a compact gzipped archive, and replayed through `main_graph`
+with no API calls, so a slow or expensive run can be debugged without paying for it
+again:
+
+    with record_run(".cache/replays/run.jsonl.gz", graph_input=inputs):
+        await deep_research_agent.ainvoke(inputs)
+
+    python -m src.shared.replay .cache/replays/run.jsonl.gz
+
+Model responses are keyed by the conversation they belong to (its first user message)
+and the step within it (how many assistant messages it already has), not by call
+order or full request content, so parallel subagents may interleave differently on
+replay and tool output details may change (e.g. novelty notes) without breaking it.
+Searches are keyed like the search cache (normalized query + parameters).
+
+Replay is process-wide: agents are built on first use and keep their models, so
+enable_replay() must be called before the first run in the process.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    message_chunk_to_message,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.tracers.context import register_configure_hook
+
+from src.shared.cache import make_cache_key
+
+ARCHIVE_VERSION = 1
+
+
+class ReplayMismatchError(KeyError):
+    """A replayed run made a model call or search the recording doesn't have."""
+
+
+def model_request_key(messages: list[BaseMessage]) -> str:
+    """Key of a model request: its conversation (first user message) and step in it."""
+    first = next((str(message.content) for message in messages if isinstance(message, HumanMessage)), "")
+    step = sum(isinstance(message, AIMessage) for message in messages)
+    return f"{hashlib.sha256(first.encode('utf-8')).hexdigest()[:16]}:{step}"
+
+
+# ===== ARCHIVE =====
+
+class RunArchive:
+    """Model responses and search results of one run, with the graph input that started it."""
+
+    def __init__(self, graph_input: dict[str, Any] | None = None):
+        """Start an empty archive for a run invoked with graph_input."""
+        self.graph_input = graph_input
+        self.model_responses: dict[str, list[dict[str, Any]]] = {}  # Request key -> responses in call order
+        self.searches: dict[str, dict[str, Any]] = {}               # Search key -> Tavily response
+        self._lock = threading.Lock()
+
+    def add_model_response(self, key: str, message: BaseMessage) -> None:
+        """Append a model response to those recorded for its request key."""
+        with self._lock:
+            self.model_responses.setdefault(key, []).append(message_to_dict(message))
+
+    def add_search(self, key: str, response: dict[str, Any]) -> None:
+        """Record the Tavily response of a search key."""
+        with self._lock:
+            self.searches[key] = response
+
+    def save(self, path: str) -> None:
+        """Write the archive as gzipped JSON lines: a header, then one line per exchange."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._lock, gzip.open(path, "wt", encoding="utf-8") as archive_file:
+            header = {"version": ARCHIVE_VERSION, "recorded_at": time.time(), "graph_input": self.graph_input}
+            archive_file.write(json.dumps(header, default=str) + "\n")
+            for key, messages in self.model_responses.items():
+                for message in messages:
+                    archive_file.write(json.dumps({"model": key, "message": message}, default=str) + "\n")
+            for key, response in self.searches.items():
+                archive_file.write(json.dumps({"search": key, "response": response}, default=str) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "RunArchive":
+        """Read an archive written by save().
+
+        Raises:
+            ValueError: If the file is not a run archive of a supported version
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as archive_file:
+            header = json.loads(archive_file.readline() or "{}")
+            if header.get("version") != ARCHIVE_VERSION:
+                raise ValueError(f"{path} is not a version {ARCHIVE_VERSION} run archive")
+            archive = cls(graph_input=header.get("graph_input"))
+            for line in archive_file:
+                entry = json.loads(line)
+                if "model" in entry:
+                    archive.model_responses.setdefault(entry["model"], []).append(entry["message"])
+                else:
+                    archive.searches[entry["search"]] = entry["response"]
+        return archive
+
+
+# ===== RECORDING =====
+
+class RunRecorder(BaseCallbackHandler):
+    """Callback handler that records every chat model response of a run into an archive."""
+
+    run_inline = True
+
+    def __init__(self, archive: RunArchive):
+        """Record into archive."""
+        self.archive = archive
+        self._keys: dict[UUID, str] = {}
+
+    def on_chat_model_start(self, serialized: dict[str, Any], messages: list[list[BaseMessage]], *, run_id: UUID, **kwargs: Any) -> None:
+        """Remember the request key of a model call."""
+        self._keys[run_id] = model_request_key(messages[0])
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """Record the model call's response under its request key."""
+        key = self._keys.pop(run_id, None)
+        generations = response.generations[0] if response.generations else []
+        message = getattr(generations[0], "message", None) if generations else None
+        if key is None or message is None:
+            return
+        self.archive.add_model_response(key, message_chunk_to_message(message))
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """Forget a failed model call."""
+        self._keys.pop(run_id, None)
+
+    def record_search(self, query: str, params: dict[str, Any], response: dict[str, Any]) -> None:
+        """Record the result of a search (served from the cache or the network)."""
+        self.archive.add_search(make_cache_key(query, params), response)
+
+
+# The recorder of the run in progress, added to every runnable's callbacks while set
+_current_recorder: ContextVar[RunRecorder | None] = ContextVar("run_recorder", default=None)
+register_configure_hook(_current_recorder, inheritable=True)
+
+
+def get_recorder() -> RunRecorder | None:
+    """Get the recorder of the run in progress (None when not recording)."""
+    return _current_recorder.get()
+
+
+@contextmanager
+def record_run(path: str, graph_input: dict[str, Any] | None = None) -> Iterator[RunRecorder]:
+    """Record every model call and search made inside this block, saving the archive on exit.
+
+    Args:
+        path: Where to write the archive (e.g. ".cache/replays/run.jsonl.gz")
+        graph_input: Input the graph is invoked with, stored so the run can be replayed by path.
+            Must be JSON-serializable, e.g. {"messages": [{"role": "user", "content": "..."}]}
+    """
+    recorder = RunRecorder(RunArchive(graph_input))
+    token = _current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current_recorder.reset(token)
+        recorder.archive.save(path)
+
+
+# ===== REPLAY =====
+
+class RunReplayer:
+    """Serves a recorded run's responses, in recorded order per request key."""
+
+    def __init__(self, archive: RunArchive):
+        """Serve the responses recorded in archive."""
+        self.archive = archive
+        self._served: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def model_response(self, messages: list[BaseMessage]) -> BaseMessage:
+        """Get the recorded response to a model request.
+
+        Raises:
+            ReplayMismatchError: If the recording has no (more) responses for this request
+        """
+        key = model_request_key(messages)
+        with self._lock:
+            responses = self.archive.model_responses.get(key, [])
+            index = self._served.get(key, 0)
+            if index >= len(responses):
+                raise ReplayMismatchError(f"No recorded model response for request {key} (the run diverged from the recording)")
+            self._served[key] = index + 1
+        return messages_from_dict([responses[index]])[0]
+
+    def search(self, query: str, params: dict[str, Any]) -> dict[str, Any]:
+        """Get the recorded result of a search.
+
+        Raises:
+            ReplayMismatchError: If the search wasn't recorded
+        """
+        response = self.archive.searches.get(make_cache_key(query, params))
+        if response is None:
+            raise ReplayMismatchError(f"No recorded search for {query!r}")
+        return response
+
+    def unused_responses(self) -> int:
+        """Count the recorded model responses not served yet (0 after a faithful replay)."""
+        with self._lock:
+            recorded = sum(len(responses) for responses in self.archive.model_responses.values())
+            return recorded - sum(self._served.values())
+
+    def reset(self) -> None:
+        """Start serving from the beginning of the recording again."""
+        with self._lock:
+            self._served.clear()
+
+
+class ReplayChatModel(BaseChatModel):
+    """Chat model that answers from the active replayer instead of a provider."""
+
+    replayer: Any
+    model_name: str  # Recorded model name, so metering prices the replay like the original run
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools: Any, **kwargs: Any) -> "ReplayChatModel":
+        """Return the model itself: recorded responses already contain their tool calls."""
+        return self
+
+    def _generate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self.replayer.model_response(messages))])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: list[str] | None = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return self._generate(messages)
+
+
+_replayer: RunReplayer | None = None
+
+
+def get_replayer() -> RunReplayer | None:
+    """Get the process-wide replayer (None unless replay is enabled)."""
+    return _replayer
+
+
+def enable_replay(archive: RunArchive) -> RunReplayer:
+    """Serve every model call and search in this process from a recording.
+
+    Must be called before the first run, while no agent has been built yet.
+    """
+    global _replayer
+    _replayer = RunReplayer(archive)
+    return _replayer
+
+
+# ===== CLI =====
+
+async def replay(path: str) -> dict[str, Any]:
+    """Replay an archive through the main graph and return the final state."""
+    archive = RunArchive.load(path)
+    if archive.graph_input is None:
+        raise ValueError(f"{path} has no graph input, record it with record_run(..., graph_input=inputs)")
+    replayer = enable_replay(archive)
+
+    from src.main_graph import deep_research_agent
+
+    state = await deep_research_agent.ainvoke(archive.graph_input)
+    if replayer.unused_responses():
+        raise ReplayMismatchError(f"{replayer.unused_responses()} recorded model responses were never requested")
+    return state
+
+
+def main(argv: list[str]) -> None:
+    """Replay an archive and print its timing and usage."""
+    if not argv:
+        print("usage: python -m src.shared.replay <archive.jsonl.gz>")  # noqa: T201
+        return
+
+    from src.shared.metering import format_usage_summary
+
+    # Through the package module, not __main__, so get_chat_model sees the replayer
+    from src.shared.replay import replay as replay_archive
+
+    start = time.perf_counter()
+    state = asyncio.run(replay_archive(argv[0]))
+    print(f"Replayed {argv[0]} in {time.perf_counter() - start:.2f}s")  # noqa: T201
+    print(format_usage_summary(state.get("usage", {})))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,213 @@
+"""Async Tavily search client shared by every agent.
+
+`TavilyClient.search` is synchronous, so calling it from a tool blocks the event
+loop the deep agents run on and serializes "parallel" subagents. This module talks
+to the Tavily REST API through one pooled `httpx.AsyncClient` per event loop, so
+concurrent tool calls overlap on the network and reuse keep-alive connections.
+
+Responses are served from the shared search cache when possible (see src/shared/cache.py).
+Within a research run, identical queries issued by parallel subagents are coalesced
+into one upstream call (see SearchCoordinator). Results are recorded for, or served
+from, a run recording when one is active (see src/shared/replay.py). Requests that
+do go out queue for Tavily's rate limits and are retried with backoff when rejected
+(see src/shared/rate_limits.py).
+"""
+
+import asyncio
+import os
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+import httpx
+
+from src.config import TAVILY_CLIENT_CONFIG
+from src.shared.cache import get_search_cache, make_cache_key
+from src.shared.metering import get_current_meter
+from src.shared.rate_limits import is_retryable, provider_request, with_backoff
+from src.shared.replay import get_recorder, get_replayer
+
+TAVILY_API_URL = "https://api.tavily.com"
+
+
+# ===== SHARED CLIENT POOL =====
+# httpx.AsyncClient is bound to the loop it was first used on, so we keep one per loop.
+# In the LangGraph server that means a single client shared by all subagents.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _build_client() -> httpx.AsyncClient:
+    """Create a pooled client for the Tavily API using TAVILY_CLIENT_CONFIG."""
+    api_key = os.getenv("TAVILY_API_KEY")
+    if not api_key:
+        raise ValueError("TAVILY_API_KEY is not set. Add it to your .env file.")
+
+    return httpx.AsyncClient(
+        base_url=TAVILY_API_URL,
+        headers={
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+        },
+        limits=httpx.Limits(
+            max_connections=TAVILY_CLIENT_CONFIG["max_connections"],
+            max_keepalive_connections=TAVILY_CLIENT_CONFIG["max_keepalive_connections"],
+            keepalive_expiry=TAVILY_CLIENT_CONFIG["keepalive_expiry"],
+        ),
+        timeout=TAVILY_CLIENT_CONFIG["timeout"],
+    )
+
+
+def get_search_client() -> httpx.AsyncClient:
+    """Get the pooled Tavily client for the running event loop.
+
+    Returns:
+        Shared `httpx.AsyncClient`, created on first use in this loop
+    """
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_client()
+        _clients[loop] = client
+    return client
+
+
+async def aclose_search_clients() -> None:
+    """Close every pooled client (e.g. on server shutdown or at the end of a script)."""
+    clients = list(_clients.values())
+    _clients.clear()
+    for client in clients:
+        if not client.is_closed:
+            await client.aclose()
+
+
+# ===== RUN-SCOPED COORDINATION =====
+# Parallel research-agents often search for the same thing at the same moment. The
+# persistent cache can't help there (nothing is stored until the first call returns),
+# so each run gets a coordinator: the first request for a normalized query goes
+# upstream and every identical request, in flight or later in the run, shares its result.
+
+class SearchCoordinator:
+    """Deduplicates and coalesces identical searches within one research run.
+
+    A run started inside a batch gets the batch's coordinator as its parent, so
+    identical searches are also shared across the runs of the batch.
+    """
+
+    def __init__(self, parent: Optional["SearchCoordinator"] = None):
+        """Coordinate one run's searches, sharing them with parent's if given."""
+        self.parent = parent
+        self._calls: dict[str, asyncio.Task] = {}
+        self.requests = 0
+        self.coalesced = 0     # Joined an identical call still in flight
+        self.deduplicated = 0  # Reused an identical call that already finished
+
+    @property
+    def calls_saved(self) -> int:
+        """Searches served without a call of their own."""
+        return self.coalesced + self.deduplicated
+
+    async def run(self, key: str, fetch: Callable[[], Awaitable[dict[str, Any]]]) -> dict[str, Any]:
+        """Get the result for a key, calling fetch only if no identical call exists in this run.
+
+        Failed calls are forgotten so the next request retries. A waiter being cancelled
+        doesn't cancel the shared call for the others.
+        """
+        self.requests += 1
+        call = self._calls.get(key)
+        if call is None:
+            call = asyncio.ensure_future(self.parent.run(key, fetch) if self.parent else fetch())
+            self._calls[key] = call
+            call.add_done_callback(lambda done: self._forget_failed(key, done))
+        elif call.done():
+            self.deduplicated += 1
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(call)
+
+    def _forget_failed(self, key: str, call: asyncio.Task) -> None:
+        if (call.cancelled() or call.exception() is not None) and self._calls.get(key) is call:
+            del self._calls[key]
+
+    def usage(self) -> dict[str, int]:
+        """Summarize the run's searches, for state and logs."""
+        return {
+            "requests": self.requests,
+            "upstream_calls": self.requests - self.calls_saved,
+            "calls_saved": self.calls_saved,
+            "coalesced": self.coalesced,
+            "deduplicated": self.deduplicated
+        }
+
+
+_current_coordinator: ContextVar[SearchCoordinator | None] = ContextVar("search_coordinator", default=None)
+
+
+def get_search_coordinator() -> SearchCoordinator | None:
+    """Get the coordinator searches are currently routed through (None outside a run or batch)."""
+    return _current_coordinator.get()
+
+
+@contextmanager
+def use_search_coordinator(coordinator: SearchCoordinator) -> Iterator[SearchCoordinator]:
+    """Route every search run inside this block (including subagents) through a coordinator."""
+    token = _current_coordinator.set(coordinator)
+    try:
+        yield coordinator
+    finally:
+        _current_coordinator.reset(token)
+
+
+# ===== SEARCH =====
+
+async def _post_search(query: str, params: dict[str, Any]) -> dict[str, Any]:
+    """Send one search to the Tavily API, within the provider's rate limits."""
+    async with provider_request("tavily"):
+        response = await get_search_client().post("/search", json={"query": query, **params})
+        response.raise_for_status()
+    return response.json()
+
+
+async def _search(query: str, params: dict[str, Any]) -> dict[str, Any]:
+    """Search through the persistent cache and, on a miss, the Tavily API."""
+    replayer = get_replayer()
+    if replayer is not None:
+        return replayer.search(query, params)
+
+    cache = get_search_cache()
+    results = await cache.aget(query, params) if cache is not None else None
+    if results is None:
+        meter = get_current_meter()
+        if meter is not None:
+            meter.record_tavily_request()
+        results = await with_backoff(lambda: _post_search(query, params), retry_if=is_retryable)
+        if cache is not None:
+            await cache.aset(query, params, results)
+
+    recorder = get_recorder()
+    if recorder is not None:
+        recorder.record_search(query, params, results)
+    return results
+
+
+async def search(query: str, **params: Any) -> dict[str, Any]:
+    """Run a Tavily search without blocking the event loop.
+
+    Accepts the same keyword arguments as `TavilyClient.search`
+    (max_results, topic, include_raw_content, ...). Cached results are
+    returned without touching the network, and inside a research run identical
+    searches share one call.
+
+    Args:
+        query: Search query
+        **params: Extra Tavily search parameters
+
+    Returns:
+        Raw Tavily response dict (with a "results" list)
+    """
+    coordinator = _current_coordinator.get()
+    if coordinator is None:
+        return await _search(query, params)
+    return await coordinator.run(make_cache_key(query, params), lambda: _search(query, params))
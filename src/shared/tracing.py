@@ -0,0 +1,414 @@
+"""Latency tracing for research runs.
+
+Shows where the minutes of a research run go (Tavily, the researcher subagents, the
+supervisor's index updates or the report writer). SpanTracer is a callback handler
+(installed on every run through langchain's configure hook once enable_tracing() is
+called) that records a span for:
+
+- the graph run and each main graph node
+- each model call (any agent or subagent)
+- each tool call: subagent task() calls, filesystem operations and searches
+
+Spans follow the OpenTelemetry span model (trace/span ids, nanosecond timestamps,
+attributes, status) and are handed to a pluggable exporter as they finish: a JSON
+lines file written in the background and rotated by size, or stdout (TRACING_CONFIG).
+To print a trace as a tree with its critical path marked:
+
+    python -m src.shared.tracing .cache/traces/spans.jsonl [trace_id]
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from contextvars import ContextVar
+from typing import Any, Protocol, TextIO
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.tracers.context import register_configure_hook
+
+from src.config import TRACING_CONFIG
+
+# ===== EXPORTERS =====
+
+class SpanExporter(Protocol):
+    """Destination for finished spans."""
+
+    def export(self, span: dict[str, Any]) -> None:
+        """Hand over one finished span."""
+
+
+class FileSpanExporter:
+    """Append spans to a JSON lines file, rotating it once it reaches max_bytes.
+
+    Spans are buffered and written by a background thread, so exporting never does
+    file I/O on the event loop the tracer runs on.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 0, backup_count: int = 0, flush_interval: float = 1.0):
+        """Export to path; the background writer starts with the first span."""
+        self.path = path
+        self.max_bytes = max_bytes            # 0 never rotates
+        self.backup_count = backup_count      # Rotated files kept as path.1 ... path.N
+        self.flush_interval = flush_interval  # Seconds between background writes
+        self._pending: list[dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def export(self, span: dict[str, Any]) -> None:
+        """Queue a finished span for the next write."""
+        with self._lock:
+            self._pending.append(span)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="span-exporter", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self) -> None:
+        """Write every queued span now."""
+        with self._lock:
+            spans, self._pending = self._pending, []
+        if not spans:
+            return
+        lines = "".join(json.dumps(span, default=str) + "\n" for span in spans)
+        with self._write_lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._rotate()
+            with open(self.path, "a", encoding="utf-8") as spans_file:
+                spans_file.write(lines)
+
+    def _rotate(self) -> None:
+        if not self.max_bytes or not os.path.exists(self.path) or os.path.getsize(self.path) < self.max_bytes:
+            return
+        if not self.backup_count:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+class ConsoleSpanExporter:
+    """Write spans as JSON lines to a stream (stdout by default), e.g. for a collector reading it."""
+
+    def __init__(self, stream: TextIO | None = None):
+        """Export to stream, or to whatever sys.stdout is at export time if None."""
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def export(self, span: dict[str, Any]) -> None:
+        """Write a span as one line and flush the stream."""
+        line = json.dumps(span, default=str)
+        with self._lock:
+            stream = self.stream or sys.stdout
+            stream.write(line + "\n")
+            stream.flush()
+
+
+def build_exporter() -> SpanExporter:
+    """Create the exporter configured in TRACING_CONFIG.
+
+    Raises:
+        ValueError: If the exporter type is unknown
+    """
+    if TRACING_CONFIG["exporter"] == "file":
+        return FileSpanExporter(
+            TRACING_CONFIG["path"],
+            max_bytes=TRACING_CONFIG["max_bytes"],
+            backup_count=TRACING_CONFIG["backup_count"],
+            flush_interval=TRACING_CONFIG["flush_interval"]
+        )
+    if TRACING_CONFIG["exporter"] == "stdout":
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unknown span exporter {TRACING_CONFIG['exporter']!r}, expected 'file' or 'stdout'")
+
+
+# ===== TRACER =====
+
+class SpanTracer(BaseCallbackHandler):
+    """Callback handler that turns runs into OpenTelemetry-style spans."""
+
+    run_inline = True
+
+    def __init__(self, exporter: SpanExporter):
+        """Hand finished spans to exporter."""
+        self.exporter = exporter
+        self._lock = threading.Lock()
+        self._parents: dict[UUID, UUID | None] = {}  # Every run in flight, recorded or not
+        self._traces: dict[UUID, UUID] = {}             # Every run in flight -> its top-level run
+        self._spans: dict[UUID, dict[str, Any]] = {}    # Recorded runs in flight
+        self._roots: set[UUID] = set()                  # Top-level graph runs in flight
+
+    def _start(
+        self,
+        run_id: UUID,
+        parent_run_id: UUID | None,
+        name: str | None,
+        attributes: dict[str, Any] | None = None
+    ) -> None:
+        """Register a run, recording a span for it if a name is given."""
+        with self._lock:
+            self._parents[run_id] = parent_run_id
+            self._traces[run_id] = self._traces.get(parent_run_id, run_id) if parent_run_id else run_id
+            if name is None:
+                return
+
+            parent = parent_run_id
+            while parent is not None and parent not in self._spans:
+                parent = self._parents.get(parent)
+            parent_span = self._spans.get(parent) if parent is not None else None
+
+            self._spans[run_id] = {
+                "traceId": parent_span["traceId"] if parent_span else run_id.hex,
+                "spanId": run_id.hex[-16:],  # Run ids are time-ordered, so the random tail is the unique part
+                "parentSpanId": parent_span["spanId"] if parent_span else None,
+                "name": name,
+                "kind": "INTERNAL",
+                "startTimeUnixNano": time.time_ns(),
+                "attributes": {key: value for key, value in (attributes or {}).items() if value is not None}
+            }
+
+    def _end(self, run_id: UUID, error: BaseException | None = None, attributes: dict[str, Any] | None = None) -> None:
+        """Finish a run, exporting its span if it was recorded."""
+        with self._lock:
+            if run_id in self._roots or error is not None:
+                self._forget_runs_under(run_id)
+            self._parents.pop(run_id, None)
+            self._traces.pop(run_id, None)
+            self._roots.discard(run_id)
+            span = self._spans.pop(run_id, None)
+        if span is None:
+            return
+
+        span["endTimeUnixNano"] = time.time_ns()
+        span["attributes"].update({key: value for key, value in (attributes or {}).items() if value is not None})
+        span["status"] = {"code": "ERROR", "message": repr(error)} if error else {"code": "OK"}
+        try:
+            self.exporter.export(span)
+        except OSError:
+            pass  # Tracing must never break a research run
+
+    def _forget_runs_under(self, run_id: UUID) -> None:
+        """Drop the runs under a finished trace or failed run that never ended (e.g. cancelled)."""
+        if run_id in self._roots:
+            stale = [run for run, root in self._traces.items() if root == run_id and run != run_id]
+        else:
+            stale = [run for run in self._parents if self._runs_under(run, run_id)]
+        for run in stale:
+            self._parents.pop(run, None)
+            self._traces.pop(run, None)
+            self._spans.pop(run, None)
+
+    def _runs_under(self, run_id: UUID, ancestor: UUID) -> bool:
+        parent = self._parents.get(run_id)
+        while parent is not None:
+            if parent == ancestor:
+                return True
+            parent = self._parents.get(parent)
+        return False
+
+    # ----- Graph runs and nodes -----
+
+    def on_chain_start(
+        self,
+        serialized: dict[str, Any] | None,
+        inputs: Any,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        name: str | None = None,
+        **kwargs: Any
+    ) -> None:
+        """Start a span for a graph run or a main graph node, and track any other chain."""
+        metadata = metadata or {}
+        name = name or (serialized or {}).get("name")
+        node = metadata.get("langgraph_node")
+
+        if parent_run_id is None:
+            with self._lock:
+                self._roots.add(run_id)
+            self._start(run_id, None, f"graph {name}", {"span.type": "graph"})
+        elif parent_run_id in self._roots and name == node:
+            # Main graph node (inner nodes of subgraphs and deep agents aren't recorded,
+            # their model and tool calls are)
+            self._start(run_id, parent_run_id, f"node {node}", {"span.type": "node", "langgraph.node": node})
+        else:
+            self._start(run_id, parent_run_id, None)
+
+    def on_chain_end(self, outputs: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """End the chain's span."""
+        self._end(run_id)
+
+    def on_chain_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """End the chain's span with an error status."""
+        self._end(run_id, error)
+
+    # ----- Model calls -----
+
+    def on_chat_model_start(
+        self,
+        serialized: dict[str, Any],
+        messages: list[list[Any]],
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        **kwargs: Any
+    ) -> None:
+        """Start a span for a model call."""
+        metadata = metadata or {}
+        model = metadata.get("ls_model_name")
+        self._start(run_id, parent_run_id, f"model {model or 'chat'}", {
+            "span.type": "model",
+            "gen_ai.request.model": model,
+            "gen_ai.system": metadata.get("ls_provider"),
+            "agent.name": metadata.get("lc_agent_name"),
+            "langgraph.node": metadata.get("langgraph_node")
+        })
+
+    def on_llm_end(self, response: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """End the model call's span with its token usage."""
+        generations = response.generations[0] if response.generations else []
+        message = getattr(generations[0], "message", None) if generations else None
+        usage = getattr(message, "usage_metadata", None) or {}
+        self._end(run_id, attributes={
+            "gen_ai.usage.input_tokens": usage.get("input_tokens"),
+            "gen_ai.usage.output_tokens": usage.get("output_tokens")
+        })
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """End the model call's span with an error status."""
+        self._end(run_id, error)
+
+    # ----- Tools (subagent tasks, filesystem, search) -----
+
+    def on_tool_start(
+        self,
+        serialized: dict[str, Any] | None,
+        input_str: str,
+        *,
+        run_id: UUID,
+        parent_run_id: UUID | None = None,
+        metadata: dict[str, Any] | None = None,
+        inputs: dict[str, Any] | None = None,
+        **kwargs: Any
+    ) -> None:
+        """Start a span for a tool call, named after the subagent for task() calls."""
+        metadata = metadata or {}
+        inputs = inputs or {}
+        tool = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        name = f"task {inputs['subagent_type']}" if tool == "task" and "subagent_type" in inputs else f"tool {tool}"
+        self._start(run_id, parent_run_id, name, {
+            "span.type": "tool",
+            "tool.name": tool,
+            "agent.name": metadata.get("lc_agent_name"),
+            "file.path": inputs.get("file_path") or inputs.get("path"),
+            "search.query": inputs.get("query")
+        })
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        """End the tool call's span."""
+        self._end(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        """End the tool call's span with an error status."""
+        self._end(run_id, error)
+
+
+# Process-wide tracer, added to every run's callbacks once enable_tracing() registers it
+_tracer: ContextVar[SpanTracer | None] | None = None
+
+
+def get_tracer() -> SpanTracer | None:
+    """Get the active span tracer (None when tracing isn't enabled)."""
+    return _tracer.get() if _tracer is not None else None
+
+
+def enable_tracing(exporter: SpanExporter | None = None) -> SpanTracer:
+    """Trace every run in this process from now on.
+
+    Tracing is opt-in: entry points call this when TRACING_CONFIG["enabled"] is set.
+    Calling it again only swaps the exporter.
+
+    Args:
+        exporter: Where spans go (e.g. ConsoleSpanExporter() for a stdout collector),
+            the exporter configured in TRACING_CONFIG if None
+    """
+    global _tracer
+    tracer = get_tracer()
+    if tracer is not None:
+        tracer.exporter = exporter or tracer.exporter
+        return tracer
+    tracer = SpanTracer(exporter or build_exporter())
+    _tracer = ContextVar("span_tracer", default=tracer)
+    register_configure_hook(_tracer, inheritable=True)
+    return tracer
+
+
+# ===== OFFLINE VIEW =====
+
+def format_trace(spans: list[dict[str, Any]]) -> str:
+    """Render one trace as an indented tree of durations, marking the critical path with "*".
+
+    The critical path follows, from the root down, the child that finished last: the
+    chain of spans that determined the run's end time.
+    """
+    children: dict[str | None, list[dict[str, Any]]] = {}
+    for span in sorted(spans, key=lambda span: span["startTimeUnixNano"]):
+        children.setdefault(span.get("parentSpanId"), []).append(span)
+    roots = children.get(None, [])
+    if not roots:
+        return "(no root span)"
+    trace_start = min(span["startTimeUnixNano"] for span in roots)
+
+    critical: set[str] = set()
+    span = max(roots, key=lambda span: span["endTimeUnixNano"])
+    while span is not None:
+        critical.add(span["spanId"])
+        kids = children.get(span["spanId"], [])
+        span = max(kids, key=lambda kid: kid["endTimeUnixNano"]) if kids else None
+
+    lines = []
+
+    def render(span: dict[str, Any], depth: int) -> None:
+        duration = (span["endTimeUnixNano"] - span["startTimeUnixNano"]) / 1e9
+        offset = (span["startTimeUnixNano"] - trace_start) / 1e9
+        marker = "*" if span["spanId"] in critical else " "
+        error = "  ERROR" if span.get("status", {}).get("code") == "ERROR" else ""
+        lines.append(f"{marker} {'  ' * depth}{span['name']:<{max(50 - 2 * depth, 10)}} +{offset:8.2f}s {duration:8.2f}s{error}")
+        for child in children.get(span["spanId"], []):
+            render(child, depth + 1)
+
+    for root in roots:
+        render(root, 0)
+    return "\n".join(lines)
+
+
+def main(argv: list[str]) -> None:
+    """Print a trace from a spans file (the most recent one unless a trace id is given)."""
+    if not argv:
+        print("usage: python -m src.shared.tracing <spans.jsonl> [trace_id]")  # noqa: T201
+        return
+    with open(argv[0], encoding="utf-8") as spans_file:
+        spans = [json.loads(line) for line in spans_file if line.strip()]
+    if not spans:
+        print("No spans recorded")  # noqa: T201
+        return
+    trace_id = argv[1] if len(argv) > 1 else max(spans, key=lambda span: span["endTimeUnixNano"])["traceId"]
+    print(f"trace {trace_id}")  # noqa: T201
+    print(format_trace([span for span in spans if span["traceId"] == trace_id]))  # noqa: T201
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,10 +1,14 @@
 """Shared utilities for deep research system.
 
 This module provides common utilities used across all research components,
-including date formatting.
+including date formatting, token estimation and URL normalization.
 """
 
 from datetime import datetime
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_TRACKING_PARAMS = {"fbclid", "gclid", "mc_cid", "mc_eid", "ref", "ref_src"}
+_TRACKING_PREFIXES = ("utm_",)
 
 
 def get_today_str() -> str:
@@ -16,3 +20,38 @@ def get_today_str() -> str:
     return datetime.now().strftime("%a %b %-d, %Y")
 
 
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of a string.
+    
+    Uses the ~4 characters per token rule of thumb, which is close enough
+    for budgeting across both Claude and GPT tokenizers without loading either.
+    
+    Returns:
+        Approximate number of tokens
+    """
+    return (len(text) + 3) // 4
+
+
+def trim_url(url: str) -> str:
+    """Strip the punctuation text leaves after a URL: ".", ",", ";" and unbalanced ")"."""
+    url = url.strip()
+    while url and (url[-1] in ".,;" or (url[-1] == ")" and url.count(")") > url.count("("))):
+        url = url[:-1]
+    return url
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a URL so the same page found or cited by different researchers matches.
+    
+    Lowercases scheme and host, drops "www.", default ports, fragments, tracking
+    parameters and trailing slashes.
+    """
+    parts = urlsplit(trim_url(url))
+    host = (parts.hostname or "").lower().removeprefix("www.")
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith(_TRACKING_PREFIXES)
+    ))
+    return urlunsplit(((parts.scheme or "https").lower(), host, parts.path.rstrip("/"), query, ""))
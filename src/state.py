@@ -1,5 +1,50 @@
+from typing import Annotated, Any
+
+from langgraph.channels.delta import DeltaChannel
 from langgraph.graph import MessagesState
 
+from src.config import CHECKPOINT_CONFIG
+from src.shared.metering import merge_usage
+
+
+# ===== FILE MAP DELTAS =====
+# The research filesystem only grows, so persisting the whole mapping on every step
+# makes checkpoint cost proportional to total research volume. Instead, nodes return
+# only the paths they changed and the channel stores those per-step deltas, writing
+# a full snapshot every few updates to bound replay depth.
+
+def files_delta_reducer(
+    files: dict[str, Any] | None,
+    updates: list[dict[str, Any | None]]
+) -> dict[str, Any]:
+    """Apply a batch of per-path file changes.
+    
+    Each update maps a path to its new file data (create or edit) or to None (delete).
+    Applying batches one by one or all at once gives the same result, which is what
+    lets LangGraph replay stored deltas in any grouping.
+    """
+    result = dict(files) if files else {}
+    for update in updates:
+        for path, file_data in update.items():
+            if file_data is None:
+                result.pop(path, None)
+            else:
+                result[path] = file_data
+    return result
+
+
+def diff_files(before: dict[str, Any], after: dict[str, Any]) -> dict[str, Any | None]:
+    """Compute the per-path changes that turn one file map into another.
+    
+    Returns:
+        Mapping with new/edited paths to their file data and deleted paths to None
+    """
+    changes: dict[str, Any | None] = {
+        path: file_data for path, file_data in after.items() if before.get(path) != file_data
+    }
+    changes.update({path: None for path in before if path not in after})
+    return changes
+
 
 # ===== STATE FOR THE MAIN GRAPH =====
 
@@ -17,13 +62,25 @@ class FullResearchState(MessagesState):
     research_topic: str = ""
     research_scope: str = ""
     user_approved: bool = False
+    research_profile: str = ""  # Budget profile from RESEARCH_BUDGET_PROFILES (empty means the default)
+    history_summary: str = ""   # Advisor's rolling summary of older turns (see src/advisor/history.py)
+    summarized_messages: int = 0
     
     # Shared with deep agents (both research deep agent and report writer deep agent)
-    files: dict[str, str] = {}
+    # Stored as per-path deltas between checkpoints (see files_delta_reducer)
+    files: Annotated[
+        dict[str, Any],
+        DeltaChannel(files_delta_reducer, snapshot_frequency=CHECKPOINT_CONFIG["files_snapshot_frequency"])
+    ] = {}
     todos: list[dict[str, str]] = []
     
     # Internal handoff from supervisor to report writer
     supervisor_summary: str = ""
+    research_usage: dict[str, Any] = {}  # What the research run spent against its budget
     
     # Final output
-    final_report: str = ""
\ No newline at end of file
+    final_report: str = ""
+    
+    # Tokens, cost, latency and tool calls per node/agent, summed across nodes
+    # (see src/shared/metering.py, render with format_usage_summary)
+    usage: Annotated[dict[str, Any], merge_usage] = {}
\ No newline at end of file
@@ -0,0 +1,75 @@
+import pytest
+
+from src.shared.backends import BlobOffloadBackend
+from src.shared.blob_store import BlobStore, parse_blob_ref
+
+RAW = "".join(f"line {n}\n" for n in range(10))
+
+
+@pytest.fixture
+def files():
+    return {}
+
+
+@pytest.fixture
+def backend(tmp_path, files):
+    backend = BlobOffloadBackend(
+        BlobStore(str(tmp_path)), offload_patterns=["*_raw.md"], min_offload_bytes=100
+    )
+    # Stand in for the graph's files channel
+    backend._read_files = lambda: files
+    backend._send_files_update = files.update
+    return backend
+
+
+def test_write_offloads_raw_and_large_files_only(backend, files):
+    backend.write("/r/search_1_raw.md", "short")
+    backend.write("/r/notes.md", "short")
+    backend.write("/r/findings.md", "x" * 100)
+
+    assert parse_blob_ref(files["/r/search_1_raw.md"]["content"]) is not None
+    assert files["/r/notes.md"]["content"] == "short"
+    assert parse_blob_ref(files["/r/findings.md"]["content"])[1] == 100
+
+
+def test_read_pages_through_offloaded_content(backend):
+    backend.write("/r/search_1_raw.md", RAW)
+
+    result = backend.read("/r/search_1_raw.md", offset=2, limit=3)
+
+    assert result.file_data["content"] == "line 2\nline 3\nline 4\n"
+    assert (result.total_lines, result.start_line, result.end_line) == (10, 3, 5)
+    assert result.next_offset == 5
+    assert backend.read("/r/search_1_raw.md").file_data["content"] == RAW
+    assert backend.read("/r/search_1_raw.md", offset=10).error is not None
+
+
+def test_edit_resolves_offloaded_content_and_writes_it_back(backend, files):
+    backend.write("/r/search_1_raw.md", RAW)
+
+    result = backend.edit("/r/search_1_raw.md", "line 3", "line three")
+
+    assert result.error is None and result.occurrences == 1
+    assert parse_blob_ref(files["/r/search_1_raw.md"]["content"]) is not None
+    assert "line three\n" in backend.read("/r/search_1_raw.md").file_data["content"]
+
+
+def test_edit_offloads_a_file_that_grows_past_the_threshold(backend, files):
+    backend.write("/r/notes.md", "todo")
+
+    backend.edit("/r/notes.md", "todo", "x" * 100)
+
+    assert parse_blob_ref(files["/r/notes.md"]["content"]) is not None
+    assert backend.read("/r/notes.md").file_data["content"] == "x" * 100
+
+
+def test_ls_and_grep_see_offloaded_files_as_they_are(backend):
+    backend.write("/r/search_1_raw.md", RAW)
+
+    (entry,) = backend.ls("/r").entries
+    matches = backend.grep("line 7", "/r").matches
+
+    assert entry["size"] == len(RAW)
+    assert [(match["path"], match["line"]) for match in matches] == [
+        ("/r/search_1_raw.md", 8)
+    ]
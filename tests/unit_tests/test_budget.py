@@ -0,0 +1,116 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.config import RESEARCH_BUDGET_WRAP_UP
+from src.researcher.budget import ResearchBudget, ResearchBudgetMiddleware, use_budget
+
+
+def _budget(**limits):
+    return ResearchBudget(
+        **{
+            "profile": "test",
+            "max_subagents": 2,
+            "max_supervisor_iterations": 2,
+            "max_researcher_searches": 2,
+            "max_search_calls": 3,
+            "max_tokens": 1000,
+            "max_wall_clock_seconds": 60,
+            **limits,
+        }
+    )
+
+
+def _searches(count):
+    return AIMessage(
+        "",
+        tool_calls=[
+            {"name": "tavily_search", "args": {}, "id": f"s{n}"} for n in range(count)
+        ],
+    )
+
+
+def _call(name, call_id, messages=()):
+    return SimpleNamespace(
+        tool_call={"name": name, "args": {}, "id": call_id},
+        state={"messages": list(messages)},
+    )
+
+
+async def _ran(request):
+    return ToolMessage("ran", tool_call_id=request.tool_call["id"])
+
+
+def _run(budget, request):
+    async def main():
+        with use_budget(budget):
+            return await ResearchBudgetMiddleware().awrap_tool_call(request, _ran)
+
+    return asyncio.run(main())
+
+
+def test_refuses_task_calls_past_the_iteration_limit():
+    budget = _budget()
+
+    results = [_run(budget, _call("task", f"t{n}")) for n in range(3)]
+
+    assert [result.content for result in results[:2]] == ["ran", "ran"]
+    assert results[2].status == "error" and "task() calls" in results[2].content
+    assert (budget.task_calls, budget.refused_calls) == (2, 1)
+
+
+def test_refuses_searches_past_the_researcher_and_run_limits():
+    budget = _budget()
+    messages = [_searches(3)]
+
+    # The third parallel search of one researcher is over its limit of 2
+    assert _run(budget, _call("tavily_search", "s1", messages)).content == "ran"
+    assert (
+        "your 2 searches"
+        in _run(budget, _call("tavily_search", "s2", messages)).content
+    )
+
+    # Another researcher's searches count toward the run's limit of 3
+    other = [_searches(2)]
+    assert _run(budget, _call("tavily_search", "s0", other)).content == "ran"
+    assert _run(budget, _call("tavily_search", "s1", other)).content == "ran"
+    assert (
+        "3 searches of this run"
+        in _run(budget, _call("tavily_search", "s0", other)).content
+    )
+    assert budget.search_calls == 3
+
+
+def test_other_tools_and_runs_without_a_budget_are_not_limited():
+    budget = _budget(max_tokens=0)
+    middleware = ResearchBudgetMiddleware()
+
+    assert _run(budget, _call("write_file", "w")).content == "ran"
+    result = asyncio.run(middleware.awrap_tool_call(_call("task", "t"), _ran))
+    assert result.content == "ran"
+
+
+@pytest.mark.parametrize(
+    "tokens_used, stops",
+    [(999, False), (1000, False), (1000 * (1 + RESEARCH_BUDGET_WRAP_UP), True)],
+)
+def test_spent_budget_refuses_delegation_then_stops_after_the_wrap_up(
+    tokens_used, stops
+):
+    budget = _budget(tokens_used=tokens_used)
+    spent = tokens_used >= budget.max_tokens
+
+    async def main():
+        with use_budget(budget):
+            return await ResearchBudgetMiddleware().abefore_model(
+                {"messages": []}, None
+            )
+
+    assert ("token budget" in _run(budget, _call("task", "t")).content) == spent
+    update = asyncio.run(main())
+    assert (update is not None) == stops
+    if stops:
+        assert update["jump_to"] == "end"
+        assert update["messages"][0].content.startswith("Research stopped")
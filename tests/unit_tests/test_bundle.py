@@ -0,0 +1,59 @@
+from src.report_writer.bundle import build_research_bundle, find_findings_paths
+
+
+def _findings(claim, title, url, padding=0):
+    return (
+        f"{claim} [1].{' More detail.' * padding}\n\n## Sources\n[1] {title}: {url}\n"
+    )
+
+
+def _files(padding=0):
+    return {
+        "/research/index.md": "- /research/wind/findings.md\n- /research/solar/findings.md",
+        "/research/solar/findings.md": _findings(
+            "Solar is cheap", "IEA", "https://iea.org/solar"
+        ),
+        "/research/wind/findings.md": _findings(
+            "Wind grew", "GWEC", "https://gwec.net/wind", padding
+        ),
+        "/research/hydro/findings.md": _findings(
+            "Hydro is flat", "IHA", "https://iha.org/hydro"
+        ),
+        "/research/hydro/search_1_raw.md": "raw",
+    }
+
+
+def test_find_findings_paths_follows_the_index_then_the_rest():
+    assert find_findings_paths(_files()) == [
+        "/research/wind/findings.md",
+        "/research/solar/findings.md",
+        "/research/hydro/findings.md",
+    ]
+
+
+def test_bundle_includes_renumbered_findings_and_the_merged_sources():
+    bundle = build_research_bundle(_files(), max_tokens=10_000)
+
+    assert bundle.omitted_paths == []
+    assert bundle.text.startswith('<File path="/research/index.md">')
+    assert "Wind grew [1]." in bundle.text and "Solar is cheap [2]." in bundle.text
+    assert "<Sources>\n[1] GWEC: https://gwec.net/wind\n[2] IEA" in bundle.text
+    assert "## Sources" not in bundle.text
+
+
+def test_bundle_lists_findings_that_dont_fit_the_budget():
+    bundle = build_research_bundle(_files(padding=200), max_tokens=300)
+
+    assert bundle.omitted_paths == ["/research/wind/findings.md"]
+    assert bundle.findings_paths == [
+        "/research/solar/findings.md",
+        "/research/hydro/findings.md",
+    ]
+    assert "Wind grew" not in bundle.text
+    assert (
+        "<Not Included>" in bundle.text
+        and "- /research/wind/findings.md" in bundle.text
+    )
+    # Omitted findings are still renumbered for read_file, and their sources kept
+    assert bundle.findings["/research/wind/findings.md"].startswith("Wind grew [1].")
+    assert "[1] GWEC" in bundle.text
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from src.config import SEARCH_CACHE_CONFIG
+from src.shared import cache
+from src.shared.cache import (
+    MemoryTier,
+    SearchCache,
+    SQLiteTier,
+    get_ttl,
+    make_cache_key,
+)
+
+PARAMS = {"topic": "general", "max_results": 3}
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock.time)
+    return clock
+
+
+def test_make_cache_key_ignores_case_whitespace_and_punctuation():
+    assert make_cache_key("Solar  Power costs?", PARAMS) == make_cache_key(
+        " solar power costs", PARAMS
+    )
+
+
+def test_make_cache_key_ignores_param_order_but_not_values():
+    reordered = {"max_results": 3, "topic": "general"}
+
+    assert make_cache_key("q", PARAMS) == make_cache_key("q", reordered)
+    assert make_cache_key("q", PARAMS) != make_cache_key(
+        "q", {**PARAMS, "topic": "news"}
+    )
+    assert make_cache_key("q", PARAMS) != make_cache_key("other q", PARAMS)
+
+
+def test_get_ttl_depends_on_topic():
+    ttls = SEARCH_CACHE_CONFIG["ttl_seconds"]
+
+    assert get_ttl({"topic": "news"}) == ttls["news"]
+    assert get_ttl({}) == ttls["general"]
+    assert get_ttl({"topic": "unknown"}) == ttls["general"]
+
+
+@pytest.mark.parametrize(
+    "make_tier",
+    [
+        lambda tmp_path: MemoryTier(8),
+        lambda tmp_path: SQLiteTier(str(tmp_path / "cache.sqlite")),
+    ],
+)
+def test_tiers_expire_entries_after_their_ttl(make_tier, tmp_path, clock):
+    tier = make_tier(tmp_path)
+    tier.set("key", {"results": [1]}, ttl=60)
+
+    clock.now += 59
+    assert tier.get("key") == {"results": [1]}
+    clock.now += 2
+    assert tier.get("key") is None
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = MemoryTier(2)
+    tier.set("a", {"v": "a"}, ttl=60)
+    tier.set("b", {"v": "b"}, ttl=60)
+    tier.get("a")
+    tier.set("c", {"v": "c"}, ttl=60)
+
+    assert tier.get("b") is None
+    assert tier.get("a") == {"v": "a"}
+
+
+def test_search_cache_expires_by_topic_and_promotes_disk_hits(tmp_path, clock):
+    search_cache = SearchCache(
+        memory=MemoryTier(8), disk=SQLiteTier(str(tmp_path / "cache.sqlite"))
+    )
+    news = {"topic": "news"}
+    search_cache.set("q", news, {"results": []})
+
+    search_cache.memory = MemoryTier(8)  # As after a restart
+    assert asyncio.run(search_cache.aget("q", news)) == {"results": []}
+    assert search_cache.get("q", news) == {"results": []}
+    assert (search_cache.stats.disk_hits, search_cache.stats.memory_hits) == (1, 1)
+
+    clock.now += get_ttl(news) + 1
+    assert search_cache.get("q", news) is None
+    assert search_cache.stats.misses == 1
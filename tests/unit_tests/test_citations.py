@@ -0,0 +1,130 @@
+import json
+
+from src.report_writer.citations import (
+    build_citation_table,
+    finalize_report,
+    strip_sources_section,
+)
+
+FINDINGS_A = """Solar capacity doubled [1], mostly in China [2].
+
+## Sources
+[1] IEA report: https://www.iea.org/reports/solar
+[2] Reuters: https://reuters.com/china-solar
+"""
+
+FINDINGS_B = """Costs kept falling [1][2] since [2024].
+
+## Sources
+[1] IEA again: https://iea.org/reports/solar/?utm_source=x
+[2] BNEF: https://about.bnef.com/costs
+"""
+
+
+def _files():
+    return {
+        "/research/solar/findings.md": FINDINGS_A,
+        "/research/costs/findings.md": FINDINGS_B,
+        "/research/costs/sources.json": json.dumps(
+            [
+                {
+                    "title": "IEA again",
+                    "url": "https://iea.org/reports/solar/?utm_source=x",
+                },
+                {"title": "BNEF", "url": "https://about.bnef.com/costs"},
+                {"title": "Uncited", "url": "https://example.com/uncited"},
+            ]
+        ),
+    }
+
+
+def test_build_citation_table_deduplicates_and_renumbers_findings():
+    table, findings = build_citation_table(
+        _files(), ["/research/solar/findings.md", "/research/costs/findings.md"]
+    )
+
+    assert [source["url"] for source in table.sources] == [
+        "https://www.iea.org/reports/solar",
+        "https://reuters.com/china-solar",
+        "https://about.bnef.com/costs",
+        "https://example.com/uncited",
+    ]
+    assert (
+        findings["/research/solar/findings.md"]
+        == "Solar capacity doubled [1], mostly in China [2]."
+    )
+    # The IEA source is shared, bracketed years are left alone, local Sources are stripped
+    assert (
+        findings["/research/costs/findings.md"]
+        == "Costs kept falling [1][3] since [2024]."
+    )
+
+
+def test_build_citation_table_flags_unknown_citations(caplog):
+    files = {
+        "/research/x/findings.md": "Claim [1] and [7].\n\n## Sources\n[1] A: https://a.com\n"
+    }
+
+    table, findings = build_citation_table(files, ["/research/x/findings.md"])
+
+    assert len(table.sources) == 1
+    assert findings["/research/x/findings.md"] == "Claim [1] and [7?]."
+    assert "/research/x/findings.md" in caplog.text
+
+
+def test_finalize_report_renumbers_by_first_use_and_appends_sources():
+    table, _ = build_citation_table(
+        _files(), ["/research/solar/findings.md", "/research/costs/findings.md"]
+    )
+    report = (
+        "# Report\n\nCosts fell [3, 1]. Again [1].\n\n## Sources\n[1] stale model list"
+    )
+
+    assert finalize_report(report, table) == (
+        "# Report\n\nCosts fell [1][2]. Again [2].\n\n"
+        "## Sources\n"
+        "[1] BNEF: https://about.bnef.com/costs\n"
+        "[2] IEA report: https://www.iea.org/reports/solar"
+    )
+
+
+def test_finalize_report_leaves_report_without_known_citations():
+    table, _ = build_citation_table(_files(), ["/research/solar/findings.md"])
+    report = "No citations here [99].\n\n## Sources\nnone"
+
+    assert finalize_report(report, table) == report
+
+
+def test_build_citation_table_keeps_parentheses_that_belong_to_the_url():
+    files = {
+        "/research/x/findings.md": (
+            "Rust is memory safe [1].\n\n## Sources\n"
+            "[1] Rust: https://en.wikipedia.org/wiki/Rust_(programming_language)\n"
+        )
+    }
+
+    table, _ = build_citation_table(files, ["/research/x/findings.md"])
+
+    assert table.sources == [
+        {
+            "title": "Rust",
+            "url": "https://en.wikipedia.org/wiki/Rust_(programming_language)",
+        }
+    ]
+
+
+def test_finalize_report_flags_citations_without_a_source(caplog):
+    table, _ = build_citation_table(_files(), ["/research/solar/findings.md"])
+
+    report = finalize_report("Real [2], made up [42].", table)
+
+    assert report.startswith("Real [1], made up [42?].\n\n## Sources\n[1] Reuters")
+    assert "[42]" in caplog.text
+
+
+def test_strip_sources_section_only_strips_a_trailing_section():
+    trailing = "# Report\n\nBody.\n\n## References\n[1] A: https://a.com\n### More\nB"
+    middle = "# Report\n\n## Sources\nHow we searched.\n\n## Findings\nBody."
+
+    assert strip_sources_section(trailing) == "# Report\n\nBody."
+    assert strip_sources_section(middle) == middle
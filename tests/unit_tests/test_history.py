@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.advisor import history
+from src.advisor.history import build_history
+
+
+@pytest.fixture
+def summaries(monkeypatch):
+    monkeypatch.setitem(history.ADVISOR_HISTORY_CONFIG, "keep_turns", 2)
+    monkeypatch.setitem(history.ADVISOR_HISTORY_CONFIG, "max_history_tokens", 200)
+    folded = []
+
+    async def summarize(summary, messages):
+        folded.append(messages)
+        return f"{summary}+{len(messages)}".lstrip("+")
+
+    monkeypatch.setattr(history, "summarize_history", summarize)
+    return folded
+
+
+def _turn(n, words=10):
+    return [
+        HumanMessage(f"question {n}"),
+        AIMessage(
+            "", tool_calls=[{"name": "search_web", "args": {}, "id": f"call{n}"}]
+        ),
+        ToolMessage("result " * words, tool_call_id=f"call{n}"),
+        AIMessage(f"answer {n}"),
+    ]
+
+
+def _messages(turns, words=10):
+    return [message for n in range(turns) for message in _turn(n, words)]
+
+
+def test_short_history_is_sent_verbatim(summaries):
+    messages = _messages(4)
+
+    result = asyncio.run(build_history({"messages": messages}))
+
+    assert result.messages == messages
+    assert (result.summary, result.summarized_messages) == ("", 0)
+    assert summaries == []
+
+
+def test_long_history_folds_turns_outside_the_window(summaries):
+    messages = _messages(4, words=100)
+
+    result = asyncio.run(build_history({"messages": messages}))
+
+    # The last 2 turns stay verbatim, tool calls next to their results
+    assert result.messages == messages[8:]
+    assert isinstance(result.messages[0], HumanMessage)
+    assert (result.summary, result.summarized_messages) == ("8", 8)
+    assert summaries == [messages[:8]]
+
+
+def test_only_turns_that_just_aged_out_are_folded(summaries):
+    messages = _messages(5, words=100)
+    state = {"messages": messages, "history_summary": "8", "summarized_messages": 8}
+
+    result = asyncio.run(build_history(state))
+
+    assert summaries == [messages[8:12]]
+    assert (result.summary, result.summarized_messages) == ("8+4", 12)
+    assert result.messages == messages[12:]
+
+
+def test_summary_is_dropped_when_the_conversation_was_rewound(summaries):
+    messages = _messages(2)
+    state = {"messages": messages, "history_summary": "old", "summarized_messages": 40}
+
+    result = asyncio.run(build_history(state))
+
+    assert (result.summary, result.messages) == ("", messages)
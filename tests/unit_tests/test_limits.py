@@ -0,0 +1,70 @@
+import asyncio
+from types import SimpleNamespace
+
+from src.shared.limits import (
+    GlobalLimits,
+    GlobalLimitsMiddleware,
+    model_call_slot,
+    use_global_limits,
+)
+
+
+class Peak:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def __call__(self, request=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        await asyncio.sleep(0.01)
+        self.running -= 1
+        return "done"
+
+
+def _tool_call(name):
+    return SimpleNamespace(tool_call={"name": name, "args": {}, "id": name})
+
+
+def test_limits_bound_subagents_and_model_calls_across_runs():
+    subagents, model_calls = Peak(), Peak()
+    middleware = GlobalLimitsMiddleware()
+
+    async def main():
+        limits = GlobalLimits(max_concurrent_subagents=2, max_concurrent_model_calls=3)
+        with use_global_limits(limits):
+            await asyncio.gather(
+                *[
+                    middleware.awrap_tool_call(_tool_call("task"), subagents)
+                    for _ in range(6)
+                ],
+                *[middleware.awrap_model_call(None, model_calls) for _ in range(6)],
+            )
+
+    asyncio.run(main())
+
+    assert (subagents.peak, model_calls.peak) == (2, 3)
+
+
+def test_other_tools_unset_limits_and_no_limits_are_unbounded():
+    searches, model_calls, direct_calls = Peak(), Peak(), Peak()
+    middleware = GlobalLimitsMiddleware()
+
+    async def direct_call():
+        async with model_call_slot():
+            await direct_calls()
+
+    async def main():
+        with use_global_limits(GlobalLimits(max_concurrent_subagents=1)):
+            await asyncio.gather(
+                *[
+                    middleware.awrap_tool_call(_tool_call("tavily_search"), searches)
+                    for _ in range(4)
+                ],
+                *[middleware.awrap_model_call(None, model_calls) for _ in range(4)],
+            )
+        await asyncio.gather(*[direct_call() for _ in range(4)])
+
+    asyncio.run(main())
+
+    assert (searches.peak, model_calls.peak, direct_calls.peak) == (4, 4, 4)
@@ -0,0 +1,82 @@
+from uuid import uuid4
+
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.runnables import RunnableLambda
+
+from src.shared.metering import UsageMeter, format_usage_summary, merge_usage
+
+
+def _llm_result(input_tokens, output_tokens, cache_read=0):
+    message = AIMessage(
+        "done",
+        usage_metadata={
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+            "input_token_details": {"cache_read": cache_read},
+        },
+    )
+    return LLMResult(generations=[[ChatGeneration(message=message)]])
+
+
+def test_merge_usage_sums_numbers_and_merges_nested_dicts():
+    left = {
+        "agents": {"a": {"model_calls": 1, "cost_usd": 0.1, "tool_calls": {"x": 1}}}
+    }
+    right = {
+        "agents": {
+            "a": {"model_calls": 2, "cost_usd": 0.2, "tool_calls": {"x": 1, "y": 1}},
+            "b": {"model_calls": 1},
+        }
+    }
+
+    assert merge_usage(left, right) == {
+        "agents": {
+            "a": {"model_calls": 3, "cost_usd": 0.3, "tool_calls": {"x": 2, "y": 1}},
+            "b": {"model_calls": 1},
+        }
+    }
+    assert merge_usage(None, right) == right
+    assert merge_usage(left, None) == left
+
+
+def test_usage_meter_attributes_model_calls_to_agents():
+    meter = UsageMeter("supervisor")
+    for agent, tokens in [
+        ("supervisor", 100),
+        ("research-agent", 40),
+        ("research-agent", 60),
+    ]:
+        run_id = uuid4()
+        meter.on_chat_model_start(
+            {}, [[]], run_id=run_id, metadata={"lc_agent_name": agent}
+        )
+        meter.on_llm_end(_llm_result(tokens, 10, cache_read=tokens // 2), run_id=run_id)
+
+    agents = meter.usage()["agents"]
+
+    assert agents["supervisor/supervisor"]["input_tokens"] == 100
+    record = agents["supervisor/research-agent"]
+    assert (record["model_calls"], record["input_tokens"]) == (2, 100)
+    assert (record["output_tokens"], record["cache_read_tokens"]) == (20, 50)
+
+
+def test_usage_meter_counts_tools_and_tavily_requests_per_agent():
+    meter = UsageMeter("supervisor")
+    meter.on_tool_start(
+        {"name": "tavily_search"},
+        "",
+        run_id=uuid4(),
+        metadata={"lc_agent_name": "research-agent"},
+    )
+    search = RunnableLambda(lambda _: meter.record_tavily_request())
+    search.invoke(None, {"metadata": {"lc_agent_name": "research-agent"}})
+    search.invoke(None, {"metadata": {"lc_agent_name": "research-agent"}})
+
+    usage = meter.usage()
+    record = usage["agents"]["supervisor/research-agent"]
+
+    assert record["tool_calls"] == {"tavily_search": 1}
+    assert record["tavily_requests"] == 2
+    assert "supervisor/research-agent" in format_usage_summary(usage)
@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+from langchain_core.messages import ToolMessage
+
+from src.researcher.novelty import (
+    NoveltyTracker,
+    SaturationMiddleware,
+    use_novelty_tracker,
+)
+
+TEXT = "solar panel prices fell sharply across europe and asia during the last year"
+
+
+def _tracker():
+    return NoveltyTracker(
+        shingle_size=3,
+        duplicate_similarity=0.8,
+        saturation_threshold=0.5,
+        saturation_window=2,
+    )
+
+
+def _result(url, content):
+    return {"url": url, "content": content}
+
+
+def test_observe_flags_repeated_urls_and_syndicated_content():
+    tracker = _tracker()
+    tracker.observe([_result("https://a.com/solar", TEXT)])
+
+    flags, novelty = tracker.observe(
+        [
+            _result(
+                "https://a.com/solar?utm_source=x", "entirely different words here"
+            ),
+            _result("https://b.com/copy", "Reposted: " + TEXT),
+            _result(
+                "https://c.com/wind", "wind turbines got bigger and cheaper this decade"
+            ),
+        ]
+    )
+
+    assert flags == [False, False, True]
+    assert (novelty.new, novelty.total, novelty.saturated) == (1, 3, True)
+
+
+def test_run_saturates_once_the_recent_window_is_mostly_repeats():
+    tracker = _tracker()
+    tracker.observe([_result("https://a.com", TEXT)])
+    assert not tracker.run_saturated  # The window isn't full yet
+
+    tracker.observe([_result("https://a.com", TEXT)])
+    assert not tracker.run_saturated  # Average of 1.0 and 0.0
+
+    tracker.observe([_result("https://a.com", TEXT)])
+    assert tracker.run_saturated
+    assert tracker.usage() == {"results": 3, "new_results": 1, "saturated": True}
+
+
+def test_saturation_middleware_refuses_delegation_and_reports_subtopic_novelty():
+    tracker = _tracker()
+    request = SimpleNamespace(tool_call={"name": "task", "args": {}, "id": "t1"})
+
+    async def research(request):
+        tracker.observe(
+            [_result("https://a.com", TEXT), _result("https://a.com", TEXT)]
+        )
+        return ToolMessage("findings", tool_call_id=request.tool_call["id"])
+
+    async def main():
+        with use_novelty_tracker(tracker):
+            first = await SaturationMiddleware().awrap_tool_call(request, research)
+            tracker.observe([_result("https://a.com", TEXT)])
+            second = await SaturationMiddleware().awrap_tool_call(request, research)
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert "[Novelty] 1 of 2 search results" in first.content
+    assert second.status == "error" and "saturated" in second.content
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+from src.shared.rate_limits import (
+    BACKGROUND,
+    INTERACTIVE,
+    RateLimitScheduler,
+    TokenBucket,
+    use_priority,
+)
+
+
+def test_token_bucket_refills_per_minute():
+    bucket = TokenBucket(60)  # One unit per second
+    start = bucket.updated
+
+    bucket.take(60, start)
+
+    assert bucket.wait_time(1, start) == pytest.approx(1.0)
+    assert bucket.wait_time(1, start + 0.5) == pytest.approx(0.5)
+    assert bucket.wait_time(1, start + 1.0) == pytest.approx(0.0)
+
+
+def test_token_bucket_can_go_into_debt_and_caps_its_level():
+    bucket = TokenBucket(60)
+    start = bucket.updated
+
+    bucket.take(90, start)  # 30 units of debt
+
+    assert bucket.wait_time(0, start) == pytest.approx(30.0)
+    assert (
+        bucket.wait_time(1000, start + 600) == 0.0
+    )  # Never needs more than a full bucket
+    assert bucket.level == 60
+
+
+def test_token_bucket_without_limit_never_waits():
+    for per_minute in (None, 0):
+        bucket = TokenBucket(per_minute)
+        bucket.take(1_000_000, bucket.updated)
+        assert bucket.wait_time(1_000_000, bucket.updated) == 0.0
+
+
+def test_scheduler_refuses_without_blocking_when_empty():
+    scheduler = RateLimitScheduler({"test": {"requests_per_minute": 1}}, {})
+    scopes = scheduler.scopes("test")
+
+    assert asyncio.run(scheduler.acquire(scopes, blocking=False))
+    assert not asyncio.run(scheduler.acquire(scopes, blocking=False))
+
+
+def test_scheduler_serves_higher_priority_first():
+    scheduler = RateLimitScheduler({"test": {"requests_per_minute": 600}}, {})
+    scopes = scheduler.scopes("test")
+    scopes[0].requests.take(
+        600, scopes[0].requests.updated
+    )  # Empty, refills 10 per second
+    served = []
+
+    async def call(name, priority):
+        with use_priority(priority):
+            await scheduler.acquire(scopes)
+        served.append(name)
+
+    async def main():
+        background = asyncio.create_task(call("background", BACKGROUND))
+        await asyncio.sleep(0.01)  # Queued first
+        interactive = asyncio.create_task(call("interactive", INTERACTIVE))
+        await asyncio.gather(background, interactive)
+
+    asyncio.run(main())
+
+    assert served == ["interactive", "background"]
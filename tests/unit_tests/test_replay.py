@@ -0,0 +1,63 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from src.shared.cache import make_cache_key
+from src.shared.replay import (
+    ReplayMismatchError,
+    RunArchive,
+    RunReplayer,
+    model_request_key,
+)
+
+PARAMS = {"topic": "general", "max_results": 3}
+
+
+def test_model_request_key_is_the_conversation_and_step():
+    first = [SystemMessage("v1"), HumanMessage("research solar")]
+    later = [
+        SystemMessage("v2"),
+        HumanMessage("research solar"),
+        AIMessage("searching"),
+        ToolMessage("any output", tool_call_id="1"),
+    ]
+
+    # System prompt and tool output details don't matter, the step does
+    assert model_request_key(later).split(":")[1] == "1"
+    assert (
+        model_request_key(later).split(":")[0] == model_request_key(first).split(":")[0]
+    )
+    assert model_request_key([HumanMessage("research wind")]) != model_request_key(
+        first
+    )
+
+
+def test_replayer_serves_responses_per_key_in_recorded_order(tmp_path):
+    archive = RunArchive(graph_input={"messages": []})
+    request = [HumanMessage("research solar")]
+    key = model_request_key(request)
+    archive.add_model_response(key, AIMessage("first"))
+    archive.add_model_response(key, AIMessage("second"))
+    archive.add_search("q", {"results": []})
+    archive.save(str(tmp_path / "run.jsonl.gz"))
+
+    replayer = RunReplayer(RunArchive.load(str(tmp_path / "run.jsonl.gz")))
+
+    assert replayer.unused_responses() == 2
+    assert replayer.model_response(request).content == "first"
+    assert replayer.model_response(request).content == "second"
+    assert replayer.unused_responses() == 0
+    with pytest.raises(ReplayMismatchError):
+        replayer.model_response(request)
+
+    replayer.reset()
+    assert replayer.model_response(request).content == "first"
+
+
+def test_replayer_serves_searches_by_cache_key():
+    archive = RunArchive()
+    archive.add_search(make_cache_key("Solar costs", PARAMS), {"results": [1]})
+    replayer = RunReplayer(archive)
+
+    assert replayer.search("solar  costs?", PARAMS) == {"results": [1]}
+    with pytest.raises(ReplayMismatchError):
+        replayer.search("wind costs", PARAMS)
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from src.shared.search import SearchCoordinator
+
+
+class Fetcher:
+    def __init__(self, fail_first=False):
+        self.calls = 0
+        self.fail_first = fail_first
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if self.fail_first and self.calls == 1:
+            raise RuntimeError("Tavily is down")
+        return {"results": [self.calls]}
+
+
+def test_coordinator_coalesces_in_flight_calls_and_reuses_finished_ones():
+    coordinator = SearchCoordinator()
+    fetch = Fetcher()
+
+    async def main():
+        first = await asyncio.gather(*[coordinator.run("q", fetch) for _ in range(3)])
+        return first, await coordinator.run("q", fetch)
+
+    first, again = asyncio.run(main())
+
+    assert fetch.calls == 1
+    assert first == [{"results": [1]}] * 3 and again == {"results": [1]}
+    assert coordinator.usage() == {
+        "requests": 4,
+        "upstream_calls": 1,
+        "calls_saved": 3,
+        "coalesced": 2,
+        "deduplicated": 1,
+    }
+
+
+def test_coordinator_forgets_failed_calls():
+    coordinator = SearchCoordinator()
+    fetch = Fetcher(fail_first=True)
+
+    async def main():
+        with pytest.raises(RuntimeError):
+            await coordinator.run("q", fetch)
+        return await coordinator.run("q", fetch)
+
+    assert asyncio.run(main()) == {"results": [2]}
+    assert fetch.calls == 2
+
+
+def test_coordinator_keeps_the_shared_call_when_a_waiter_is_cancelled():
+    coordinator = SearchCoordinator()
+    fetch = Fetcher()
+
+    async def main():
+        waiter = asyncio.create_task(coordinator.run("q", fetch))
+        other = asyncio.create_task(coordinator.run("q", fetch))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        return await other
+
+    assert asyncio.run(main()) == {"results": [1]}
+    assert fetch.calls == 1
+
+
+def test_coordinator_shares_calls_with_its_parent():
+    batch = SearchCoordinator()
+    fetch = Fetcher()
+    runs = [SearchCoordinator(parent=batch), SearchCoordinator(parent=batch)]
+
+    async def main():
+        return await asyncio.gather(*[run.run("q", fetch) for run in runs])
+
+    assert asyncio.run(main()) == [{"results": [1]}] * 2
+    assert fetch.calls == 1
+    assert batch.usage()["coalesced"] == 1
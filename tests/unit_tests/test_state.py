@@ -0,0 +1,43 @@
+from src.state import diff_files, files_delta_reducer
+
+
+def test_files_delta_reducer_creates_edits_and_deletes():
+    files = {"/a.md": "a", "/b.md": "b"}
+
+    result = files_delta_reducer(
+        files, [{"/a.md": "a2", "/c.md": "c"}, {"/b.md": None}]
+    )
+
+    assert result == {"/a.md": "a2", "/c.md": "c"}
+    assert files == {"/a.md": "a", "/b.md": "b"}  # Input left untouched
+
+
+def test_files_delta_reducer_handles_empty_state_and_missing_deletes():
+    assert files_delta_reducer(None, [{"/a.md": "a"}, {"/missing.md": None}]) == {
+        "/a.md": "a"
+    }
+
+
+def test_files_delta_reducer_is_independent_of_batching():
+    updates = [{"/a.md": "a"}, {"/b.md": "b"}, {"/a.md": None}, {"/a.md": "a3"}]
+
+    all_at_once = files_delta_reducer({}, updates)
+    one_by_one = {}
+    for update in updates:
+        one_by_one = files_delta_reducer(one_by_one, [update])
+
+    assert all_at_once == one_by_one == {"/a.md": "a3", "/b.md": "b"}
+
+
+def test_diff_files_round_trips_through_the_reducer():
+    before = {"/same.md": "s", "/edited.md": "old", "/deleted.md": "d"}
+    after = {"/same.md": "s", "/edited.md": "new", "/created.md": "c"}
+
+    changes = diff_files(before, after)
+
+    assert changes == {"/edited.md": "new", "/created.md": "c", "/deleted.md": None}
+    assert files_delta_reducer(before, [changes]) == after
+
+
+def test_diff_files_of_identical_maps_is_empty():
+    assert diff_files({"/a.md": "a"}, {"/a.md": "a"}) == {}
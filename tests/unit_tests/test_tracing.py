@@ -0,0 +1,59 @@
+from uuid import uuid4
+
+from src.shared.tracing import SpanTracer
+
+
+class ListExporter:
+    def __init__(self):
+        self.spans = []
+
+    def export(self, span):
+        self.spans.append(span)
+
+
+def test_tracer_records_nodes_and_model_calls_as_one_trace():
+    exporter = ListExporter()
+    tracer = SpanTracer(exporter)
+    graph, node, model = uuid4(), uuid4(), uuid4()
+
+    tracer.on_chain_start({}, {}, run_id=graph, name="LangGraph")
+    tracer.on_chain_start(
+        {},
+        {},
+        run_id=node,
+        parent_run_id=graph,
+        name="supervisor",
+        metadata={"langgraph_node": "supervisor"},
+    )
+    tracer.on_chat_model_start({}, [[]], run_id=model, parent_run_id=node)
+    tracer.on_llm_end(type("Result", (), {"generations": []})(), run_id=model)
+    tracer.on_chain_end({}, run_id=node)
+    tracer.on_chain_end({}, run_id=graph)
+
+    names = [span["name"] for span in exporter.spans]
+    assert names == ["model chat", "node supervisor", "graph LangGraph"]
+    assert len({span["traceId"] for span in exporter.spans}) == 1
+
+
+def test_tracer_forgets_runs_that_never_ended():
+    tracer = SpanTracer(ListExporter())
+    graph, node, task, cancelled = uuid4(), uuid4(), uuid4(), uuid4()
+
+    tracer.on_chain_start({}, {}, run_id=graph, name="LangGraph")
+    tracer.on_chain_start(
+        {},
+        {},
+        run_id=node,
+        parent_run_id=graph,
+        name="supervisor",
+        metadata={"langgraph_node": "supervisor"},
+    )
+    tracer.on_chain_start({}, {}, run_id=task, parent_run_id=node, name="task")
+    tracer.on_tool_start({}, "", run_id=cancelled, parent_run_id=task)
+    # The task fails while its tool call is still in flight
+    tracer.on_chain_error(RuntimeError("boom"), run_id=task)
+    assert set(tracer._parents) == {graph, node}
+
+    tracer.on_chain_start({}, {}, run_id=uuid4(), parent_run_id=node, name="other")
+    tracer.on_chain_end({}, run_id=graph)
+    assert not tracer._parents and not tracer._spans and not tracer._traces
@@ -0,0 +1,44 @@
+import pytest
+
+from src.shared.utils import canonicalize_url
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("HTTPS://WWW.Example.COM/Path/", "https://example.com/Path"),
+        ("https://example.com:443/a", "https://example.com/a"),
+        ("http://example.com:8080/a", "http://example.com:8080/a"),
+        ("https://example.com/a#section-2", "https://example.com/a"),
+        (
+            "https://example.com/a?b=2&utm_source=x&a=1&fbclid=y",
+            "https://example.com/a?a=1&b=2",
+        ),
+        ("https://example.com/a?ref=feed", "https://example.com/a"),
+        (
+            "https://example.com/a?reference=x&refresh=1&id=2",
+            "https://example.com/a?id=2&reference=x&refresh=1",
+        ),
+        (" https://example.com/a).", "https://example.com/a"),
+        (
+            "https://en.wikipedia.org/wiki/Rust_(programming_language)",
+            "https://en.wikipedia.org/wiki/Rust_(programming_language)",
+        ),
+        (
+            "https://en.wikipedia.org/wiki/Rust_(programming_language)).",
+            "https://en.wikipedia.org/wiki/Rust_(programming_language)",
+        ),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_canonicalize_url_matches_variants_of_the_same_page():
+    variants = [
+        "https://www.example.com/report/",
+        "https://example.com/report?utm_campaign=z",
+        "https://Example.com/report#summary",
+    ]
+
+    assert len({canonicalize_url(url) for url in variants}) == 1